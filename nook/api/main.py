@@ -3,21 +3,49 @@ Nook APIのメインアプリケーション。
 FastAPIを使用してAPIエンドポイントを提供します。
 """
 
+import json
 import os
+from contextlib import asynccontextmanager
+from pathlib import Path
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from dotenv import load_dotenv
 
-from nook.api.routers import content, weather, chat
+from nook.api.routers import content, weather, chat, search
+from nook.common.grok_client import get_async_grok_client
+from nook.common.llm_metrics import get_metrics, to_prometheus
 
 # 環境変数の読み込み
 load_dotenv()
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    アプリケーションの起動時と終了時の処理。
+    
+    Grok APIクライアントを起動時に1回だけ作成して app.state に保持し、
+    すべてのリクエストでコネクションプールを共有します。
+    APIキーが設定されていない場合はNoneを保持し、チャットはデモモードで応答します。
+    
+    Parameters
+    ----------
+    app : FastAPI
+        FastAPIアプリケーション。
+    """
+    app.state.grok_client = get_async_grok_client() if os.environ.get("GROK_API_KEY") else None
+    yield
+    if app.state.grok_client:
+        await app.state.grok_client.aclose()
+
+
 # FastAPIアプリケーションの作成
 app = FastAPI(
     title="Nook API",
     description="パーソナル情報ハブのAPI",
-    version="0.1.0"
+    version="0.1.0",
+    lifespan=lifespan
 )
 
 # CORSミドルウェアの設定
@@ -33,6 +61,7 @@ app.add_middleware(
 app.include_router(content.router, prefix="/api")
 app.include_router(weather.router, prefix="/api")
 app.include_router(chat.router, prefix="/api")
+app.include_router(search.router, prefix="/api")
 
 @app.get("/")
 async def root():
@@ -60,4 +89,52 @@ async def health():
     dict
         ヘルスステータス。
     """
-    return {"status": "healthy"} 
\ No newline at end of file
+    return {"status": "healthy"} 
+
+@app.get("/metrics")
+async def metrics(format: str = "prometheus"):
+    """
+    LLM呼び出しの計測結果を返すエンドポイント。
+    
+    APIプロセス内の計測結果（source="api"）に加えて、run_servicesが最後に
+    保存した計測結果（source="pipeline"）があればそれも含めます。
+    コンテンツの読み込みのキャッシュの集計値も含めます。
+    
+    Parameters
+    ----------
+    format : str, default="prometheus"
+        "prometheus" の場合はPrometheusのテキスト形式、"json" の場合はJSONで返します。
+    
+    Returns
+    -------
+    PlainTextResponse or dict
+        計測結果。
+    """
+    snapshots = {"api": get_metrics().snapshot()}
+    
+    pipeline_path = Path("data/metrics/latest.json")
+    if pipeline_path.exists():
+        try:
+            with open(pipeline_path, "r", encoding="utf-8") as f:
+                snapshots["pipeline"] = json.load(f)
+        except (OSError, json.JSONDecodeError):
+            pass
+    
+    cache_stats = content.get_storage().cache_stats()
+    
+    if format == "json":
+        return {**snapshots, "content_cache": cache_stats}
+    
+    lines = [
+        "# HELP nook_content_cache_hits_total メモリから返したコンテンツの読み込み回数",
+        "# TYPE nook_content_cache_hits_total counter",
+        f"nook_content_cache_hits_total {cache_stats['hits']}",
+        "# HELP nook_content_cache_misses_total ファイルから読み込んだコンテンツの読み込み回数",
+        "# TYPE nook_content_cache_misses_total counter",
+        f"nook_content_cache_misses_total {cache_stats['misses']}",
+        "# HELP nook_content_cache_bytes メモリに保持しているコンテンツのバイト数",
+        "# TYPE nook_content_cache_bytes gauge",
+        f"nook_content_cache_bytes {cache_stats['bytes']}"
+    ]
+    text = to_prometheus(snapshots) + "\n".join(lines) + "\n"
+    return PlainTextResponse(text, media_type="text/plain; version=0.0.4")
@@ -53,6 +53,72 @@ class ContentResponse(BaseModel):
     items: List[ContentItem] = Field(..., description="コンテンツ項目のリスト")
 
 
+class DatesResponse(BaseModel):
+    """
+    利用可能な日付のレスポンス。
+    
+    Parameters
+    ----------
+    source : str
+        ソース（reddit, hackernews, github, techfeed, paper, all）。
+    dates : List[str]
+        コンテンツがある日付（YYYY-MM-DD形式、新しい順）。
+    latest : str, optional
+        最新の日付（YYYY-MM-DD形式）。コンテンツがない場合はNone。
+    """
+    source: str = Field(..., description="ソース（reddit, hackernews, github, techfeed, paper, all）")
+    dates: List[str] = Field(..., description="コンテンツがある日付（YYYY-MM-DD形式、新しい順）")
+    latest: Optional[str] = Field(None, description="最新の日付（YYYY-MM-DD形式）")
+
+
+class SearchResult(BaseModel):
+    """
+    検索結果の項目。
+    
+    Parameters
+    ----------
+    source : str
+        ソース（reddit, hackernews, github, techfeed, paper）。
+    date : str
+        日付（YYYY-MM-DD形式）。
+    title : str
+        タイトル。
+    url : str, optional
+        関連URL。
+    snippet : str
+        一致した箇所の抜粋。一致した語は <mark> で囲みます。
+    """
+    source: str = Field(..., description="ソース（reddit, hackernews, github, techfeed, paper）")
+    date: str = Field(..., description="日付（YYYY-MM-DD形式）")
+    title: str = Field(..., description="タイトル")
+    url: Optional[str] = Field(None, description="関連URL")
+    snippet: str = Field(..., description="一致した箇所の抜粋")
+
+
+class SearchResponse(BaseModel):
+    """
+    検索レスポンス。
+    
+    Parameters
+    ----------
+    query : str
+        検索語。
+    total : int
+        一致した件数。
+    page : int
+        ページ番号（1始まり）。
+    per_page : int
+        1ページあたりの件数。
+    results : List[SearchResult]
+        関連度の高い順の検索結果。
+    """
+    query: str = Field(..., description="検索語")
+    total: int = Field(..., description="一致した件数")
+    page: int = Field(..., description="ページ番号（1始まり）")
+    per_page: int = Field(..., description="1ページあたりの件数")
+    results: List[SearchResult] = Field(..., description="関連度の高い順の検索結果")
+
+
 class WeatherResponse(BaseModel):
     """
     天気レスポンス。
@@ -3,13 +3,14 @@
 チャット機能のエンドポイントを提供します。
 """
 
-import os
-from typing import List, Dict, Any, Optional
-from fastapi import APIRouter, HTTPException, Depends
+import json
+from typing import AsyncIterator, List, Dict, Any, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Request
+from fastapi.responses import StreamingResponse
 from dotenv import load_dotenv
 
 from nook.api.models.schemas import ChatRequest, ChatResponse
-from nook.common.grok_client import Grok3Client
+from nook.common.grok_client import AsyncGrok3Client
 
 # 環境変数の読み込み
 load_dotenv()
@@ -19,8 +20,81 @@ router = APIRouter(
     tags=["chat"],
 )
 
+# APIキーが設定されていない場合のデモ用の応答
+DEMO_RESPONSE = "申し訳ありませんが、GROK_API_KEYが設定されていないため、実際の応答ができません。環境変数を設定してください。"
+
+
+def get_grok_client(request: Request) -> Optional[AsyncGrok3Client]:
+    """
+    アプリケーションの起動時に作成したGrok APIクライアントを取得します。
+    
+    Parameters
+    ----------
+    request : Request
+        リクエスト
+        
+    Returns
+    -------
+    AsyncGrok3Client or None
+        共有クライアント。APIキーが設定されていない場合はNone
+    """
+    return getattr(request.app.state, "grok_client", None)
+
+
+def _build_chat_messages(request: ChatRequest) -> Tuple[List[Dict[str, str]], str]:
+    """
+    チャットリクエストからLLMに渡す履歴とシステムプロンプトを作成します。
+    
+    Parameters
+    ----------
+    request : ChatRequest
+        チャットリクエスト
+        
+    Returns
+    -------
+    Tuple[List[Dict[str, str]], str]
+        整形したチャット履歴とシステムプロンプト
+    """
+    # チャット履歴の整形
+    formatted_history = []
+    for msg in request.chat_history:
+        formatted_history.append({
+            "role": msg.get("role", "user"),
+            "content": msg.get("content", "")
+        })
+    
+    # システムプロンプトの作成
+    system_prompt = "あなたは親切なアシスタントです。ユーザーが提供したコンテンツについて質問に答えてください。"
+    if request.markdown:
+        system_prompt += f"\n\n以下のコンテンツに基づいて回答してください:\n\n{request.markdown}"
+    
+    return formatted_history, system_prompt
+
+
+def _sse_event(data: Dict[str, Any], event: Optional[str] = None) -> str:
+    """
+    Server-Sent Eventsの1イベント分の文字列を作成します。
+    
+    Parameters
+    ----------
+    data : Dict[str, Any]
+        JSONとして送信するデータ
+    event : str, optional
+        イベント名。指定しない場合は既定の message イベント
+        
+    Returns
+    -------
+    str
+        SSE形式の文字列
+    """
+    payload = f"data: {json.dumps(data, ensure_ascii=False)}\n\n"
+    return f"event: {event}\n{payload}" if event else payload
+
 @router.post("", response_model=ChatResponse)
-async def chat(request: ChatRequest) -> ChatResponse:
+async def chat(
+    request: ChatRequest,
+    client: Optional[AsyncGrok3Client] = Depends(get_grok_client)
+) -> ChatResponse:
     """
     チャットメッセージを処理し、レスポンスを返します。
     
@@ -28,6 +102,8 @@ async def chat(request: ChatRequest) -> ChatResponse:
     ----------
     request : ChatRequest
         チャットリクエスト
+    client : AsyncGrok3Client or None
+        アプリケーションで共有するGrok APIクライアント
         
     Returns
     -------
@@ -39,40 +115,79 @@ async def chat(request: ChatRequest) -> ChatResponse:
     HTTPException
         APIキーが設定されていない場合や、APIリクエストに失敗した場合
     """
-    # APIキーの確認
-    api_key = os.environ.get("GROK_API_KEY")
-    if not api_key:
+    if client is None:
         # デモモード: APIキーがない場合はダミーレスポンスを返す
-        return ChatResponse(
-            response="申し訳ありませんが、GROK_API_KEYが設定されていないため、実際の応答ができません。環境変数を設定してください。"
-        )
+        return ChatResponse(response=DEMO_RESPONSE)
     
     try:
-        # Grok3クライアントの初期化
-        client = Grok3Client(api_key=api_key)
-        
-        # チャット履歴の整形
-        formatted_history = []
-        for msg in request.chat_history:
-            formatted_history.append({
-                "role": msg.get("role", "user"),
-                "content": msg.get("content", "")
-            })
-        
-        # システムプロンプトの作成
-        system_prompt = "あなたは親切なアシスタントです。ユーザーが提供したコンテンツについて質問に答えてください。"
-        if request.markdown:
-            system_prompt += f"\n\n以下のコンテンツに基づいて回答してください:\n\n{request.markdown}"
+        formatted_history, system_prompt = _build_chat_messages(request)
         
-        # Grok3 APIを呼び出し
-        response = client.chat(
+        # Grok3 APIを呼び出し（イベントループを塞がないよう非同期クライアントを使用）
+        response = await client.chat(
             messages=formatted_history,
             system=system_prompt,
-            temperature=0.7,
-            max_tokens=1000
+            call_site="api.chat"
         )
         
         return ChatResponse(response=response)
         
     except Exception as e:
-        raise HTTPException(status_code=500, detail=f"チャットリクエストの処理中にエラーが発生しました: {str(e)}") 
\ No newline at end of file
+        raise HTTPException(status_code=500, detail=f"チャットリクエストの処理中にエラーが発生しました: {str(e)}") 
+
+
+@router.post("/stream")
+async def chat_stream(
+    request: ChatRequest,
+    client: Optional[AsyncGrok3Client] = Depends(get_grok_client)
+) -> StreamingResponse:
+    """
+    チャットメッセージを処理し、レスポンスをServer-Sent Eventsで逐次返します。
+    
+    生成されたテキストの断片ごとに ``data: {"delta": "..."}`` を送信し、
+    完了時に ``event: done``、失敗時に ``event: error`` を送信します。
+    
+    Parameters
+    ----------
+    request : ChatRequest
+        チャットリクエスト
+    client : AsyncGrok3Client or None
+        アプリケーションで共有するGrok APIクライアント
+        
+    Returns
+    -------
+    StreamingResponse
+        text/event-stream 形式のレスポンス
+    """
+    async def event_stream() -> AsyncIterator[str]:
+        if client is None:
+            # デモモード: APIキーがない場合はダミーレスポンスを返す
+            yield _sse_event({"delta": DEMO_RESPONSE})
+            yield _sse_event({}, event="done")
+            return
+        
+        try:
+            formatted_history, system_prompt = _build_chat_messages(request)
+            
+            stream = await client.chat(
+                messages=formatted_history,
+                system=system_prompt,
+                call_site="api.chat_stream",
+                stream=True
+            )
+            async for delta in stream:
+                yield _sse_event({"delta": delta})
+            
+            yield _sse_event({}, event="done")
+        
+        except Exception as e:
+            # ストリーム開始後はステータスコードを変更できないため、エラーイベントで通知する
+            yield _sse_event(
+                {"detail": f"チャットリクエストの処理中にエラーが発生しました: {str(e)}"},
+                event="error"
+            )
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
@@ -1,15 +1,21 @@
 """コンテンツAPIルーター。"""
 
+import os
 from datetime import datetime
 from typing import List, Dict, Any, Optional
 
 from fastapi import APIRouter, HTTPException
 
-from nook.api.models.schemas import ContentResponse, ContentItem
-from nook.common.storage import LocalStorage
+from nook.api.models.schemas import ContentResponse, ContentItem, DatesResponse
+from nook.common.items import render_items_markdown
+from nook.common.storage import LocalStorage, create_storage
 
 router = APIRouter()
-storage = LocalStorage("data")
+
+# 読み込んだMarkdownをメモリに保持する上限の既定値（MB）
+DEFAULT_STORAGE_CACHE_MB = 64
+
+_storage: Optional[LocalStorage] = None
 
 SOURCE_MAPPING = {
     "reddit": "reddit_explorer",
@@ -20,6 +26,26 @@ SOURCE_MAPPING = {
 }
 
 
+def get_storage() -> LocalStorage:
+    """
+    コンテンツの読み込みに使うストレージを取得します。
+    
+    同じ日のコンテンツへのリクエストでファイルを読み直さないよう、読み込んだMarkdownを
+    環境変数 STORAGE_CACHE_MB（MB、0で無効）を上限にメモリに保持します。
+    
+    Returns
+    -------
+    LocalStorage
+        プロセス内で共有するストレージ。
+    """
+    global _storage
+    
+    if _storage is None:
+        cache_mb = float(os.environ.get("STORAGE_CACHE_MB", DEFAULT_STORAGE_CACHE_MB))
+        _storage = create_storage("data", cache_bytes=int(cache_mb * 1024 * 1024))
+    return _storage
+
+
 @router.get("/content/{source}", response_model=ContentResponse)
 async def get_content(source: str, date: Optional[str] = None) -> ContentResponse:
     """
@@ -55,54 +81,123 @@ async def get_content(source: str, date: Optional[str] = None) -> ContentRespons
     else:
         target_date = datetime.now()
     
+    storage = get_storage()
     items = []
     
-    # 特定のソースからコンテンツを取得
-    if source != "all":
-        service_name = SOURCE_MAPPING[source]
-        content = storage.load_markdown(service_name, target_date)
-        
-        if content:
-            # マークダウンからContentItemを作成
-            items.append(ContentItem(
-                title=f"{_get_source_display_name(source)} - {target_date.strftime('%Y-%m-%d')}",
-                content=content,
-                source=source
-            ))
-    else:
-        # すべてのソースからコンテンツを取得
-        for src, service_name in SOURCE_MAPPING.items():
-            content = storage.load_markdown(service_name, target_date)
-            if content:
-                items.append(ContentItem(
-                    title=f"{_get_source_display_name(src)} - {target_date.strftime('%Y-%m-%d')}",
-                    content=content,
-                    source=src
-                ))
+    # 特定のソース、またはすべてのソースからコンテンツを取得
+    sources = [source] if source != "all" else list(SOURCE_MAPPING)
+    for src in sources:
+        item = _load_content_item(storage, src, target_date)
+        if item:
+            items.append(item)
     
     if not items:
-        # 利用可能な日付を確認
-        available_dates = []
-        if source != "all":
-            service_name = SOURCE_MAPPING[source]
-            available_dates = storage.list_dates(service_name)
-        else:
-            for service_name in SOURCE_MAPPING.values():
-                dates = storage.list_dates(service_name)
-                available_dates.extend(dates)
+        # 最新の利用可能な日付を日付の索引から取得
+        service_names = [SOURCE_MAPPING[source]] if source != "all" else list(SOURCE_MAPPING.values())
+        latest_dates = [date for date in (storage.latest_date(name) for name in service_names) if date]
         
-        if not available_dates:
+        if not latest_dates:
             raise HTTPException(
                 status_code=404, 
                 detail=f"No content available. Please run the services first."
             )
-        else:
-            # 最新の利用可能な日付のコンテンツを取得
-            latest_date = max(available_dates)
-            return await get_content(source, latest_date.strftime("%Y-%m-%d"))
+        
+        latest_date = max(latest_dates)
+        if date == latest_date.strftime("%Y-%m-%d"):
+            raise HTTPException(status_code=404, detail=f"No content available for {date}")
+        
+        # 最新の利用可能な日付のコンテンツを取得
+        return await get_content(source, latest_date.strftime("%Y-%m-%d"))
     
     return ContentResponse(items=items)
 
+
+@router.get("/dates/{source}", response_model=DatesResponse)
+async def get_dates(source: str, start: Optional[str] = None, end: Optional[str] = None) -> DatesResponse:
+    """
+    特定のソースのコンテンツがある日付の一覧を取得します。
+    
+    Parameters
+    ----------
+    source : str
+        データソース（reddit, hackernews, github, techfeed, paper, all）。
+    start : str, optional
+        この日付以降に絞り込みます（YYYY-MM-DD形式）。
+    end : str, optional
+        この日付以前に絞り込みます（YYYY-MM-DD形式）。
+        
+    Returns
+    -------
+    DatesResponse
+        日付の一覧と最新の日付。
+        
+    Raises
+    ------
+    HTTPException
+        ソースが無効な場合や、日付の形式が不正な場合。
+    """
+    if source not in SOURCE_MAPPING and source != "all":
+        raise HTTPException(status_code=404, detail=f"Source '{source}' not found")
+    
+    bounds = []
+    for value in (start, end):
+        try:
+            bounds.append(datetime.strptime(value, "%Y-%m-%d") if value else None)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid date format: {value}")
+    
+    storage = get_storage()
+    service_names = [SOURCE_MAPPING[source]] if source != "all" else list(SOURCE_MAPPING.values())
+    dates = set()
+    latest_dates = []
+    for service_name in service_names:
+        dates.update(storage.list_dates(service_name, start=bounds[0], end=bounds[1]))
+        latest = storage.latest_date(service_name)
+        if latest:
+            latest_dates.append(latest)
+    
+    return DatesResponse(
+        source=source,
+        dates=[date.strftime("%Y-%m-%d") for date in sorted(dates, reverse=True)],
+        latest=max(latest_dates).strftime("%Y-%m-%d") if latest_dates else None
+    )
+
+def _load_content_item(storage: LocalStorage, source: str, date: datetime) -> Optional[ContentItem]:
+    """
+    ソースの1日分のコンテンツを読み込みます。
+    
+    その日のMarkdownがまだない場合は、実行中のサービスがそれまでに追記した項目から
+    途中経過のMarkdownを生成します。
+    
+    Parameters
+    ----------
+    storage : LocalStorage
+        ストレージ。
+    source : str
+        データソース。
+    date : datetime
+        日付。
+        
+    Returns
+    -------
+    ContentItem or None
+        コンテンツ。Markdownも追記された項目もない場合はNone。
+    """
+    service_name = SOURCE_MAPPING[source]
+    title = f"{_get_source_display_name(source)} - {date.strftime('%Y-%m-%d')}"
+    
+    content = storage.load_markdown(service_name, date)
+    if content:
+        return ContentItem(title=title, content=content, source=source)
+    
+    partial_items = storage.load_partial_items(service_name, date)
+    if partial_items:
+        content = render_items_markdown(partial_items, f"{title}（処理中: {len(partial_items)}件）")
+        return ContentItem(title=f"{title}（処理中）", content=content, source=source)
+    
+    return None
+
+
 def _get_source_display_name(source: str) -> str:
     """
     ソースの表示名を取得します。
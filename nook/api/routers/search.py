@@ -0,0 +1,96 @@
+"""検索APIルーター。"""
+
+from datetime import datetime
+from typing import Optional
+
+from fastapi import APIRouter, HTTPException, Query
+
+from nook.api.models.schemas import SearchResponse, SearchResult
+from nook.api.routers.content import SOURCE_MAPPING, get_storage
+from nook.common.sqlite_storage import SQLiteStorage
+
+router = APIRouter()
+
+# サービス名（ディレクトリ名）からソースへの対応
+SERVICE_SOURCES = {service_name: source for source, service_name in SOURCE_MAPPING.items()}
+
+
+@router.get("/search", response_model=SearchResponse)
+def search(
+    q: str = Query(..., min_length=1, description="検索語（空白区切りの語をすべて含む項目を検索）"),
+    source: Optional[str] = None,
+    date_from: Optional[str] = Query(None, alias="from", description="この日付以降（YYYY-MM-DD形式）"),
+    date_to: Optional[str] = Query(None, alias="to", description="この日付以前（YYYY-MM-DD形式）"),
+    page: int = Query(1, ge=1),
+    per_page: int = Query(20, ge=1, le=100)
+) -> SearchResponse:
+    """
+    保存済みのすべての日の項目を全文検索します。
+    
+    SQLiteへの問い合わせはイベントループを止めないよう、スレッドプールで実行します（同期関数のエンドポイント）。
+    
+    Parameters
+    ----------
+    q : str
+        検索語。
+    source : str, optional
+        データソース（reddit, hackernews, github, techfeed, paper, all）。指定しない場合はすべて。
+    date_from : str, optional
+        この日付以降に絞り込みます（YYYY-MM-DD形式）。
+    date_to : str, optional
+        この日付以前に絞り込みます（YYYY-MM-DD形式）。
+    page : int, default=1
+        ページ番号（1始まり）。
+    per_page : int, default=20
+        1ページあたりの件数。
+        
+    Returns
+    -------
+    SearchResponse
+        関連度の高い順の検索結果。
+        
+    Raises
+    ------
+    HTTPException
+        ソースが無効な場合、日付の形式が不正な場合、SQLiteのストレージを使っていない場合。
+    """
+    if source and source != "all" and source not in SOURCE_MAPPING:
+        raise HTTPException(status_code=404, detail=f"Source '{source}' not found")
+    
+    bounds = []
+    for value in (date_from, date_to):
+        try:
+            bounds.append(datetime.strptime(value, "%Y-%m-%d") if value else None)
+        except ValueError:
+            raise HTTPException(status_code=400, detail=f"Invalid date format: {value}") from None
+    
+    storage = get_storage()
+    if not isinstance(storage, SQLiteStorage):
+        raise HTTPException(status_code=503, detail="Search requires STORAGE_BACKEND=sqlite")
+    
+    services = [SOURCE_MAPPING[source]] if source and source != "all" else None
+    total, hits = storage.search(
+        q,
+        services=services,
+        date_from=bounds[0],
+        date_to=bounds[1],
+        limit=per_page,
+        offset=(page - 1) * per_page
+    )
+    
+    return SearchResponse(
+        query=q,
+        total=total,
+        page=page,
+        per_page=per_page,
+        results=[
+            SearchResult(
+                source=SERVICE_SOURCES.get(hit.service, hit.service),
+                date=hit.date,
+                title=hit.title,
+                url=hit.url,
+                snippet=hit.snippet
+            )
+            for hit in hits
+        ]
+    )
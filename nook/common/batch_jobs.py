@@ -0,0 +1,263 @@
+"""急がないLLM呼び出しを、OpenAI互換のバッチAPIでまとめて実行するユーティリティ。"""
+
+import json
+import os
+import time
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from nook.common.grok_client import Grok3Client, get_grok_client
+from nook.common.llm_cache import LLMCache
+
+# バッチジョブのデフォルト設定
+DEFAULT_JOBS_DIR = "data/batch_jobs"
+DEFAULT_POLL_INTERVAL = 30.0
+DEFAULT_TIMEOUT = 24 * 60 * 60
+
+# バッチの終了状態
+_FINISHED_STATUSES = ("completed", "failed", "expired", "cancelled")
+
+
+class BatchJobError(Exception):
+    """
+    バッチジョブを投入できなかった、または完了しなかったことを表す例外。
+    """
+
+
+@dataclass
+class BatchRequest:
+    """
+    バッチジョブに含める1件のリクエスト。
+
+    Parameters
+    ----------
+    custom_id : str
+        結果を元のデータに対応付けるためのID。ジョブ内で一意である必要があります。
+    prompt : str
+        生成のためのプロンプト。
+    system_instruction : str | None
+        システム指示。
+    call_site : str | None
+        計測とプロファイルの選択に使う呼び出し元の名前（例: ``paper.summarize_paper``）。
+    """
+
+    custom_id: str
+    prompt: str
+    system_instruction: Optional[str] = None
+    call_site: Optional[str] = None
+
+    def messages(self) -> List[Dict[str, str]]:
+        """
+        送信するメッセージのリストを取得します。
+        """
+        messages = []
+        if self.system_instruction:
+            messages.append({"role": "system", "content": self.system_instruction})
+        messages.append({"role": "user", "content": self.prompt})
+        return messages
+
+
+class BatchJobRunner:
+    """
+    複数のリクエストをJSONLのジョブファイルにまとめてバッチAPIに投入し、完了を待って結果を取得するクラス。
+
+    バッチAPIは同期リクエストより安価な代わりに完了まで時間がかかるため、要約など
+    急がない処理に使用します。キャッシュにある結果はジョブに含めず、取得した結果は
+    キャッシュに保存します。ジョブファイルと結果ファイルは ``jobs_dir`` に残します。
+
+    Parameters
+    ----------
+    client : Grok3Client, optional
+        APIクライアント。指定しない場合はプロセス共有のクライアント。
+    jobs_dir : str | Path, optional
+        ジョブファイルの保存先。指定しない場合は環境変数 GROK_BATCH_DIR（未設定の場合は data/batch_jobs）。
+    poll_interval : float, optional
+        完了を確認する間隔（秒）。指定しない場合は環境変数 GROK_BATCH_POLL_INTERVAL（未設定の場合は30）。
+    timeout : float, optional
+        完了を待つ最大の秒数。指定しない場合は環境変数 GROK_BATCH_TIMEOUT（未設定の場合は86400）。
+    """
+
+    def __init__(
+        self,
+        client: Optional[Grok3Client] = None,
+        jobs_dir: Optional[str | Path] = None,
+        poll_interval: Optional[float] = None,
+        timeout: Optional[float] = None
+    ):
+        """
+        BatchJobRunnerを初期化します。
+
+        Parameters
+        ----------
+        client : Grok3Client, optional
+            APIクライアント。
+        jobs_dir : str | Path, optional
+            ジョブファイルの保存先。
+        poll_interval : float, optional
+            完了を確認する間隔（秒）。
+        timeout : float, optional
+            完了を待つ最大の秒数。
+        """
+        self.client = client or get_grok_client()
+        self.jobs_dir = Path(jobs_dir or os.environ.get("GROK_BATCH_DIR", DEFAULT_JOBS_DIR))
+        self.poll_interval = poll_interval if poll_interval is not None else float(
+            os.environ.get("GROK_BATCH_POLL_INTERVAL", DEFAULT_POLL_INTERVAL)
+        )
+        self.timeout = timeout if timeout is not None else float(
+            os.environ.get("GROK_BATCH_TIMEOUT", DEFAULT_TIMEOUT)
+        )
+
+    def run(self, requests: List[BatchRequest], name: str = "batch") -> Dict[str, str]:
+        """
+        リクエストをバッチジョブとして実行し、結果を取得します。
+
+        Parameters
+        ----------
+        requests : List[BatchRequest]
+            実行するリクエストのリスト。
+        name : str, default="batch"
+            ジョブファイル名に付ける名前（例: ``paper``）。
+
+        Returns
+        -------
+        Dict[str, str]
+            custom_idごとの生成されたテキスト。失敗したリクエストは含みません。
+
+        Raises
+        ------
+        BatchJobError
+            ジョブを投入できなかった場合、失敗・期限切れになった場合、またはタイムアウトした場合。
+        """
+        started_at = time.perf_counter()
+        results: Dict[str, str] = {}
+        pending: Dict[str, Dict[str, Any]] = {}
+
+        for request in requests:
+            if request.custom_id in pending or request.custom_id in results:
+                raise ValueError(f"Duplicate custom_id in batch: {request.custom_id}")
+
+            messages = request.messages()
+            model, temperature, max_tokens = self.client.profiles.resolve(request.call_site, messages)
+            cache_key = None
+            if self.client.cache:
+                cache_key = LLMCache.make_key(model, messages, temperature, max_tokens)
+                cached = self.client.cache.get(cache_key)
+                if cached is not None:
+                    self.client.metrics.record(request.call_site, 0.0, cache_hit=True)
+                    results[request.custom_id] = cached
+                    continue
+
+            pending[request.custom_id] = {
+                "call_site": request.call_site,
+                "cache_key": cache_key,
+                "line": {
+                    "custom_id": request.custom_id,
+                    "method": "POST",
+                    "url": "/v1/chat/completions",
+                    "body": {
+                        "model": model,
+                        "messages": messages,
+                        "temperature": temperature,
+                        "max_tokens": max_tokens
+                    }
+                }
+            }
+
+        if not pending:
+            return results
+
+        self.jobs_dir.mkdir(parents=True, exist_ok=True)
+        job_path = self.jobs_dir / f"{datetime.now().strftime('%Y%m%d-%H%M%S')}-{name}.jsonl"
+        with open(job_path, "w", encoding="utf-8") as f:
+            for entry in pending.values():
+                f.write(json.dumps(entry["line"], ensure_ascii=False) + "\n")
+
+        output = self._execute(job_path, len(pending))
+        output_path = job_path.with_name(job_path.stem + ".output.jsonl")
+        output_path.write_text(output, encoding="utf-8")
+
+        elapsed = time.perf_counter() - started_at
+        for line in output.splitlines():
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            entry = pending.get(item.get("custom_id"))
+            if entry is None:
+                continue
+
+            response = item.get("response") or {}
+            body = response.get("body") or {}
+            if response.get("status_code") != 200 or not body.get("choices"):
+                self.client.metrics.record(entry["call_site"], elapsed, error=True)
+                continue
+
+            content = body["choices"][0]["message"].get("content")
+            usage = body.get("usage") or {}
+            self.client.metrics.record(
+                entry["call_site"],
+                elapsed,
+                prompt_tokens=usage.get("prompt_tokens", 0),
+                completion_tokens=usage.get("completion_tokens", 0)
+            )
+            if content is None:
+                continue
+            results[item["custom_id"]] = content
+            if entry["cache_key"]:
+                self.client.cache.set(entry["cache_key"], content)
+
+        print(f"バッチジョブ {name}: {len(pending)} 件中 {len(results)} 件の結果を取得しました ({elapsed:.0f} 秒)")
+        return results
+
+    def _execute(self, job_path: Path, count: int) -> str:
+        """
+        ジョブファイルをアップロードしてバッチを作成し、完了まで待って結果ファイルの内容を返します。
+
+        Parameters
+        ----------
+        job_path : Path
+            JSONLのジョブファイル。
+        count : int
+            ジョブに含まれるリクエスト数（表示用）。
+
+        Returns
+        -------
+        str
+            結果ファイル（JSONL）の内容。
+        """
+        api = self.client.client
+        try:
+            with open(job_path, "rb") as f:
+                input_file = api.files.create(file=f, purpose="batch")
+            batch = api.batches.create(
+                input_file_id=input_file.id,
+                endpoint="/v1/chat/completions",
+                completion_window="24h"
+            )
+        except Exception as e:
+            raise BatchJobError(f"Failed to submit batch job {job_path.name}: {str(e)}") from e
+
+        print(f"バッチジョブを投入しました: {batch.id} ({count} 件)")
+        deadline = time.monotonic() + self.timeout
+        while batch.status not in _FINISHED_STATUSES:
+            if time.monotonic() >= deadline:
+                try:
+                    api.batches.cancel(batch.id)
+                except Exception as e:
+                    print(f"Error cancelling batch {batch.id}: {str(e)}")
+                raise BatchJobError(f"Batch {batch.id} did not finish within {self.timeout:.0f} seconds")
+            time.sleep(self.poll_interval)
+            try:
+                batch = api.batches.retrieve(batch.id)
+            except Exception as e:
+                # 一時的な通信エラーでジョブを諦めないよう、次の確認まで待つ
+                print(f"Error retrieving batch {batch.id}: {str(e)}")
+
+        if batch.status != "completed" or not batch.output_file_id:
+            raise BatchJobError(f"Batch {batch.id} finished with status {batch.status}")
+
+        try:
+            return api.files.content(batch.output_file_id).text
+        except Exception as e:
+            raise BatchJobError(f"Failed to download results of batch {batch.id}: {str(e)}") from e
@@ -0,0 +1,301 @@
+"""LLMのバックエンドが不調なときに呼び出しを即座に失敗させるサーキットブレーカー。"""
+
+import contextlib
+import os
+import threading
+import time
+from collections import deque
+from typing import Any, Deque, Dict, Iterator, Literal, Optional
+
+import httpx
+import openai
+
+# サーキットブレーカーのデフォルト設定
+DEFAULT_FAILURE_RATE = 0.5
+DEFAULT_WINDOW = 20
+DEFAULT_MIN_CALLS = 10
+DEFAULT_COOLDOWN = 30.0
+
+CircuitState = Literal["closed", "open", "half_open"]
+
+
+class CircuitOpenError(Exception):
+    """
+    サーキットが開いているため、リクエストを送信せずに失敗したことを表す例外。
+
+    再試行の対象外です。
+
+    Parameters
+    ----------
+    retry_after : float
+        サーキットが半開状態になり、試験的なリクエストを受け付けるまでの秒数。
+    """
+
+    def __init__(self, retry_after: float):
+        """
+        CircuitOpenErrorを初期化します。
+
+        Parameters
+        ----------
+        retry_after : float
+            試験的なリクエストを受け付けるまでの秒数。
+        """
+        super().__init__(f"LLM backend circuit is open; retry after {retry_after:.1f}s")
+        self.retry_after = retry_after
+
+
+def is_backend_failure(error: BaseException) -> bool:
+    """
+    例外がバックエンドの不調によるものかを判定します。
+
+    Parameters
+    ----------
+    error : BaseException
+        API呼び出しで発生した例外。
+
+    Returns
+    -------
+    bool
+        接続エラー・タイムアウト・5xxの場合はTrue。ストリームの読み込み中の切断やタイムアウト
+        （httpxの通信エラーがそのまま送出される）も含みます。
+        400などのリクエスト自体の誤りはバックエンドが応答しているためFalse。
+        429はレート制限（:mod:`nook.common.rate_limiter` が送信の間隔と同時実行数を調整する）
+        によるものでバックエンドの不調ではないためFalse。
+    """
+    if isinstance(error, openai.APIStatusError):
+        return error.status_code >= 500
+    return isinstance(error, (openai.APIConnectionError, httpx.TransportError, TimeoutError))
+
+
+class CircuitBreaker:
+    """
+    直近の呼び出しの失敗率に応じてLLM APIへのリクエストを遮断するクラス。
+
+    直近 ``window`` 回の呼び出しのうち失敗の割合が ``failure_rate`` 以上になると
+    サーキットを開き、``cooldown`` 秒の間はリクエストを送らずに :class:`CircuitOpenError`
+    を送出します。待機後は半開状態になり、1件だけ試験的なリクエストを通します。
+    成功すれば閉じ、失敗すれば再び開きます。
+
+    スレッドとイベントループをまたいで共有できます。
+
+    Parameters
+    ----------
+    failure_rate : float, default=0.5
+        サーキットを開く失敗率。
+    window : int, default=20
+        失敗率を計算する直近の呼び出し数。
+    min_calls : int, default=10
+        失敗率を判定するのに必要な最小の呼び出し数。
+    cooldown : float, default=30.0
+        サーキットを開いてから試験的なリクエストを通すまでの秒数。
+    """
+
+    def __init__(
+        self,
+        failure_rate: float = DEFAULT_FAILURE_RATE,
+        window: int = DEFAULT_WINDOW,
+        min_calls: int = DEFAULT_MIN_CALLS,
+        cooldown: float = DEFAULT_COOLDOWN
+    ):
+        """
+        CircuitBreakerを初期化します。
+
+        Parameters
+        ----------
+        failure_rate : float, default=0.5
+            サーキットを開く失敗率。
+        window : int, default=20
+            失敗率を計算する直近の呼び出し数。
+        min_calls : int, default=10
+            失敗率を判定するのに必要な最小の呼び出し数。
+        cooldown : float, default=30.0
+            サーキットを開いてから試験的なリクエストを通すまでの秒数。
+        """
+        if not 0 < failure_rate <= 1:
+            raise ValueError("failure_rate must be in (0, 1]")
+        if window < 1 or min_calls < 1:
+            raise ValueError("window and min_calls must be positive integers")
+
+        self.failure_rate = failure_rate
+        self.window = window
+        self.min_calls = min(min_calls, window)
+        self.cooldown = cooldown
+
+        self.opened = 0
+        self.rejected = 0
+
+        self._lock = threading.Lock()
+        self._state: CircuitState = "closed"
+        self._results: Deque[bool] = deque(maxlen=window)
+        self._opened_at = 0.0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> CircuitState:
+        """
+        現在の状態（closed・open・half_open）。
+        """
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.cooldown:
+                return "half_open"
+            return self._state
+
+    def before_call(self) -> bool:
+        """
+        リクエストを送信してよいかを確認します。
+
+        送信してよい場合は、結果を :meth:`record_result` で必ず記録してください。
+
+        Returns
+        -------
+        bool
+            半開状態の試験的なリクエストとして許可した場合はTrue。
+
+        Raises
+        ------
+        CircuitOpenError
+            サーキットが開いている場合、または半開状態で試験的なリクエストが処理中の場合。
+        """
+        now = time.monotonic()
+        with self._lock:
+            if self._state == "closed":
+                return False
+
+            if self._state == "open":
+                remaining = self._opened_at + self.cooldown - now
+                if remaining > 0:
+                    self.rejected += 1
+                    raise CircuitOpenError(remaining)
+                self._state = "half_open"
+
+            if self._probe_in_flight:
+                self.rejected += 1
+                raise CircuitOpenError(0.0)
+            self._probe_in_flight = True
+            return True
+
+    def record_result(self, error: Optional[BaseException] = None, probe: bool = False) -> None:
+        """
+        :meth:`before_call` で許可したリクエストの結果を記録します。
+
+        Parameters
+        ----------
+        error : BaseException, optional
+            発生した例外。成功した場合はNone。バックエンドの不調によらない例外
+            （キャンセル・429など）は失敗率に数えません。
+        probe : bool, default=False
+            :meth:`before_call` が試験的なリクエストとして許可したか。
+        """
+        if isinstance(error, openai.APIStatusError) and error.status_code == 429:
+            # レート制限は成功にも失敗にも数えない
+            success: Optional[bool] = None
+        elif error is None or isinstance(error, openai.APIStatusError) and not is_backend_failure(error):
+            success = True
+        elif is_backend_failure(error):
+            success = False
+        else:
+            success = None
+
+        with self._lock:
+            if probe:
+                self._probe_in_flight = False
+                if success is True:
+                    print("LLM APIのサーキットを閉じました（試験的なリクエストが成功）")
+                    self._state = "closed"
+                    self._results.clear()
+                elif success is False:
+                    self._open()
+                else:
+                    self._state = "half_open"
+                return
+
+            # サーキットを開く前に送信したリクエストの結果は判定に使わない
+            if success is None or self._state != "closed":
+                return
+            self._results.append(success)
+            failures = self._results.count(False)
+            if len(self._results) >= self.min_calls and failures / len(self._results) >= self.failure_rate:
+                print(f"LLM APIのサーキットを開きました（直近 {len(self._results)} 回中 {failures} 回失敗）。"
+                      f"{self.cooldown:.0f} 秒間はリクエストを送信しません")
+                self._open()
+
+    @contextlib.contextmanager
+    def guard(self) -> Iterator[None]:
+        """
+        with文の中のリクエストを許可するか確認し、終了時に結果を記録します。
+
+        with文の中で ``await`` してもかまいません。
+
+        Raises
+        ------
+        CircuitOpenError
+            サーキットが開いている場合。
+        """
+        probe = self.before_call()
+        try:
+            yield
+        except BaseException as e:
+            self.record_result(e, probe)
+            raise
+        self.record_result(None, probe)
+
+    def _open(self) -> None:
+        """
+        サーキットを開きます。ロックを取得した状態で呼び出します。
+        """
+        self._state = "open"
+        self._opened_at = time.monotonic()
+        self._results.clear()
+        self.opened += 1
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        サーキットブレーカーの統計情報を取得します。
+
+        Returns
+        -------
+        Dict[str, Any]
+            現在の状態・開いた回数・遮断したリクエスト数・直近の失敗率。
+        """
+        state = self.state
+        with self._lock:
+            results = list(self._results)
+        return {
+            "state": state,
+            "opened": self.opened,
+            "rejected": self.rejected,
+            "recent_calls": len(results),
+            "recent_failure_rate": round(results.count(False) / len(results), 3) if results else 0.0
+        }
+
+
+_default_breaker: Optional[CircuitBreaker] = None
+_default_breaker_lock = threading.Lock()
+
+
+def get_circuit_breaker() -> Optional[CircuitBreaker]:
+    """
+    プロセス全体で共有するサーキットブレーカーを取得します。
+
+    設定は環境変数 GROK_CIRCUIT_ENABLED・GROK_CIRCUIT_FAILURE_RATE・GROK_CIRCUIT_WINDOW・
+    GROK_CIRCUIT_MIN_CALLS・GROK_CIRCUIT_COOLDOWN（秒）から読み込みます。
+
+    Returns
+    -------
+    CircuitBreaker or None
+        共有のサーキットブレーカー。GROK_CIRCUIT_ENABLED が false の場合はNone。
+    """
+    global _default_breaker
+
+    if os.environ.get("GROK_CIRCUIT_ENABLED", "true").lower() in ("0", "false", "no", "off"):
+        return None
+
+    with _default_breaker_lock:
+        if _default_breaker is None:
+            _default_breaker = CircuitBreaker(
+                failure_rate=float(os.environ.get("GROK_CIRCUIT_FAILURE_RATE", DEFAULT_FAILURE_RATE)),
+                window=int(os.environ.get("GROK_CIRCUIT_WINDOW", DEFAULT_WINDOW)),
+                min_calls=int(os.environ.get("GROK_CIRCUIT_MIN_CALLS", DEFAULT_MIN_CALLS)),
+                cooldown=float(os.environ.get("GROK_CIRCUIT_COOLDOWN", DEFAULT_COOLDOWN))
+            )
+        return _default_breaker
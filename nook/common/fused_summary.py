@@ -0,0 +1,169 @@
+"""タイトル・本文の翻訳と要約を、1回の構造化出力（JSON）のリクエストでまとめて行うユーティリティ。"""
+
+import json
+import os
+import re
+from dataclasses import dataclass
+from typing import Any, Dict, Optional
+
+from nook.common.grok_client import AsyncGrok3Client
+from nook.common.llm_metrics import get_metrics
+
+# 本文の抜粋として翻訳する最大の文字数（日本語訳の文字数）
+EXCERPT_CHARS = 400
+
+# 応答の形式（OpenAI互換の構造化出力）
+RESPONSE_FORMAT: Dict[str, Any] = {
+    "type": "json_schema",
+    "json_schema": {
+        "name": "translated_summary",
+        "strict": True,
+        "schema": {
+            "type": "object",
+            "properties": {
+                "title": {"type": "string", "description": "タイトルの日本語訳"},
+                "text": {"type": "string", "description": "本文の抜粋の日本語訳"},
+                "summary": {"type": "string", "description": "日本語の要約"}
+            },
+            "required": ["title", "text", "summary"],
+            "additionalProperties": False
+        }
+    }
+}
+
+# 構造化出力に対応していないモデルでも同じ形式で返すよう、システム指示にも形式を明記する
+OUTPUT_INSTRUCTION = f"""
+結果は次のキーを持つJSONオブジェクトのみで出力してください。説明文は不要です。
+- "title": タイトルの日本語訳
+- "text": 本文の日本語訳。長い場合は冒頭の要点部分のみを{EXCERPT_CHARS}字以内で訳してください。本文がない場合は空文字列
+- "summary": 指定された形式の日本語の要約
+"""
+
+_JSON_OBJECT_PATTERN = re.compile(r"\{.*\}", re.DOTALL)
+
+
+@dataclass
+class FusedSummary:
+    """
+    翻訳と要約をまとめたリクエストの結果。
+
+    Parameters
+    ----------
+    title : str
+        タイトルの日本語訳。
+    text : str
+        本文の抜粋の日本語訳。本文がない場合は空文字列。
+    summary : str
+        日本語の要約。
+    """
+
+    title: str
+    text: str
+    summary: str
+
+
+def fused_summary_enabled() -> bool:
+    """
+    翻訳と要約をまとめたリクエストを使うかを取得します。
+
+    環境変数 FUSED_SUMMARY_ENABLED が false の場合は、従来どおり翻訳と要約を別々に行います。
+
+    Returns
+    -------
+    bool
+        使う場合はTrue。
+    """
+    return os.environ.get("FUSED_SUMMARY_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+
+
+def parse_response(response: Optional[str], has_text: bool) -> Optional[FusedSummary]:
+    """
+    応答を解析し、スキーマに従っているかを検証します。
+
+    Parameters
+    ----------
+    response : str or None
+        LLMの応答。
+    has_text : bool
+        元の本文があるか。Trueの場合は本文の訳が空の応答を不正とみなします。
+
+    Returns
+    -------
+    FusedSummary or None
+        解析した結果。JSONでない場合や、必須のキーが欠けている・文字列でない・空の場合はNone。
+    """
+    match = _JSON_OBJECT_PATTERN.search(response or "")
+    if not match:
+        print("Fused summary response is not a JSON object")
+        return None
+
+    try:
+        item = json.loads(match.group(0))
+    except json.JSONDecodeError as e:
+        print(f"Error parsing fused summary response: {str(e)}")
+        return None
+
+    if not isinstance(item, dict):
+        return None
+
+    fields = {}
+    for key in ("title", "text", "summary"):
+        value = item.get(key)
+        if not isinstance(value, str):
+            print(f"Fused summary response has no string '{key}'")
+            return None
+        fields[key] = value.strip()
+
+    if not fields["title"] or not fields["summary"] or (has_text and not fields["text"]):
+        print("Fused summary response has an empty field")
+        return None
+
+    return FusedSummary(**fields)
+
+
+async def translate_and_summarize(
+    client: AsyncGrok3Client,
+    prompt: str,
+    system_instruction: str,
+    has_text: bool,
+    call_site: Optional[str] = None
+) -> Optional[FusedSummary]:
+    """
+    タイトル・本文の翻訳と要約を1回のリクエストで生成します。
+
+    Parameters
+    ----------
+    client : AsyncGrok3Client
+        APIクライアント。
+    prompt : str
+        原文のタイトル・本文と要約の形式を含むプロンプト。
+    system_instruction : str
+        システム指示。末尾に出力形式の指示を追加して送信します。
+    has_text : bool
+        元の本文があるか。
+    call_site : str, optional
+        計測用の呼び出し元の名前（例: ``reddit.translate_and_summarize``）。
+
+    Returns
+    -------
+    FusedSummary or None
+        生成した結果。リクエストが失敗した場合や応答がスキーマに従っていない場合
+        （出力の上限で途中までのJSONになった場合を含む）はNone。
+        その場合、呼び出し元は翻訳と要約を別々に行ってください。やり直しの回数は計測結果に記録します。
+    """
+    try:
+        response = await client.generate_content(
+            prompt=prompt,
+            system_instruction=f"{system_instruction}\n{OUTPUT_INSTRUCTION}",
+            call_site=call_site,
+            response_format=RESPONSE_FORMAT
+        )
+    except Exception as e:
+        print(f"Error generating fused summary: {str(e)}")
+        get_metrics().record_fallback(call_site)
+        return None
+
+    result = parse_response(response, has_text)
+    if result is None:
+        get_metrics().record_fallback(call_site)
+    return result
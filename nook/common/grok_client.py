@@ -1,15 +1,195 @@
 """Grok3 API（OpenAI互換）クライアント。"""
 
+import asyncio
+import contextlib
+import importlib.util
 import os
-from typing import Dict, List, Optional, Union, Any
+import threading
+import time
+from typing import AsyncIterator, Dict, Iterator, List, Optional, Tuple, Union, Any
 
+import httpx
 import openai
-from tenacity import retry, stop_after_attempt, wait_exponential
+from tenacity import AsyncRetrying, Retrying, retry_if_not_exception_type, stop_after_attempt
 from dotenv import load_dotenv
 
+from nook.common.circuit_breaker import CircuitBreaker, CircuitOpenError, get_circuit_breaker
+from nook.common.llm_cache import LLMCache, get_default_cache
+from nook.common.llm_metrics import LLMMetrics, get_metrics
+from nook.common.llm_profiles import LLMProfiles, get_llm_profiles
+from nook.common.llm_scheduler import LLMScheduler, get_llm_scheduler
+from nook.common.rate_limiter import RateLimiter, get_rate_limiter, wait_retry_after
+from nook.common.token_counter import estimate_tokens
+
 # 環境変数の読み込み
 load_dotenv()
 
+# APIのベースURL（環境変数 GROK_BASE_URL で負荷試験用のスタブサーバーなどに切り替え可能）
+DEFAULT_BASE_URL = "https://api.x.ai/v1"
+
+# 非同期クライアントの同時リクエスト数のデフォルト値
+DEFAULT_MAX_CONCURRENCY = 8
+
+# 1回の呼び出しあたりの最大試行回数
+MAX_ATTEMPTS = 3
+
+# HTTPコネクションプールのデフォルト設定
+DEFAULT_HTTP_MAX_CONNECTIONS = 32
+DEFAULT_HTTP_MAX_KEEPALIVE = 16
+DEFAULT_HTTP_KEEPALIVE_EXPIRY = 60.0
+DEFAULT_HTTP_TIMEOUT = 120.0
+DEFAULT_HTTP_CONNECT_TIMEOUT = 10.0
+
+# ヘッジ（遅い応答に対する重複リクエスト）のデフォルト設定
+DEFAULT_HEDGE_QUANTILE = 0.95
+DEFAULT_HEDGE_MAX_RATE = 0.05
+DEFAULT_HEDGE_MIN_SAMPLES = 20
+DEFAULT_HEDGE_MIN_DELAY = 1.0
+DEFAULT_HEDGE_HEADROOM = 1
+
+
+def _retry_policy() -> Dict[str, Any]:
+    """
+    API呼び出しの再試行ポリシーを取得します。
+
+    サーキットが開いていて送信しなかった呼び出しは再試行しません。
+
+    Returns
+    -------
+    Dict[str, Any]
+        tenacityの Retrying / AsyncRetrying に渡す引数。
+    """
+    return {
+        "retry": retry_if_not_exception_type(CircuitOpenError),
+        "stop": stop_after_attempt(MAX_ATTEMPTS),
+        "wait": wait_retry_after(multiplier=1, min=2, max=10),
+        "reraise": True
+    }
+
+
+def _http_client_options() -> Dict[str, Any]:
+    """
+    LLM API用のHTTPクライアントの設定を取得します。
+
+    コネクションプールの上限とキープアライブの有効期間は環境変数
+    GROK_HTTP_MAX_CONNECTIONS・GROK_HTTP_MAX_KEEPALIVE・GROK_HTTP_KEEPALIVE_EXPIRY（秒）、
+    HTTP/2は GROK_HTTP2 から読み込みます。HTTP/2には h2 パッケージが必要です。
+
+    Returns
+    -------
+    Dict[str, Any]
+        httpx.Client / httpx.AsyncClient に渡す引数。
+    """
+    http2 = os.environ.get("GROK_HTTP2", "false").lower() in ("1", "true", "yes", "on")
+    if http2 and importlib.util.find_spec("h2") is None:
+        print("警告: GROK_HTTP2 が有効ですが h2 パッケージがないため、HTTP/1.1 を使用します。")
+        http2 = False
+
+    return {
+        "limits": httpx.Limits(
+            max_connections=int(os.environ.get("GROK_HTTP_MAX_CONNECTIONS", DEFAULT_HTTP_MAX_CONNECTIONS)),
+            max_keepalive_connections=int(os.environ.get("GROK_HTTP_MAX_KEEPALIVE", DEFAULT_HTTP_MAX_KEEPALIVE)),
+            keepalive_expiry=float(os.environ.get("GROK_HTTP_KEEPALIVE_EXPIRY", DEFAULT_HTTP_KEEPALIVE_EXPIRY))
+        ),
+        "timeout": httpx.Timeout(DEFAULT_HTTP_TIMEOUT, connect=DEFAULT_HTTP_CONNECT_TIMEOUT),
+        "http2": http2
+    }
+
+
+def _circuit_guard(breaker: Optional[CircuitBreaker]) -> Any:
+    """
+    サーキットブレーカーでリクエストを保護するコンテキストマネージャーを取得します。
+
+    Parameters
+    ----------
+    breaker : CircuitBreaker or None
+        サーキットブレーカー。Noneの場合は何もしません。
+
+    Returns
+    -------
+    ContextManager
+        with文で使用するコンテキストマネージャー。
+    """
+    return breaker.guard() if breaker else contextlib.nullcontext()
+
+
+def _scheduled(scheduler: Optional[LLMScheduler], call_site: Optional[str]) -> Any:
+    """
+    スケジューラーで送信枠を確保するコンテキストマネージャーを取得します。
+
+    Parameters
+    ----------
+    scheduler : LLMScheduler or None
+        スケジューラー。Noneの場合は何もしません。
+    call_site : str or None
+        呼び出し元の名前。優先度とサービスの判定に使います。
+
+    Returns
+    -------
+    ContextManager
+        with文で使用するコンテキストマネージャー。
+    """
+    return scheduler.lease(call_site) if scheduler else contextlib.nullcontext()
+
+
+def _scheduled_async(scheduler: Optional[LLMScheduler], call_site: Optional[str]) -> Any:
+    """
+    スケジューラーで送信枠を確保する非同期コンテキストマネージャーを取得します。
+
+    Parameters
+    ----------
+    scheduler : LLMScheduler or None
+        スケジューラー。Noneの場合は何もしません。
+    call_site : str or None
+        呼び出し元の名前。優先度とサービスの判定に使います。
+
+    Returns
+    -------
+    AsyncContextManager
+        async with文で使用するコンテキストマネージャー。
+    """
+    return scheduler.lease_async(call_site) if scheduler else contextlib.nullcontext()
+
+
+def _hedge_scheduled_async(scheduler: Optional[LLMScheduler], call_site: Optional[str], headroom: int) -> Any:
+    """
+    スケジューラーでヘッジ用の送信枠を待機せずに確保する非同期コンテキストマネージャーを取得します。
+
+    Parameters
+    ----------
+    scheduler : LLMScheduler or None
+        スケジューラー。Noneの場合は常に確保できたものとします。
+    call_site : str or None
+        呼び出し元の名前。優先度とサービスの判定に使います。
+    headroom : int
+        送信枠の数を超えて割り当ててよい数。
+
+    Returns
+    -------
+    AsyncContextManager
+        async with文で使用し、確保できたかをboolで返すコンテキストマネージャー。
+    """
+    return scheduler.lease_hedge_async(call_site, headroom) if scheduler else contextlib.nullcontext(True)
+
+
+def _estimate_request_tokens(messages: List[Dict[str, str]], max_tokens: int) -> int:
+    """
+    リクエストで消費するトークン数を見積もります。
+
+    Parameters
+    ----------
+    messages : List[Dict[str, str]]
+        送信するメッセージのリスト。
+    max_tokens : int
+        生成するトークンの最大数。
+
+    Returns
+    -------
+    int
+        入力トークン数の見積もりと生成トークン数の上限の合計。
+    """
+    return sum(estimate_tokens(message.get("content") or "") for message in messages) + max_tokens
+
 
 class Grok3Client:
     """
@@ -19,9 +199,30 @@ class Grok3Client:
     ----------
     api_key : str, optional
         Grok3 APIキー。指定しない場合は環境変数から取得。
+    cache : LLMCache, optional
+        レスポンスキャッシュ。指定しない場合はプロセス共有のキャッシュを使用。
+    rate_limiter : RateLimiter, optional
+        レートリミッター。指定しない場合はプロセス共有のレートリミッターを使用。
+    metrics : LLMMetrics, optional
+        呼び出しの計測器。指定しない場合はプロセス共有の計測器を使用。
+    circuit_breaker : CircuitBreaker, optional
+        サーキットブレーカー。指定しない場合はプロセス共有のサーキットブレーカーを使用。
+    profiles : LLMProfiles, optional
+        呼び出し元ごとのプロファイル。指定しない場合は設定ファイルから読み込んだプロファイルを使用。
+    scheduler : LLMScheduler, optional
+        対話的な呼び出しを優先して送信枠を割り当てるスケジューラー。指定しない場合はプロセス共有のスケジューラーを使用。
     """
     
-    def __init__(self, api_key: Optional[str] = None):
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        cache: Optional[LLMCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[LLMMetrics] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        profiles: Optional[LLMProfiles] = None,
+        scheduler: Optional[LLMScheduler] = None
+    ):
         """
         Grok3Clientを初期化します。
         
@@ -29,24 +230,289 @@ class Grok3Client:
         ----------
         api_key : str, optional
             Grok3 APIキー。指定しない場合は環境変数から取得。
+        cache : LLMCache, optional
+            レスポンスキャッシュ。指定しない場合はプロセス共有のキャッシュを使用。
+        rate_limiter : RateLimiter, optional
+            レートリミッター。指定しない場合はプロセス共有のレートリミッターを使用。
+        metrics : LLMMetrics, optional
+            呼び出しの計測器。指定しない場合はプロセス共有の計測器を使用。
+        circuit_breaker : CircuitBreaker, optional
+            サーキットブレーカー。指定しない場合はプロセス共有のサーキットブレーカーを使用。
+        profiles : LLMProfiles, optional
+            呼び出し元ごとのプロファイル。指定しない場合は設定ファイルから読み込んだプロファイルを使用。
+        scheduler : LLMScheduler, optional
+            送信枠を割り当てるスケジューラー。指定しない場合はプロセス共有のスケジューラーを使用。
         """
         self.api_key = api_key or os.environ.get("GROK_API_KEY")
         if not self.api_key:
             raise ValueError("GROK_API_KEY must be provided or set as an environment variable")
         
         # X.AI APIの設定
-        self.base_url = 'https://api.x.ai/v1'
+        self.base_url = os.environ.get("GROK_BASE_URL", DEFAULT_BASE_URL)
         # openai.api_key = self.api_key
         # openai.api_base = self.base_url
 
-        self.client = openai.OpenAI(api_key=self.api_key, base_url=self.base_url)
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
+        # 再試行はレートリミッターと連携するtenacity側で行う
+        self.client = openai.OpenAI(
+            api_key=self.api_key,
+            base_url=self.base_url,
+            max_retries=0,
+            http_client=httpx.Client(**_http_client_options())
+        )
+        self.cache = cache or get_default_cache()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.metrics = metrics or get_metrics()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker()
+        self.profiles = profiles or get_llm_profiles()
+        self.scheduler = scheduler or get_llm_scheduler()
+    
+    def _send(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        call_site: Optional[str] = None
+    ) -> Any:
+        """
+        スケジューラーとレートリミッターで枠を確保してChat Completions APIを1回呼び出します。
+        
+        サーキットが開いている場合は送信せずに :class:`CircuitOpenError` を送出します。
+        
+        Parameters
+        ----------
+        model : str
+            使用するモデル。
+        messages : List[Dict[str, str]]
+            送信するメッセージのリスト。
+        temperature : float
+            生成の多様性を制御するパラメータ。
+        max_tokens : int
+            生成するトークンの最大数。
+        call_site : str, optional
+            呼び出し元の名前。送信枠の優先度の判定に使います。
+            
+        Returns
+        -------
+        ChatCompletion
+            APIのレスポンス。
+        """
+        reserved_tokens = _estimate_request_tokens(messages, max_tokens)
+        with _scheduled(self.scheduler, call_site), _circuit_guard(self.circuit_breaker):
+            self.rate_limiter.acquire(reserved_tokens)
+            try:
+                raw_response = self.client.chat.completions.with_raw_response.create(
+                    model=model,
+                    messages=messages,
+                    temperature=temperature,
+                    max_tokens=max_tokens
+                )
+            except openai.APIStatusError as e:
+                self.rate_limiter.release(
+                    reserved_tokens,
+                    headers=e.response.headers,
+                    rate_limited=e.status_code == 429
+                )
+                raise
+            except Exception:
+                self.rate_limiter.release(reserved_tokens)
+                raise
+        
+        response = raw_response.parse()
+        self.rate_limiter.release(
+            reserved_tokens,
+            used_tokens=response.usage.total_tokens if response.usage else None,
+            headers=raw_response.headers,
+            succeeded=True
+        )
+        return response
+    
+    def _create_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        call_site: Optional[str] = None
+    ) -> str:
+        """
+        Chat Completions APIを呼び出します。キャッシュにあればそれを返します。
+        
+        失敗した場合は再試行し、呼び出し全体のレイテンシ・トークン数・再試行回数・
+        キャッシュの利用状況を呼び出し元ごとに記録します。
+        
+        Parameters
+        ----------
+        messages : List[Dict[str, str]]
+            送信するメッセージのリスト。
+        temperature : float or None
+            生成の多様性を制御するパラメータ。Noneの場合は呼び出し元のプロファイルの値。
+        max_tokens : int or None
+            生成するトークンの最大数。Noneの場合は呼び出し元のプロファイルから計算した値。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``reddit.translate_comment``）。
+            
+        Returns
+        -------
+        str
+            生成されたテキスト。
+        """
+        started_at = time.perf_counter()
+        model, temperature, max_tokens = self.profiles.resolve(call_site, messages, temperature, max_tokens)
+        
+        cache_key = None
+        if self.cache:
+            cache_key = LLMCache.make_key(model, messages, temperature, max_tokens)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.metrics.record(call_site, time.perf_counter() - started_at, cache_hit=True)
+                return cached
+        
+        retries = 0
+        try:
+            for attempt in Retrying(**_retry_policy()):
+                with attempt:
+                    retries = attempt.retry_state.attempt_number - 1
+                    response = self._send(model, messages, temperature, max_tokens, call_site)
+        except Exception:
+            self.metrics.record(call_site, time.perf_counter() - started_at, retries=retries, error=True)
+            raise
+        
+        usage = response.usage
+        self.metrics.record(
+            call_site,
+            time.perf_counter() - started_at,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            retries=retries
+        )
+        content = response.choices[0].message.content
+        
+        if cache_key and content is not None:
+            self.cache.set(cache_key, content)
+        
+        return content
+    
+    def _stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        call_site: Optional[str] = None
+    ) -> Iterator[str]:
+        """
+        Chat Completions APIをストリーミングで呼び出し、生成されたテキストを順に返します。
+        
+        キャッシュにあれば全文を1回で返します。再試行は最初の応答を受け取るまでの
+        接続確立時のみ行い、完了後に全文をキャッシュへ保存します。
+        
+        Parameters
+        ----------
+        messages : List[Dict[str, str]]
+            送信するメッセージのリスト。
+        temperature : float or None
+            生成の多様性を制御するパラメータ。Noneの場合は呼び出し元のプロファイルの値。
+        max_tokens : int or None
+            生成するトークンの最大数。Noneの場合は呼び出し元のプロファイルから計算した値。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``api.chat``）。
+            
+        Yields
+        ------
+        str
+            生成されたテキストの断片。
+        """
+        started_at = time.perf_counter()
+        model, temperature, max_tokens = self.profiles.resolve(call_site, messages, temperature, max_tokens)
+        
+        cache_key = None
+        if self.cache:
+            cache_key = LLMCache.make_key(model, messages, temperature, max_tokens)
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.metrics.record(call_site, time.perf_counter() - started_at, cache_hit=True)
+                yield cached
+                return
+        
+        reserved_tokens = _estimate_request_tokens(messages, max_tokens)
+        retries = 0
+        first_token_latency = None
+        chunks = []
+        try:
+            # ストリームを読み終えるまで送信枠を保持する
+            with _scheduled(self.scheduler, call_site):
+                for attempt in Retrying(**_retry_policy()):
+                    with attempt:
+                        retries = attempt.retry_state.attempt_number - 1
+                        with contextlib.ExitStack() as guard:
+                            guard.enter_context(_circuit_guard(self.circuit_breaker))
+                            self.rate_limiter.acquire(reserved_tokens)
+                            try:
+                                raw_response = self.client.chat.completions.with_raw_response.create(
+                                    model=model,
+                                    messages=messages,
+                                    temperature=temperature,
+                                    max_tokens=max_tokens,
+                                    stream=True
+                                )
+                            except openai.APIStatusError as e:
+                                self.rate_limiter.release(
+                                    reserved_tokens,
+                                    headers=e.response.headers,
+                                    rate_limited=e.status_code == 429
+                                )
+                                raise
+                            except Exception:
+                                self.rate_limiter.release(reserved_tokens)
+                                raise
+                            # 接続できた場合は、ストリームを読み終えるまでサーキットへの結果の記録を保留する
+                            stream_guard = guard.pop_all()
+                
+                # 読み込み中の接続の切断やタイムアウトもサーキットブレーカーに記録する
+                with stream_guard:
+                    stream = raw_response.parse()
+                    # 途中で失敗・中断したストリームでは同時実行数を増やさない
+                    completed = False
+                    try:
+                        for chunk in stream:
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                if first_token_latency is None:
+                                    first_token_latency = time.perf_counter() - started_at
+                                chunks.append(delta)
+                                yield delta
+                        completed = True
+                    finally:
+                        stream.close()
+                        self.rate_limiter.release(
+                            reserved_tokens,
+                            used_tokens=_estimate_request_tokens(messages, 0) + estimate_tokens("".join(chunks)),
+                            headers=raw_response.headers,
+                            succeeded=completed
+                        )
+        except Exception:
+            self.metrics.record(call_site, time.perf_counter() - started_at, retries=retries, error=True)
+            raise
+        
+        content = "".join(chunks)
+        self.metrics.record(
+            call_site,
+            time.perf_counter() - started_at,
+            prompt_tokens=_estimate_request_tokens(messages, 0),
+            completion_tokens=estimate_tokens(content),
+            retries=retries,
+            first_token_latency=first_token_latency
+        )
+        
+        if cache_key and content:
+            self.cache.set(cache_key, content)
+    
     def generate_content(
         self, 
         prompt: str, 
         system_instruction: Optional[str] = None,
-        temperature: float = 0.7,
-        max_tokens: int = 1000
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        call_site: Optional[str] = None
     ) -> str:
         """
         テキストを生成します。
@@ -57,10 +523,12 @@ class Grok3Client:
             生成のためのプロンプト。
         system_instruction : str, optional
             システム指示。
-        temperature : float, default=0.7
-            生成の多様性を制御するパラメータ。
-        max_tokens : int, default=1000
-            生成するトークンの最大数。
+        temperature : float, optional
+            生成の多様性を制御するパラメータ。指定しない場合は呼び出し元のプロファイルの値。
+        max_tokens : int, optional
+            生成するトークンの最大数。指定しない場合は呼び出し元のプロファイルで入力の長さから計算します。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``reddit.translate_comment``）。
             
         Returns
         -------
@@ -74,18 +542,8 @@ class Grok3Client:
         
         messages.append({"role": "user", "content": prompt})
         
-        # 新しいOpenAI APIの使用方法
-        
-        response = self.client.chat.completions.create(
-            model="grok-2-latest",
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        
-        return response.choices[0].message.content
+        return self._create_completion(messages, temperature, max_tokens, call_site)
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     def create_chat(
         self,
         system_instruction: Optional[str] = None
@@ -110,13 +568,13 @@ class Grok3Client:
         
         return {"messages": messages}
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     def send_message(
         self,
         chat_session: Dict[str, Any],
         message: str,
-        temperature: float = 0.7,
-        max_tokens: int = 1000
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        call_site: Optional[str] = None
     ) -> str:
         """
         チャットセッションにメッセージを送信します。
@@ -127,10 +585,12 @@ class Grok3Client:
             チャットセッション情報。
         message : str
             送信するメッセージ。
-        temperature : float, default=0.7
-            生成の多様性を制御するパラメータ。
-        max_tokens : int, default=1000
-            生成するトークンの最大数。
+        temperature : float, optional
+            生成の多様性を制御するパラメータ。指定しない場合は呼び出し元のプロファイルの値。
+        max_tokens : int, optional
+            生成するトークンの最大数。指定しない場合は呼び出し元のプロファイルで入力の長さから計算します。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``reddit.translate_comment``）。
             
         Returns
         -------
@@ -139,26 +599,19 @@ class Grok3Client:
         """
         chat_session["messages"].append({"role": "user", "content": message})
         
-        response = self.client.chat.completions.create(
-            model="grok-2-latest",
-            messages=chat_session["messages"],
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        
-        assistant_message = response.choices[0].message.content
+        assistant_message = self._create_completion(chat_session["messages"], temperature, max_tokens, call_site)
         chat_session["messages"].append({"role": "assistant", "content": assistant_message})
         
         return assistant_message
     
-    @retry(stop=stop_after_attempt(3), wait=wait_exponential(multiplier=1, min=2, max=10))
     def chat_with_search(
         self,
         message: str,
         context: str,
         chat_history: Optional[List[Dict[str, str]]] = None,
-        temperature: float = 0.7,
-        max_tokens: int = 1000
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        call_site: Optional[str] = None
     ) -> str:
         """
         検索機能付きチャットを実行します。
@@ -171,10 +624,12 @@ class Grok3Client:
             検索コンテキスト。
         chat_history : List[Dict[str, str]], optional
             チャット履歴。
-        temperature : float, default=0.7
-            生成の多様性を制御するパラメータ。
-        max_tokens : int, default=1000
-            生成するトークンの最大数。
+        temperature : float, optional
+            生成の多様性を制御するパラメータ。指定しない場合は呼び出し元のプロファイルの値。
+        max_tokens : int, optional
+            生成するトークンの最大数。指定しない場合は呼び出し元のプロファイルで入力の長さから計算します。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``reddit.translate_comment``）。
             
         Returns
         -------
@@ -193,22 +648,17 @@ class Grok3Client:
         
         messages.append({"role": "user", "content": f"コンテキスト: {context}\n\n質問: {message}"})
         
-        response = self.client.chat.completions.create(
-            model="grok-2-latest",
-            messages=messages,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
-        
-        return response.choices[0].message.content
+        return self._create_completion(messages, temperature, max_tokens, call_site)
         
     def chat(
         self,
         messages: List[Dict[str, str]],
         system: Optional[str] = None,
-        temperature: float = 0.7,
-        max_tokens: int = 1000
-    ) -> str:
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        call_site: Optional[str] = None,
+        stream: bool = False
+    ) -> Union[str, Iterator[str]]:
         """
         チャットを実行します。
         
@@ -218,15 +668,19 @@ class Grok3Client:
             メッセージのリスト。
         system : str, optional
             システム指示。
-        temperature : float, default=0.7
-            生成の多様性を制御するパラメータ。
-        max_tokens : int, default=1000
-            生成するトークンの最大数。
+        temperature : float, optional
+            生成の多様性を制御するパラメータ。指定しない場合は呼び出し元のプロファイルの値。
+        max_tokens : int, optional
+            生成するトークンの最大数。指定しない場合は呼び出し元のプロファイルで入力の長さから計算します。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``reddit.translate_comment``）。
+        stream : bool, default=False
+            Trueの場合、応答を生成されたそばから返すイテレータを返します。
             
         Returns
         -------
-        str
-            AIの応答。
+        str or Iterator[str]
+            AIの応答。stream=Trueの場合は応答の断片を順に返すイテレータ。
         """
         all_messages = []
         
@@ -235,11 +689,758 @@ class Grok3Client:
         
         all_messages.extend(messages)
         
-        response = self.client.chat.completions.create(
-            model="grok-2-latest",
-            messages=all_messages,
-            temperature=temperature,
-            max_tokens=max_tokens
-        )
+        if stream:
+            return self._stream_completion(all_messages, temperature, max_tokens, call_site)
         
-        return response.choices[0].message.content 
\ No newline at end of file
+        return self._create_completion(all_messages, temperature, max_tokens, call_site)
+    
+    def close(self) -> None:
+        """
+        HTTPコネクションプールを閉じます。
+        """
+        self.client.close()
+
+
+class AsyncGrok3Client:
+    """
+    Grok3 API（OpenAI互換）との非同期通信を担当するクライアントクラス。
+
+    同時に送信するリクエスト数をセマフォで制限しながら、
+    複数のリクエストを並行して処理します。
+
+    HTTPコネクションプールとセマフォはイベントループごとに作成するため、
+    ``asyncio.run`` を複数回呼び出すプロセスでも1つのインスタンスを共有できます。
+
+    ヘッジを有効にすると、呼び出し元ごとに観測したレイテンシのp95（GROK_HEDGE_QUANTILE）を
+    過ぎても応答がないリクエストについて同じリクエストをもう1つ送信し、先に返った応答を
+    採用してもう一方をキャンセルします。ヘッジを送る割合は GROK_HEDGE_MAX_RATE で制限します。
+
+    Parameters
+    ----------
+    api_key : str, optional
+        Grok3 APIキー。指定しない場合は環境変数から取得。
+    max_concurrency : int, optional
+        同時に送信するリクエストの上限。指定しない場合は環境変数
+        GROK_MAX_CONCURRENCY から取得（未設定の場合は8）。
+    cache : LLMCache, optional
+        レスポンスキャッシュ。指定しない場合はプロセス共有のキャッシュを使用。
+    rate_limiter : RateLimiter, optional
+        レートリミッター。指定しない場合はプロセス共有のレートリミッターを使用。
+    metrics : LLMMetrics, optional
+        呼び出しの計測器。指定しない場合はプロセス共有の計測器を使用。
+    hedge : bool, optional
+        ヘッジを有効にするか。指定しない場合は環境変数 GROK_HEDGE_ENABLED から取得（未設定の場合は無効）。
+    circuit_breaker : CircuitBreaker, optional
+        サーキットブレーカー。指定しない場合はプロセス共有のサーキットブレーカーを使用。
+    profiles : LLMProfiles, optional
+        呼び出し元ごとのプロファイル。指定しない場合は設定ファイルから読み込んだプロファイルを使用。
+    scheduler : LLMScheduler, optional
+        対話的な呼び出しを優先して送信枠を割り当てるスケジューラー。指定しない場合はプロセス共有のスケジューラーを使用。
+    """
+
+    def __init__(
+        self,
+        api_key: Optional[str] = None,
+        max_concurrency: Optional[int] = None,
+        cache: Optional[LLMCache] = None,
+        rate_limiter: Optional[RateLimiter] = None,
+        metrics: Optional[LLMMetrics] = None,
+        hedge: Optional[bool] = None,
+        circuit_breaker: Optional[CircuitBreaker] = None,
+        profiles: Optional[LLMProfiles] = None,
+        scheduler: Optional[LLMScheduler] = None
+    ):
+        """
+        AsyncGrok3Clientを初期化します。
+
+        Parameters
+        ----------
+        api_key : str, optional
+            Grok3 APIキー。指定しない場合は環境変数から取得。
+        max_concurrency : int, optional
+            同時に送信するリクエストの上限。指定しない場合は環境変数
+            GROK_MAX_CONCURRENCY から取得（未設定の場合は8）。
+        cache : LLMCache, optional
+            レスポンスキャッシュ。指定しない場合はプロセス共有のキャッシュを使用。
+        rate_limiter : RateLimiter, optional
+            レートリミッター。指定しない場合はプロセス共有のレートリミッターを使用。
+        metrics : LLMMetrics, optional
+            呼び出しの計測器。指定しない場合はプロセス共有の計測器を使用。
+        hedge : bool, optional
+            ヘッジを有効にするか。指定しない場合は環境変数 GROK_HEDGE_ENABLED から取得。
+        circuit_breaker : CircuitBreaker, optional
+            サーキットブレーカー。指定しない場合はプロセス共有のサーキットブレーカーを使用。
+        profiles : LLMProfiles, optional
+            呼び出し元ごとのプロファイル。指定しない場合は設定ファイルから読み込んだプロファイルを使用。
+        scheduler : LLMScheduler, optional
+            送信枠を割り当てるスケジューラー。指定しない場合はプロセス共有のスケジューラーを使用。
+        """
+        self.api_key = api_key or os.environ.get("GROK_API_KEY")
+        if not self.api_key:
+            raise ValueError("GROK_API_KEY must be provided or set as an environment variable")
+
+        if hedge is None:
+            hedge = os.environ.get("GROK_HEDGE_ENABLED", "false").lower() in ("1", "true", "yes", "on")
+        self.hedge = hedge
+        self.hedge_quantile = float(os.environ.get("GROK_HEDGE_QUANTILE", DEFAULT_HEDGE_QUANTILE))
+        self.hedge_max_rate = float(os.environ.get("GROK_HEDGE_MAX_RATE", DEFAULT_HEDGE_MAX_RATE))
+        self.hedge_min_samples = int(os.environ.get("GROK_HEDGE_MIN_SAMPLES", DEFAULT_HEDGE_MIN_SAMPLES))
+        self.hedge_min_delay = float(os.environ.get("GROK_HEDGE_MIN_DELAY", DEFAULT_HEDGE_MIN_DELAY))
+        self.hedge_headroom = int(os.environ.get("GROK_HEDGE_HEADROOM", DEFAULT_HEDGE_HEADROOM))
+
+        self.max_concurrency = max_concurrency or int(
+            os.environ.get("GROK_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY)
+        )
+        if self.max_concurrency < 1:
+            raise ValueError("max_concurrency must be a positive integer")
+
+        # X.AI APIの設定
+        self.base_url = os.environ.get("GROK_BASE_URL", DEFAULT_BASE_URL)
+
+        self._loop_resources: Dict[asyncio.AbstractEventLoop, Tuple[openai.AsyncOpenAI, asyncio.Semaphore]] = {}
+        self._loop_resources_lock = threading.Lock()
+        self.cache = cache or get_default_cache()
+        self.rate_limiter = rate_limiter or get_rate_limiter()
+        self.metrics = metrics or get_metrics()
+        self.circuit_breaker = circuit_breaker or get_circuit_breaker()
+        self.profiles = profiles or get_llm_profiles()
+        self.scheduler = scheduler or get_llm_scheduler()
+
+    def _resources(self) -> Tuple[openai.AsyncOpenAI, asyncio.Semaphore]:
+        """
+        実行中のイベントループ用のAPIクライアントとセマフォを取得します。
+
+        Returns
+        -------
+        Tuple[openai.AsyncOpenAI, asyncio.Semaphore]
+            コネクションプールを持つAPIクライアントと、同時実行数を制限するセマフォ。
+        """
+        loop = asyncio.get_running_loop()
+        with self._loop_resources_lock:
+            resources = self._loop_resources.get(loop)
+            if resources is None:
+                # 終了したイベントループのコネクションは再利用できないため破棄する
+                for closed_loop in [key for key in self._loop_resources if key.is_closed()]:
+                    del self._loop_resources[closed_loop]
+
+                # 再試行はレートリミッターと連携するtenacity側で行う
+                client = openai.AsyncOpenAI(
+                    api_key=self.api_key,
+                    base_url=self.base_url,
+                    max_retries=0,
+                    http_client=httpx.AsyncClient(**_http_client_options())
+                )
+                resources = (client, asyncio.Semaphore(self.max_concurrency))
+                self._loop_resources[loop] = resources
+            return resources
+
+    async def aclose(self) -> None:
+        """
+        実行中のイベントループのHTTPコネクションプールを閉じます。
+        """
+        loop = asyncio.get_running_loop()
+        with self._loop_resources_lock:
+            resources = self._loop_resources.pop(loop, None)
+        if resources:
+            await resources[0].close()
+
+    async def _send(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        call_site: Optional[str] = None,
+        sent: Optional[asyncio.Event] = None,
+        hedge: bool = False,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        同時実行数の上限内でChat Completions APIを1回呼び出します。
+
+        送信前にスケジューラーとプロセス共有のレートリミッターで枠を確保します。
+        サーキットが開いている場合は送信せずに :class:`CircuitOpenError` を送出します。
+        ヘッジの場合は枠の空きを待たず、スケジューラーの送信枠とレートリミッターの同時実行数を
+        ``hedge_headroom`` 個まで超えて確保します。それでも確保できなければ送信しません。
+
+        Parameters
+        ----------
+        model : str
+            使用するモデル。
+        messages : List[Dict[str, str]]
+            送信するメッセージのリスト。
+        temperature : float
+            生成の多様性を制御するパラメータ。
+        max_tokens : int
+            生成するトークンの最大数。
+        call_site : str, optional
+            計測用の呼び出し元の名前。
+        sent : asyncio.Event, optional
+            枠を確保してリクエストを送信する直前にセットするイベント。
+        hedge : bool, default=False
+            Trueの場合、ヘッジとして同時実行数のセマフォを待たずに送信します。
+        response_format : Dict[str, Any], optional
+            応答の形式（構造化出力のJSON Schemaなど）。
+
+        Returns
+        -------
+        ChatCompletion or None
+            APIのレスポンス。ヘッジの枠を確保できず送信しなかった場合はNone。
+        """
+        # リトライ待機中はスロットを保持しないよう、API呼び出しの間だけ取得する
+        reserved_tokens = _estimate_request_tokens(messages, max_tokens)
+        client, semaphore = self._resources()
+        # 送信枠はセマフォより先に確保し、待機中の呼び出しをスケジューラーの順番で並べる
+        # （レートリミッターの空きを待つ間もスケジューラーが枠の期限を延ばすため失効しない）
+        if hedge:
+            scheduled = _hedge_scheduled_async(self.scheduler, call_site, self.hedge_headroom)
+        else:
+            scheduled = _scheduled_async(self.scheduler, call_site)
+        async with scheduled as admitted:
+            # 送信しなかったヘッジをサーキットブレーカーに記録しないよう、サーキットの確認より先に判定する
+            if hedge and not (admitted and self.rate_limiter.try_acquire(reserved_tokens, self.hedge_headroom)):
+                self.metrics.record_hedge(call_site, admitted=False)
+                return None
+            async with contextlib.nullcontext() if hedge else semaphore:
+                try:
+                    # 枠を待つ間にサーキットが開いた場合もここで即座に失敗させる
+                    with _circuit_guard(self.circuit_breaker):
+                        if hedge:
+                            self.metrics.record_hedge(call_site, admitted=True)
+                        else:
+                            await self.rate_limiter.acquire_async(reserved_tokens)
+                        if sent:
+                            sent.set()
+                        sent_at = time.perf_counter()
+                        try:
+                            raw_response = await client.chat.completions.with_raw_response.create(
+                                model=model,
+                                messages=messages,
+                                temperature=temperature,
+                                max_tokens=max_tokens,
+                                response_format=response_format or openai.NOT_GIVEN
+                            )
+                        except openai.APIStatusError as e:
+                            self.rate_limiter.release(
+                                reserved_tokens,
+                                headers=e.response.headers,
+                                rate_limited=e.status_code == 429
+                            )
+                            raise
+                        except BaseException:
+                            self.rate_limiter.release(reserved_tokens)
+                            raise
+                except CircuitOpenError:
+                    # ヘッジはサーキットの確認より先にレートリミッターの枠を確保しているため返す
+                    if hedge:
+                        self.rate_limiter.release(reserved_tokens)
+                    raise
+
+        response = raw_response.parse()
+        self.rate_limiter.release(
+            reserved_tokens,
+            used_tokens=response.usage.total_tokens if response.usage else None,
+            headers=raw_response.headers,
+            succeeded=True
+        )
+        self.metrics.record_attempt(call_site, time.perf_counter() - sent_at)
+        return response
+
+    def _hedge_delay(self, call_site: Optional[str]) -> Optional[float]:
+        """
+        ヘッジを送信するまでの待機時間を取得します。
+
+        Parameters
+        ----------
+        call_site : str, optional
+            計測用の呼び出し元の名前。
+
+        Returns
+        -------
+        float or None
+            待機秒数。レイテンシの記録が足りない場合はNone。
+        """
+        latency = self.metrics.latency_percentile(
+            call_site, self.hedge_quantile, self.hedge_min_samples, attempt=True
+        )
+        if latency is None:
+            return None
+        return max(latency, self.hedge_min_delay)
+
+    async def _send_hedged(
+        self,
+        model: str,
+        messages: List[Dict[str, str]],
+        temperature: float,
+        max_tokens: int,
+        call_site: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> Any:
+        """
+        Chat Completions APIを呼び出し、応答が遅い場合は重複リクエスト（ヘッジ）を送信します。
+
+        送信してからの経過時間が、呼び出し元ごとに観測した送信から応答までの時間の
+        パーセンタイルを超えた場合にヘッジを送信し、先に成功した応答を返して
+        もう一方をキャンセルします。ヘッジは同時実行数の空きを待たずに、スケジューラーと
+        レートリミッターの上限を ``hedge_headroom`` 個まで超えて送信するため、送る割合は
+        呼び出し元ごとに ``hedge_max_rate`` 以下に制限します。上限を超えても空きがない場合は
+        ヘッジを送らずに元のリクエストを待ちます。ヘッジを送れた回数と送れなかった回数は計測結果に記録します。
+
+        Parameters
+        ----------
+        model : str
+            使用するモデル。
+        messages : List[Dict[str, str]]
+            送信するメッセージのリスト。
+        temperature : float
+            生成の多様性を制御するパラメータ。
+        max_tokens : int
+            生成するトークンの最大数。
+        call_site : str, optional
+            計測用の呼び出し元の名前。
+        response_format : Dict[str, Any], optional
+            応答の形式（構造化出力のJSON Schemaなど）。
+
+        Returns
+        -------
+        ChatCompletion
+            APIのレスポンス。
+        """
+        if not self.hedge:
+            return await self._send(
+                model, messages, temperature, max_tokens, call_site, response_format=response_format
+            )
+
+        self.metrics.record_hedge_eligible(call_site)
+        sent = asyncio.Event()
+        primary = asyncio.ensure_future(self._send(
+            model, messages, temperature, max_tokens, call_site, sent=sent, response_format=response_format
+        ))
+        sent_waiter = asyncio.ensure_future(sent.wait())
+        hedge = None
+        try:
+            # 同時実行数やレート制限の空きを待っている間はヘッジしない
+            await asyncio.wait({primary, sent_waiter}, return_when=asyncio.FIRST_COMPLETED)
+            if primary.done():
+                return await primary
+            sent_at = time.perf_counter()
+
+            # 一斉に送信した直後はレイテンシの記録がないため、待っている間に判定し直す
+            while True:
+                delay = self._hedge_delay(call_site)
+                elapsed = time.perf_counter() - sent_at
+                if delay is not None and elapsed >= delay:
+                    break
+                timeout = delay - elapsed if delay is not None else self.hedge_min_delay
+                done, _ = await asyncio.wait({primary}, timeout=timeout)
+                if done:
+                    return await primary
+
+            if self.metrics.hedge_rate(call_site) >= self.hedge_max_rate:
+                return await primary
+            # バックエンドが不調な間は重複リクエストで負荷を増やさない
+            if self.circuit_breaker and self.circuit_breaker.state != "closed":
+                return await primary
+
+            hedge = asyncio.ensure_future(
+                self._send(
+                    model, messages, temperature, max_tokens, call_site,
+                    hedge=True, response_format=response_format
+                )
+            )
+            pending = {primary, hedge}
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is not None:
+                        error = error or task.exception()
+                    elif task is primary:
+                        return task.result()
+                    elif task.result() is not None:
+                        self.metrics.record_hedge_won(call_site)
+                        return task.result()
+
+            raise error
+        finally:
+            for task in (primary, hedge, sent_waiter):
+                if task is not None and not task.done():
+                    task.cancel()
+
+    async def _create_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        call_site: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        Chat Completions APIを呼び出します。キャッシュにあればそれを返します。
+
+        失敗した場合は再試行し、呼び出し全体のレイテンシ・トークン数・再試行回数・
+        キャッシュの利用状況を呼び出し元ごとに記録します。
+
+        Parameters
+        ----------
+        messages : List[Dict[str, str]]
+            送信するメッセージのリスト。
+        temperature : float or None
+            生成の多様性を制御するパラメータ。Noneの場合は呼び出し元のプロファイルの値。
+        max_tokens : int or None
+            生成するトークンの最大数。Noneの場合は呼び出し元のプロファイルから計算した値。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``reddit.translate_comment``）。
+        response_format : Dict[str, Any], optional
+            応答の形式（構造化出力のJSON Schemaなど）。
+
+        Returns
+        -------
+        str
+            生成されたテキスト。
+        """
+        started_at = time.perf_counter()
+        model, temperature, max_tokens = self.profiles.resolve(call_site, messages, temperature, max_tokens)
+
+        cache_key = None
+        if self.cache:
+            cache_key = LLMCache.make_key(model, messages, temperature, max_tokens, response_format)
+            # キャッシュのファイルは他のプロセスと共有するため、書き込みの待ちでイベントループを止めない
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                self.metrics.record(call_site, time.perf_counter() - started_at, cache_hit=True)
+                return cached
+
+        retries = 0
+        try:
+            async for attempt in AsyncRetrying(**_retry_policy()):
+                with attempt:
+                    retries = attempt.retry_state.attempt_number - 1
+                    response = await self._send_hedged(
+                        model, messages, temperature, max_tokens, call_site, response_format
+                    )
+        except Exception:
+            self.metrics.record(call_site, time.perf_counter() - started_at, retries=retries, error=True)
+            raise
+
+        usage = response.usage
+        self.metrics.record(
+            call_site,
+            time.perf_counter() - started_at,
+            prompt_tokens=usage.prompt_tokens if usage else 0,
+            completion_tokens=usage.completion_tokens if usage else 0,
+            retries=retries
+        )
+        content = response.choices[0].message.content
+
+        if cache_key and content is not None:
+            await asyncio.to_thread(self.cache.set, cache_key, content)
+
+        return content
+
+    async def _stream_completion(
+        self,
+        messages: List[Dict[str, str]],
+        temperature: Optional[float],
+        max_tokens: Optional[int],
+        call_site: Optional[str] = None
+    ) -> AsyncIterator[str]:
+        """
+        Chat Completions APIをストリーミングで呼び出し、生成されたテキストを順に返します。
+
+        キャッシュにあれば全文を1回で返します。再試行は最初の応答を受け取るまでの
+        接続確立時のみ行い、完了後に全文をキャッシュへ保存します。
+        ストリームを読み終えるまで同時実行数のスロットとスケジューラーの送信枠を保持します。
+
+        Parameters
+        ----------
+        messages : List[Dict[str, str]]
+            送信するメッセージのリスト。
+        temperature : float or None
+            生成の多様性を制御するパラメータ。Noneの場合は呼び出し元のプロファイルの値。
+        max_tokens : int or None
+            生成するトークンの最大数。Noneの場合は呼び出し元のプロファイルから計算した値。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``api.chat``）。
+
+        Yields
+        ------
+        str
+            生成されたテキストの断片。
+        """
+        started_at = time.perf_counter()
+        model, temperature, max_tokens = self.profiles.resolve(call_site, messages, temperature, max_tokens)
+
+        cache_key = None
+        if self.cache:
+            cache_key = LLMCache.make_key(model, messages, temperature, max_tokens)
+            # キャッシュのファイルは他のプロセスと共有するため、書き込みの待ちでイベントループを止めない
+            cached = await asyncio.to_thread(self.cache.get, cache_key)
+            if cached is not None:
+                self.metrics.record(call_site, time.perf_counter() - started_at, cache_hit=True)
+                yield cached
+                return
+
+        reserved_tokens = _estimate_request_tokens(messages, max_tokens)
+        retries = 0
+        first_token_latency = None
+        chunks = []
+        client, semaphore = self._resources()
+        try:
+            # ストリームを読み終えるまで同時実行数のスロットと送信枠を保持する
+            async with _scheduled_async(self.scheduler, call_site), semaphore:
+                async for attempt in AsyncRetrying(**_retry_policy()):
+                    with attempt:
+                        retries = attempt.retry_state.attempt_number - 1
+                        with contextlib.ExitStack() as guard:
+                            guard.enter_context(_circuit_guard(self.circuit_breaker))
+                            await self.rate_limiter.acquire_async(reserved_tokens)
+                            try:
+                                raw_response = await client.chat.completions.with_raw_response.create(
+                                    model=model,
+                                    messages=messages,
+                                    temperature=temperature,
+                                    max_tokens=max_tokens,
+                                    stream=True
+                                )
+                            except openai.APIStatusError as e:
+                                self.rate_limiter.release(
+                                    reserved_tokens,
+                                    headers=e.response.headers,
+                                    rate_limited=e.status_code == 429
+                                )
+                                raise
+                            except BaseException:
+                                self.rate_limiter.release(reserved_tokens)
+                                raise
+                            # 接続できた場合は、ストリームを読み終えるまでサーキットへの結果の記録を保留する
+                            stream_guard = guard.pop_all()
+
+                # 読み込み中の接続の切断やタイムアウトもサーキットブレーカーに記録する
+                with stream_guard:
+                    stream = raw_response.parse()
+                    # 途中で失敗・中断したストリームでは同時実行数を増やさない
+                    completed = False
+                    try:
+                        async for chunk in stream:
+                            delta = chunk.choices[0].delta.content if chunk.choices else None
+                            if delta:
+                                if first_token_latency is None:
+                                    first_token_latency = time.perf_counter() - started_at
+                                chunks.append(delta)
+                                yield delta
+                        completed = True
+                    finally:
+                        await stream.close()
+                        self.rate_limiter.release(
+                            reserved_tokens,
+                            used_tokens=_estimate_request_tokens(messages, 0) + estimate_tokens("".join(chunks)),
+                            headers=raw_response.headers,
+                            succeeded=completed
+                        )
+        except Exception:
+            self.metrics.record(call_site, time.perf_counter() - started_at, retries=retries, error=True)
+            raise
+
+        content = "".join(chunks)
+        self.metrics.record(
+            call_site,
+            time.perf_counter() - started_at,
+            prompt_tokens=_estimate_request_tokens(messages, 0),
+            completion_tokens=estimate_tokens(content),
+            retries=retries,
+            first_token_latency=first_token_latency
+        )
+
+        if cache_key and content:
+            await asyncio.to_thread(self.cache.set, cache_key, content)
+
+    async def generate_content(
+        self,
+        prompt: str,
+        system_instruction: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        call_site: Optional[str] = None,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        テキストを生成します。
+
+        Parameters
+        ----------
+        prompt : str
+            生成のためのプロンプト。
+        system_instruction : str, optional
+            システム指示。
+        temperature : float, optional
+            生成の多様性を制御するパラメータ。指定しない場合は呼び出し元のプロファイルの値。
+        max_tokens : int, optional
+            生成するトークンの最大数。指定しない場合は呼び出し元のプロファイルで入力の長さから計算します。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``reddit.translate_comment``）。
+        response_format : Dict[str, Any], optional
+            応答の形式。構造化出力では ``{"type": "json_schema", "json_schema": {...}}`` を指定します。
+
+        Returns
+        -------
+        str
+            生成されたテキスト。
+        """
+        messages = []
+
+        if system_instruction:
+            messages.append({"role": "system", "content": system_instruction})
+
+        messages.append({"role": "user", "content": prompt})
+
+        return await self._create_completion(messages, temperature, max_tokens, call_site, response_format)
+
+    async def generate_many(
+        self,
+        prompts: List[str],
+        system_instruction: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        call_site: Optional[str] = None,
+        return_exceptions: bool = False
+    ) -> List[Union[str, BaseException]]:
+        """
+        複数のプロンプトから並行してテキストを生成します。
+
+        同時に送信されるリクエスト数は ``max_concurrency`` で制限されます。
+
+        Parameters
+        ----------
+        prompts : List[str]
+            生成のためのプロンプトのリスト。
+        system_instruction : str, optional
+            すべてのプロンプトに共通のシステム指示。
+        temperature : float, optional
+            生成の多様性を制御するパラメータ。指定しない場合は呼び出し元のプロファイルの値。
+        max_tokens : int, optional
+            生成するトークンの最大数。指定しない場合は呼び出し元のプロファイルで入力の長さから計算します。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``reddit.translate_comment``）。
+        return_exceptions : bool, default=False
+            Trueの場合、失敗したプロンプトの位置に例外オブジェクトを格納して返します。
+            Falseの場合、最初に発生した例外を送出します。
+
+        Returns
+        -------
+        List[str | BaseException]
+            プロンプトと同じ順序で並んだ生成結果のリスト。
+        """
+        tasks = [
+            self.generate_content(
+                prompt=prompt,
+                system_instruction=system_instruction,
+                temperature=temperature,
+                max_tokens=max_tokens,
+                call_site=call_site
+            )
+            for prompt in prompts
+        ]
+        return await asyncio.gather(*tasks, return_exceptions=return_exceptions)
+
+    async def chat(
+        self,
+        messages: List[Dict[str, str]],
+        system: Optional[str] = None,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        call_site: Optional[str] = None,
+        stream: bool = False
+    ) -> Union[str, AsyncIterator[str]]:
+        """
+        チャットを実行します。
+
+        Parameters
+        ----------
+        messages : List[Dict[str, str]]
+            メッセージのリスト。
+        system : str, optional
+            システム指示。
+        temperature : float, optional
+            生成の多様性を制御するパラメータ。指定しない場合は呼び出し元のプロファイルの値。
+        max_tokens : int, optional
+            生成するトークンの最大数。指定しない場合は呼び出し元のプロファイルで入力の長さから計算します。
+        call_site : str, optional
+            計測用の呼び出し元の名前（例: ``reddit.translate_comment``）。
+        stream : bool, default=False
+            Trueの場合、応答を生成されたそばから返す非同期イテレータを返します。
+
+        Returns
+        -------
+        str or AsyncIterator[str]
+            AIの応答。stream=Trueの場合は応答の断片を順に返す非同期イテレータ。
+        """
+        all_messages = []
+
+        if system:
+            all_messages.append({"role": "system", "content": system})
+
+        all_messages.extend(messages)
+
+        if stream:
+            return self._stream_completion(all_messages, temperature, max_tokens, call_site)
+
+        return await self._create_completion(all_messages, temperature, max_tokens, call_site)
+
+
+_clients: Dict[Tuple[type, str, str], Any] = {}
+_clients_lock = threading.Lock()
+
+
+def _get_shared_client(client_class: type, api_key: Optional[str]) -> Any:
+    """
+    APIキーとベースURLごとに共有するクライアントを取得します。
+    """
+    api_key = api_key or os.environ.get("GROK_API_KEY")
+    if not api_key:
+        raise ValueError("GROK_API_KEY must be provided or set as an environment variable")
+
+    key = (client_class, api_key, os.environ.get("GROK_BASE_URL", DEFAULT_BASE_URL))
+    with _clients_lock:
+        client = _clients.get(key)
+        if client is None:
+            client = client_class(api_key=api_key)
+            _clients[key] = client
+        return client
+
+
+def get_grok_client(api_key: Optional[str] = None) -> Grok3Client:
+    """
+    プロセス全体で共有する同期クライアントを取得します。
+
+    リクエストごとにクライアントを作成するとコネクションプールも作り直され、
+    TLSハンドシェイクが毎回発生するため、通常はこの関数でクライアントを取得してください。
+
+    Parameters
+    ----------
+    api_key : str, optional
+        Grok3 APIキー。指定しない場合は環境変数から取得。
+
+    Returns
+    -------
+    Grok3Client
+        共有クライアント。
+    """
+    return _get_shared_client(Grok3Client, api_key)
+
+
+def get_async_grok_client(api_key: Optional[str] = None) -> AsyncGrok3Client:
+    """
+    プロセス全体で共有する非同期クライアントを取得します。
+
+    Parameters
+    ----------
+    api_key : str, optional
+        Grok3 APIキー。指定しない場合は環境変数から取得。
+
+    Returns
+    -------
+    AsyncGrok3Client
+        共有クライアント。
+    """
+    return _get_shared_client(AsyncGrok3Client, api_key)
@@ -0,0 +1,102 @@
+"""各サービスが収集した項目（記事・リポジトリ・論文など）の共通の形式。"""
+
+from dataclasses import asdict, dataclass, field, fields
+from typing import Any, Dict, List, Optional
+
+
+@dataclass
+class Item:
+    """
+    1日分の出力に含まれる1件の項目。
+
+    各サービスは収集した項目をこの形式で保存し、Markdownはこの項目から生成します。
+
+    Parameters
+    ----------
+    title : str
+        タイトル（リポジトリ名・記事タイトル・論文タイトルなど）。
+    url : str | None
+        項目へのリンク。
+    text : str
+        本文・説明・アブストラクトなど。
+    summary : str
+        LLMが生成した要約。
+    score : int | None
+        スコア・スター数・アップボート数など。
+    category : str | None
+        分類（言語・カテゴリなど）。
+    channel : str | None
+        取得元（サブレディット・フィード名など）。
+    extra : Dict[str, Any]
+        サービス固有の項目（例: Redditの ``permalink``）。
+    """
+
+    title: str
+    url: Optional[str] = None
+    text: str = ""
+    summary: str = ""
+    score: Optional[int] = None
+    category: Optional[str] = None
+    channel: Optional[str] = None
+    extra: Dict[str, Any] = field(default_factory=dict)
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        値のあるフィールドのみの辞書に変換します。
+
+        Returns
+        -------
+        Dict[str, Any]
+            項目の辞書。
+        """
+        return {key: value for key, value in asdict(self).items() if value not in (None, "", {})}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> "Item":
+        """
+        辞書から項目を作成します。未知のキーは無視します。
+
+        Parameters
+        ----------
+        data : Dict[str, Any]
+            項目の辞書。
+
+        Returns
+        -------
+        Item
+            作成した項目。
+        """
+        names = {f.name for f in fields(cls)}
+        return cls(**{key: value for key, value in data.items() if key in names})
+
+
+def render_items_markdown(items: List[Item], heading: str) -> str:
+    """
+    サービスによらない共通の形式で、項目からMarkdownを生成します。
+
+    生成中の日の途中経過など、サービスごとのMarkdownがまだない場合の表示に使います。
+
+    Parameters
+    ----------
+    items : List[Item]
+        項目のリスト。
+    heading : str
+        見出し。
+
+    Returns
+    -------
+    str
+        Markdown。
+    """
+    parts = [f"# {heading}\n\n"]
+    for item in items:
+        link = item.url or item.extra.get("permalink")
+        parts.append(f"## [{item.title}]({link})\n\n" if link else f"## {item.title}\n\n")
+        if item.channel:
+            parts.append(f"取得元: {item.channel}\n\n")
+        if item.score is not None:
+            parts.append(f"スコア: {item.score}\n\n")
+        if item.summary:
+            parts.append(f"**要約**:\n{item.summary}\n\n")
+        parts.append("---\n\n")
+    return "".join(parts)
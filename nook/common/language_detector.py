@@ -0,0 +1,84 @@
+"""Unicodeの文字種の比率でテキストの種類を判定する簡易ユーティリティ。"""
+
+import re
+import unicodedata
+from typing import Literal
+
+TextKind = Literal["empty", "non_linguistic", "code", "japanese", "translatable"]
+
+# 判定の前に取り除く部分: コードブロック・インラインコード・URL・メールアドレス
+_CODE_BLOCK_PATTERN = re.compile(r"```.*?```|`[^`\n]*`", re.DOTALL)
+_URL_PATTERN = re.compile(r"(?:https?://|www\.)\S+|\S+@\S+\.\w+")
+
+# ひらがな・カタカナ（半角カタカナを含む）
+_KANA_PATTERN = re.compile(r"[\u3040-\u30ff\u31f0-\u31ff\uff66-\uff9f]")
+# 漢字
+_KANJI_PATTERN = re.compile(r"[\u3400-\u4dbf\u4e00-\u9fff\uf900-\ufaff]")
+# プログラムのコードに多い記号
+_CODE_SYMBOL_PATTERN = re.compile(r"[{}\[\]();=<>_$#\\|*&^%+]")
+
+# 文字のうち日本語（かな・漢字）がこの比率以上なら翻訳済みとみなす
+JAPANESE_RATIO = 0.3
+# 空白以外の文字のうち記号がこの比率以上ならコードとみなす
+CODE_SYMBOL_RATIO = 0.2
+# 文字がこの数未満なら言語的な内容がないとみなす
+MIN_LETTERS = 2
+
+
+def classify_text(text: str) -> TextKind:
+    """
+    テキストの種類を判定します。
+
+    モデルを使わず、Unicodeの文字種の比率だけで判定します。
+
+    Parameters
+    ----------
+    text : str
+        判定するテキスト。
+
+    Returns
+    -------
+    {"empty", "non_linguistic", "code", "japanese", "translatable"}
+        - empty: 空または空白のみ
+        - non_linguistic: URL・数字・記号・絵文字などで、文字がほとんどない
+        - code: プログラムのコードとみられる
+        - japanese: すでに日本語
+        - translatable: 翻訳が必要なテキスト
+    """
+    if not text or not text.strip():
+        return "empty"
+
+    stripped = _URL_PATTERN.sub(" ", _CODE_BLOCK_PATTERN.sub(" ", text))
+    letters = sum(1 for char in stripped if unicodedata.category(char).startswith("L"))
+    if letters < MIN_LETTERS:
+        # コードブロックだけのテキストもここで除外される
+        return "non_linguistic"
+
+    kana = len(_KANA_PATTERN.findall(stripped))
+    kanji = len(_KANJI_PATTERN.findall(stripped))
+    # かなを含まない漢字のみのテキストは中国語の可能性があるため翻訳する
+    if kana > 0 and (kana + kanji) / letters >= JAPANESE_RATIO:
+        return "japanese"
+
+    non_space = sum(1 for char in stripped if not char.isspace())
+    if len(_CODE_SYMBOL_PATTERN.findall(stripped)) / non_space >= CODE_SYMBOL_RATIO:
+        return "code"
+
+    return "translatable"
+
+
+def needs_translation(text: str) -> bool:
+    """
+    テキストを日本語に翻訳する必要があるかを判定します。
+
+    Parameters
+    ----------
+    text : str
+        判定するテキスト。
+
+    Returns
+    -------
+    bool
+        翻訳が必要な場合はTrue。
+    """
+    return classify_text(text) == "translatable"
@@ -0,0 +1,154 @@
+"""LLMレスポンスのディスクキャッシュ。"""
+
+import hashlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Any, Dict, List, Optional
+
+from nook.common.sqlite_lru import SQLiteLRUStore, enabled_from_env, max_bytes_from_env
+
+# キャッシュのデフォルト設定
+DEFAULT_CACHE_PATH = "data/.cache/llm_cache.sqlite3"
+DEFAULT_TTL_SECONDS = 7 * 24 * 60 * 60
+DEFAULT_MAX_BYTES = 256 * 1024 * 1024
+
+
+class LLMCache(SQLiteLRUStore):
+    """
+    LLMのレスポンスをSQLiteに保存するコンテンツアドレス型キャッシュ。
+
+    キーはモデル・メッセージ・temperature・max_tokensのハッシュです。
+    TTLを過ぎたエントリと、合計サイズの上限を超えた分の古いエントリ
+    （最終アクセス順）は自動的に削除されます。
+
+    Parameters
+    ----------
+    path : str | Path, default="data/.cache/llm_cache.sqlite3"
+        キャッシュファイルのパス。
+    ttl_seconds : int, default=604800
+        エントリの有効期間（秒）。
+    max_bytes : int, default=268435456
+        保存するレスポンスの合計サイズの上限（バイト）。
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_CACHE_PATH,
+        ttl_seconds: int = DEFAULT_TTL_SECONDS,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """
+        LLMCacheを初期化します。
+
+        Parameters
+        ----------
+        path : str | Path, default="data/.cache/llm_cache.sqlite3"
+            キャッシュファイルのパス。
+        ttl_seconds : int, default=604800
+            エントリの有効期間（秒）。
+        max_bytes : int, default=268435456
+            保存するレスポンスの合計サイズの上限（バイト）。
+        """
+        super().__init__(path, "responses", ("response",), max_bytes, ttl_seconds=ttl_seconds)
+
+    @staticmethod
+    def make_key(
+        model: str,
+        messages: List[Dict[str, Any]],
+        temperature: float,
+        max_tokens: int,
+        response_format: Optional[Dict[str, Any]] = None
+    ) -> str:
+        """
+        リクエスト内容からキャッシュキーを生成します。
+
+        Parameters
+        ----------
+        model : str
+            モデル名。
+        messages : List[Dict[str, Any]]
+            送信するメッセージのリスト。
+        temperature : float
+            生成の多様性を制御するパラメータ。
+        max_tokens : int
+            生成するトークンの最大数。
+        response_format : Dict[str, Any], optional
+            応答の形式（構造化出力のJSON Schemaなど）。指定しない場合はキーに含めません。
+
+        Returns
+        -------
+        str
+            SHA-256のハッシュ値（16進数）。
+        """
+        request = {
+            "model": model,
+            "messages": messages,
+            "temperature": temperature,
+            "max_tokens": max_tokens
+        }
+        if response_format:
+            request["response_format"] = response_format
+        payload = json.dumps(request, ensure_ascii=False, sort_keys=True)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str) -> Optional[str]:
+        """
+        キャッシュされたレスポンスを取得します。
+
+        Parameters
+        ----------
+        key : str
+            キャッシュキー。
+
+        Returns
+        -------
+        str or None
+            キャッシュされたレスポンス。存在しないか期限切れの場合はNone。
+        """
+        return self._lookup([key], "response").get(key)
+
+    def set(self, key: str, response: str) -> None:
+        """
+        レスポンスをキャッシュに保存します。
+
+        Parameters
+        ----------
+        key : str
+            キャッシュキー。
+        response : str
+            保存するレスポンス。
+        """
+        self._store(key, (response,))
+
+
+_default_cache: Optional[LLMCache] = None
+_default_cache_lock = threading.Lock()
+
+
+def get_default_cache() -> Optional[LLMCache]:
+    """
+    プロセス全体で共有するキャッシュを取得します。
+
+    設定は環境変数 GROK_CACHE_ENABLED・GROK_CACHE_PATH・GROK_CACHE_TTL（秒）・
+    GROK_CACHE_MAX_MB から読み込みます。
+
+    Returns
+    -------
+    LLMCache or None
+        共有キャッシュ。GROK_CACHE_ENABLED が false の場合はNone。
+    """
+    global _default_cache
+
+    if not enabled_from_env("GROK_CACHE_ENABLED"):
+        return None
+
+    with _default_cache_lock:
+        if _default_cache is None:
+            _default_cache = LLMCache(
+                path=os.environ.get("GROK_CACHE_PATH", DEFAULT_CACHE_PATH),
+                ttl_seconds=int(os.environ.get("GROK_CACHE_TTL", DEFAULT_TTL_SECONDS)),
+                max_bytes=max_bytes_from_env("GROK_CACHE_MAX_MB", 256)
+            )
+        return _default_cache
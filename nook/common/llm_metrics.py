@@ -0,0 +1,517 @@
+"""LLM呼び出しのレイテンシとトークン使用量の計測ユーティリティ。"""
+
+import json
+import threading
+from collections import deque
+from dataclasses import dataclass, field
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Deque, Dict, List, Optional
+
+# パーセンタイル計算のために保持する直近のレイテンシ数
+_LATENCY_WINDOW = 1024
+
+# 呼び出し元が指定されなかった場合の名前
+DEFAULT_CALL_SITE = "unknown"
+
+
+@dataclass
+class CallSiteStats:
+    """
+    呼び出し元ごとの集計値。
+
+    Parameters
+    ----------
+    calls : int
+        呼び出し回数（キャッシュヒットを含む）。
+    errors : int
+        失敗した呼び出しの回数。
+    cache_hits : int
+        キャッシュから応答した回数。
+    retries : int
+        再試行の合計回数。
+    prompt_tokens : int
+        入力トークン数の合計。
+    completion_tokens : int
+        出力トークン数の合計。
+    latency_total : float
+        レイテンシの合計（秒）。
+    latency_max : float
+        レイテンシの最大値（秒）。
+    latencies : Deque[float]
+        直近のAPI呼び出しのレイテンシ（秒）。
+    first_token_latencies : Deque[float]
+        直近のストリーミング呼び出しで最初の断片を受け取るまでの時間（秒）。
+    attempt_latencies : Deque[float]
+        直近のAPIリクエスト1回ごとの、送信から応答までの時間（秒）。
+        再試行の待機や同時実行数の空き待ちを含みません。
+    skipped : int
+        LLMに送る必要がないと判定して省略した呼び出しの回数。
+    skipped_reasons : Dict[str, int]
+        省略した理由（例: ``japanese``）ごとの回数。
+    hedges_eligible : int
+        ヘッジが有効な状態で送信したリクエストの数（ヘッジを送る割合の分母）。
+    hedges_fired : int
+        応答が遅いために重複リクエスト（ヘッジ）を送信した回数。
+    hedges_won : int
+        ヘッジの応答が元のリクエストより先に返った回数。
+    hedges_rejected : int
+        ヘッジ用の空きがなく、ヘッジを送信しなかった回数。
+    compacted : int
+        送信前に入力を整形・切り詰めたテキストの数。
+    tokens_saved : int
+        入力の整形・切り詰めで削減したトークン数（見積もり）の合計。
+    fallbacks : int
+        翻訳と要約をまとめたリクエストで結果を得られず、別々のリクエストにやり直した回数。
+    """
+
+    calls: int = 0
+    errors: int = 0
+    cache_hits: int = 0
+    retries: int = 0
+    prompt_tokens: int = 0
+    completion_tokens: int = 0
+    latency_total: float = 0.0
+    latency_max: float = 0.0
+    latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=_LATENCY_WINDOW))
+    first_token_latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=_LATENCY_WINDOW))
+    attempt_latencies: Deque[float] = field(default_factory=lambda: deque(maxlen=_LATENCY_WINDOW))
+    skipped: int = 0
+    skipped_reasons: Dict[str, int] = field(default_factory=dict)
+    hedges_eligible: int = 0
+    hedges_fired: int = 0
+    hedges_won: int = 0
+    hedges_rejected: int = 0
+    compacted: int = 0
+    tokens_saved: int = 0
+    fallbacks: int = 0
+
+    def percentile(self, q: float, first_token: bool = False, attempt: bool = False) -> Optional[float]:
+        """
+        直近のレイテンシのパーセンタイルを計算します。
+
+        Parameters
+        ----------
+        q : float
+            0から1の間の分位点。
+        first_token : bool, default=False
+            Trueの場合、最初の断片を受け取るまでの時間を対象にします。
+        attempt : bool, default=False
+            Trueの場合、APIリクエスト1回ごとの送信から応答までの時間を対象にします。
+
+        Returns
+        -------
+        float or None
+            レイテンシ（秒）。記録がない場合はNone。
+        """
+        if first_token:
+            samples = self.first_token_latencies
+        elif attempt:
+            samples = self.attempt_latencies
+        else:
+            samples = self.latencies
+        if not samples:
+            return None
+        ordered = sorted(samples)
+        index = min(len(ordered) - 1, int(q * len(ordered)))
+        return ordered[index]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """
+        集計値を辞書に変換します。
+
+        Returns
+        -------
+        Dict[str, Any]
+            集計値。
+        """
+        api_calls = self.calls - self.cache_hits
+        p50 = self.percentile(0.5)
+        p95 = self.percentile(0.95)
+        ttft_p50 = self.percentile(0.5, first_token=True)
+        ttft_p95 = self.percentile(0.95, first_token=True)
+        return {
+            "calls": self.calls,
+            "errors": self.errors,
+            "cache_hits": self.cache_hits,
+            "retries": self.retries,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "latency_total": round(self.latency_total, 3),
+            "latency_avg": round(self.latency_total / self.calls, 3) if self.calls else None,
+            "latency_p50": round(p50, 3) if p50 is not None else None,
+            "latency_p95": round(p95, 3) if p95 is not None else None,
+            "latency_max": round(self.latency_max, 3),
+            "first_token_p50": round(ttft_p50, 3) if ttft_p50 is not None else None,
+            "first_token_p95": round(ttft_p95, 3) if ttft_p95 is not None else None,
+            "api_calls": api_calls,
+            "skipped": self.skipped,
+            "skipped_reasons": dict(sorted(self.skipped_reasons.items())),
+            "hedges_eligible": self.hedges_eligible,
+            "hedges_fired": self.hedges_fired,
+            "hedges_won": self.hedges_won,
+            "hedges_rejected": self.hedges_rejected,
+            "compacted": self.compacted,
+            "tokens_saved": self.tokens_saved,
+            "fallbacks": self.fallbacks
+        }
+
+
+class LLMMetrics:
+    """
+    LLM呼び出しを呼び出し元（例: ``reddit.translate_comment``）ごとに集計するクラス。
+
+    スレッドセーフで、プロセス内のすべてのクライアントから共有できます。
+    """
+
+    def __init__(self):
+        """
+        LLMMetricsを初期化します。
+        """
+        self._lock = threading.Lock()
+        self._stats: Dict[str, CallSiteStats] = {}
+        self.started_at = datetime.now()
+
+    def record(
+        self,
+        call_site: Optional[str],
+        latency: float,
+        prompt_tokens: int = 0,
+        completion_tokens: int = 0,
+        retries: int = 0,
+        cache_hit: bool = False,
+        error: bool = False,
+        first_token_latency: Optional[float] = None
+    ) -> None:
+        """
+        1回の呼び出しを記録します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前（サービス名.用途）。
+        latency : float
+            再試行を含めた呼び出し全体のレイテンシ（秒）。
+        prompt_tokens : int, default=0
+            入力トークン数。
+        completion_tokens : int, default=0
+            出力トークン数。
+        retries : int, default=0
+            再試行の回数。
+        cache_hit : bool, default=False
+            キャッシュから応答した場合はTrue。
+        error : bool, default=False
+            呼び出しが失敗した場合はTrue。
+        first_token_latency : float, optional
+            ストリーミング呼び出しで最初の断片を受け取るまでの時間（秒）。
+        """
+        with self._lock:
+            stats = self._stats.setdefault(call_site or DEFAULT_CALL_SITE, CallSiteStats())
+            stats.calls += 1
+            stats.errors += int(error)
+            stats.cache_hits += int(cache_hit)
+            stats.retries += retries
+            stats.prompt_tokens += prompt_tokens
+            stats.completion_tokens += completion_tokens
+            stats.latency_total += latency
+            stats.latency_max = max(stats.latency_max, latency)
+            # キャッシュヒットはAPIのレイテンシ分布に含めない
+            if not cache_hit and not error:
+                stats.latencies.append(latency)
+            if first_token_latency is not None:
+                stats.first_token_latencies.append(first_token_latency)
+
+    def record_skip(self, call_site: Optional[str], reason: str) -> None:
+        """
+        LLMに送らずに済ませた呼び出しを記録します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前（サービス名.用途）。
+        reason : str
+            省略した理由（例: ``japanese``, ``non_linguistic``）。
+        """
+        with self._lock:
+            stats = self._stats.setdefault(call_site or DEFAULT_CALL_SITE, CallSiteStats())
+            stats.skipped += 1
+            stats.skipped_reasons[reason] = stats.skipped_reasons.get(reason, 0) + 1
+
+    def record_compaction(self, call_site: Optional[str], original_tokens: int, compacted_tokens: int) -> None:
+        """
+        送信前に入力を整形・切り詰めたことを記録します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前（サービス名.用途）。
+        original_tokens : int
+            整形前のトークン数（見積もり）。
+        compacted_tokens : int
+            整形後のトークン数（見積もり）。
+        """
+        with self._lock:
+            stats = self._stats.setdefault(call_site or DEFAULT_CALL_SITE, CallSiteStats())
+            stats.compacted += 1
+            stats.tokens_saved += max(0, original_tokens - compacted_tokens)
+
+    def record_fallback(self, call_site: Optional[str]) -> None:
+        """
+        翻訳と要約をまとめたリクエストで結果を得られず、別々のリクエストにやり直したことを記録します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            まとめたリクエストの呼び出し元の名前（例: ``reddit.translate_and_summarize``）。
+        """
+        with self._lock:
+            stats = self._stats.setdefault(call_site or DEFAULT_CALL_SITE, CallSiteStats())
+            stats.fallbacks += 1
+
+    def record_attempt(self, call_site: Optional[str], latency: float) -> None:
+        """
+        APIリクエスト1回の、送信から応答までの時間を記録します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前（サービス名.用途）。
+        latency : float
+            送信から応答までの時間（秒）。
+        """
+        with self._lock:
+            stats = self._stats.setdefault(call_site or DEFAULT_CALL_SITE, CallSiteStats())
+            stats.attempt_latencies.append(latency)
+
+    def record_hedge_eligible(self, call_site: Optional[str]) -> None:
+        """
+        ヘッジが有効な状態でリクエストを送信したことを記録します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前（サービス名.用途）。
+        """
+        with self._lock:
+            stats = self._stats.setdefault(call_site or DEFAULT_CALL_SITE, CallSiteStats())
+            stats.hedges_eligible += 1
+
+    def record_hedge(self, call_site: Optional[str], admitted: bool) -> None:
+        """
+        重複リクエスト（ヘッジ）を送信しようとしたことを記録します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前（サービス名.用途）。
+        admitted : bool
+            ヘッジを送信した場合はTrue。ヘッジ用の空きがなく送信しなかった場合はFalse。
+        """
+        with self._lock:
+            stats = self._stats.setdefault(call_site or DEFAULT_CALL_SITE, CallSiteStats())
+            if admitted:
+                stats.hedges_fired += 1
+            else:
+                stats.hedges_rejected += 1
+
+    def record_hedge_won(self, call_site: Optional[str]) -> None:
+        """
+        ヘッジの応答が元のリクエストより先に返ったことを記録します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前（サービス名.用途）。
+        """
+        with self._lock:
+            stats = self._stats.setdefault(call_site or DEFAULT_CALL_SITE, CallSiteStats())
+            stats.hedges_won += 1
+
+    def hedge_rate(self, call_site: Optional[str]) -> float:
+        """
+        ヘッジが有効な状態で送信したリクエストのうち、ヘッジを送信した割合を取得します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前（サービス名.用途）。
+
+        Returns
+        -------
+        float
+            ヘッジを送信した割合。まだ記録がない場合は0。
+        """
+        with self._lock:
+            stats = self._stats.get(call_site or DEFAULT_CALL_SITE)
+            if stats is None or not stats.hedges_eligible:
+                return 0.0
+            return stats.hedges_fired / stats.hedges_eligible
+
+    def latency_percentile(
+        self,
+        call_site: Optional[str],
+        q: float,
+        min_samples: int = 1,
+        attempt: bool = False
+    ) -> Optional[float]:
+        """
+        呼び出し元ごとのAPIレイテンシのパーセンタイルを取得します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前。
+        q : float
+            0から1の間の分位点。
+        min_samples : int, default=1
+            計算に必要な記録の最小数。
+        attempt : bool, default=False
+            Trueの場合、APIリクエスト1回ごとの送信から応答までの時間を対象にします。
+
+        Returns
+        -------
+        float or None
+            レイテンシ（秒）。記録が min_samples 未満の場合はNone。
+        """
+        with self._lock:
+            stats = self._stats.get(call_site or DEFAULT_CALL_SITE)
+            samples = (stats.attempt_latencies if attempt else stats.latencies) if stats else ()
+            if len(samples) < min_samples:
+                return None
+            return stats.percentile(q, attempt=attempt)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        現在の集計値を取得します。
+
+        Returns
+        -------
+        Dict[str, Any]
+            開始時刻、呼び出し元ごとの集計値、全体の合計。
+        """
+        with self._lock:
+            call_sites = {name: stats.to_dict() for name, stats in sorted(self._stats.items())}
+
+        totals: Dict[str, Any] = {}
+        for key in (
+            "calls", "errors", "cache_hits", "retries", "prompt_tokens", "completion_tokens",
+            "api_calls", "skipped", "hedges_eligible", "hedges_fired", "hedges_won", "hedges_rejected",
+            "compacted", "tokens_saved", "fallbacks"
+        ):
+            totals[key] = sum(stats[key] for stats in call_sites.values())
+        totals["latency_total"] = round(sum(stats["latency_total"] for stats in call_sites.values()), 3)
+
+        return {
+            "started_at": self.started_at.isoformat(timespec="seconds"),
+            "generated_at": datetime.now().isoformat(timespec="seconds"),
+            "call_sites": call_sites,
+            "total": totals
+        }
+
+    def dump_json(self, path: str | Path) -> Path:
+        """
+        集計値をJSONファイルに書き出します。
+
+        Parameters
+        ----------
+        path : str | Path
+            出力先のパス。
+
+        Returns
+        -------
+        Path
+            書き出したファイルのパス。
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.snapshot(), f, ensure_ascii=False, indent=2)
+        return path
+
+    def reset(self) -> None:
+        """
+        すべての集計値を破棄します。
+        """
+        with self._lock:
+            self._stats.clear()
+            self.started_at = datetime.now()
+
+
+_PROMETHEUS_COUNTERS = [
+    ("calls", "nook_llm_calls_total", "LLM呼び出し回数（キャッシュヒットを含む）"),
+    ("errors", "nook_llm_errors_total", "失敗したLLM呼び出しの回数"),
+    ("cache_hits", "nook_llm_cache_hits_total", "キャッシュから応答したLLM呼び出しの回数"),
+    ("retries", "nook_llm_retries_total", "LLM呼び出しの再試行回数"),
+    ("prompt_tokens", "nook_llm_prompt_tokens_total", "入力トークン数の合計"),
+    ("completion_tokens", "nook_llm_completion_tokens_total", "出力トークン数の合計"),
+    ("latency_total", "nook_llm_latency_seconds_sum", "LLM呼び出しのレイテンシの合計（秒）"),
+    ("hedges_eligible", "nook_llm_hedges_eligible_total", "ヘッジが有効な状態で送信したリクエストの数"),
+    ("hedges_fired", "nook_llm_hedges_fired_total", "遅い応答に対して重複リクエストを送信した回数"),
+    ("hedges_won", "nook_llm_hedges_won_total", "重複リクエストの応答が先に返った回数"),
+    ("hedges_rejected", "nook_llm_hedges_rejected_total", "ヘッジ用の空きがなく重複リクエストを送信しなかった回数"),
+    ("tokens_saved", "nook_llm_prompt_tokens_saved_total", "入力の整形・切り詰めで削減したトークン数（見積もり）"),
+    ("fallbacks", "nook_llm_fused_fallbacks_total", "翻訳と要約をまとめたリクエストを別々のリクエストにやり直した回数")
+]
+
+
+def to_prometheus(snapshots: Dict[str, Dict[str, Any]]) -> str:
+    """
+    集計値をPrometheusのテキスト形式に変換します。
+
+    Parameters
+    ----------
+    snapshots : Dict[str, Dict[str, Any]]
+        ``source`` ラベルの値（例: ``api``, ``pipeline``）をキーとする
+        :meth:`LLMMetrics.snapshot` の結果。
+
+    Returns
+    -------
+    str
+        Prometheusのテキスト形式のメトリクス。
+    """
+    lines: List[str] = []
+
+    def label(source: str, call_site: str) -> str:
+        call_site = call_site.replace("\\", "\\\\").replace('"', '\\"')
+        return f'source="{source}",call_site="{call_site}"'
+
+    for key, name, description in _PROMETHEUS_COUNTERS:
+        lines.append(f"# HELP {name} {description}")
+        lines.append(f"# TYPE {name} counter")
+        for source, snapshot in snapshots.items():
+            for call_site, stats in snapshot.get("call_sites", {}).items():
+                lines.append(f"{name}{{{label(source, call_site)}}} {stats.get(key, 0)}")
+
+    name = "nook_llm_skipped_total"
+    lines.append(f"# HELP {name} LLMに送らずに済ませた呼び出しの回数")
+    lines.append(f"# TYPE {name} counter")
+    for source, snapshot in snapshots.items():
+        for call_site, stats in snapshot.get("call_sites", {}).items():
+            for reason, count in stats.get("skipped_reasons", {}).items():
+                lines.append(f'{name}{{{label(source, call_site)},reason="{reason}"}} {count}')
+
+    name = "nook_llm_latency_seconds"
+    lines.append(f"# HELP {name} 直近のLLM呼び出しのレイテンシ（秒）")
+    lines.append(f"# TYPE {name} summary")
+    for source, snapshot in snapshots.items():
+        for call_site, stats in snapshot.get("call_sites", {}).items():
+            for quantile, key in (("0.5", "latency_p50"), ("0.95", "latency_p95")):
+                if stats.get(key) is not None:
+                    lines.append(f'{name}{{{label(source, call_site)},quantile="{quantile}"}} {stats[key]}')
+
+    return "\n".join(lines) + "\n"
+
+
+_default_metrics = LLMMetrics()
+
+
+def get_metrics() -> LLMMetrics:
+    """
+    プロセス全体で共有する計測器を取得します。
+
+    Returns
+    -------
+    LLMMetrics
+        共有計測器。
+    """
+    return _default_metrics
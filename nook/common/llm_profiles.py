@@ -0,0 +1,219 @@
+"""呼び出し元ごとのLLMの設定（モデル・temperature・生成トークン数）を管理するユーティリティ。"""
+
+import fnmatch
+import os
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+import tomli
+
+from nook.common.token_counter import estimate_tokens
+
+# プロファイルの設定ファイル（環境変数 LLM_PROFILES_PATH で差し替え可能）
+DEFAULT_PROFILES_PATH = Path(__file__).parent / "llm_profiles.toml"
+
+# 設定ファイルに指定がない場合の既定値
+DEFAULT_MODEL = "grok-2-latest"
+DEFAULT_TEMPERATURE = 0.7
+DEFAULT_MAX_TOKENS = 1000
+
+
+@dataclass(frozen=True)
+class LLMProfile:
+    """
+    LLM呼び出しのプロファイル。
+
+    Parameters
+    ----------
+    name : str
+        プロファイル名（例: ``translate.title``）。
+    model : str
+        使用するモデル。
+    temperature : float
+        生成の多様性を制御するパラメータ。
+    min_tokens : int
+        生成するトークンの最大数の下限。
+    output_ratio : float
+        入力1トークンあたりに追加で許容する生成トークン数。
+    max_tokens : int
+        生成するトークンの最大数の上限。
+    input_tokens : int
+        入力のテキスト1件あたりに送るトークン数（見積もり）の上限。0の場合は切り詰めません。
+    """
+
+    name: str
+    model: str = DEFAULT_MODEL
+    temperature: float = DEFAULT_TEMPERATURE
+    min_tokens: int = DEFAULT_MAX_TOKENS
+    output_ratio: float = 0.0
+    max_tokens: int = DEFAULT_MAX_TOKENS
+    input_tokens: int = 0
+
+    def output_tokens(self, input_tokens: int) -> int:
+        """
+        入力のトークン数に応じた、生成するトークンの最大数を取得します。
+
+        Parameters
+        ----------
+        input_tokens : int
+            入力のトークン数。
+
+        Returns
+        -------
+        int
+            ``min_tokens + input_tokens * output_ratio`` を ``max_tokens`` 以下に収めた値。
+        """
+        return max(1, min(self.max_tokens, self.min_tokens + int(input_tokens * self.output_ratio)))
+
+
+class LLMProfiles:
+    """
+    プロファイルの一覧と、呼び出し元（call_site）からプロファイルへの対応を持つクラス。
+
+    Parameters
+    ----------
+    profiles : Dict[str, LLMProfile]
+        名前ごとのプロファイル。
+    call_sites : List[Tuple[str, str]]
+        呼び出し元のパターン（``fnmatch`` 形式）とプロファイル名の組。上から順に照合します。
+    default : LLMProfile
+        どのパターンにも一致しない呼び出しに使うプロファイル。
+    """
+
+    def __init__(
+        self,
+        profiles: Dict[str, LLMProfile],
+        call_sites: List[Tuple[str, str]],
+        default: LLMProfile
+    ):
+        """
+        LLMProfilesを初期化します。
+
+        Parameters
+        ----------
+        profiles : Dict[str, LLMProfile]
+            名前ごとのプロファイル。
+        call_sites : List[Tuple[str, str]]
+            呼び出し元のパターンとプロファイル名の組。
+        default : LLMProfile
+            どのパターンにも一致しない呼び出しに使うプロファイル。
+        """
+        for pattern, name in call_sites:
+            if name not in profiles:
+                raise ValueError(f"Unknown LLM profile '{name}' for call site '{pattern}'")
+
+        self.profiles = profiles
+        self.call_sites = call_sites
+        self.default = default
+        self._resolved: Dict[Optional[str], LLMProfile] = {}
+
+    @classmethod
+    def load(cls, path: str | Path = DEFAULT_PROFILES_PATH) -> "LLMProfiles":
+        """
+        TOML形式の設定ファイルからプロファイルを読み込みます。
+
+        Parameters
+        ----------
+        path : str | Path
+            設定ファイルのパス。
+
+        Returns
+        -------
+        LLMProfiles
+            読み込んだプロファイル。
+        """
+        with open(path, "rb") as f:
+            config: Dict[str, Any] = tomli.load(f)
+
+        defaults = config.get("defaults", {})
+        default = LLMProfile(name="default", **defaults)
+        profiles = {
+            name: LLMProfile(name=name, **{**defaults, **values})
+            for name, values in config.get("profiles", {}).items()
+        }
+        call_sites = list(config.get("call_sites", {}).items())
+        return cls(profiles, call_sites, default)
+
+    def get(self, call_site: Optional[str]) -> LLMProfile:
+        """
+        呼び出し元に対応するプロファイルを取得します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前（例: ``reddit.translate_title``）。
+
+        Returns
+        -------
+        LLMProfile
+            最初に一致したパターンのプロファイル。一致しない場合は既定のプロファイル。
+        """
+        profile = self._resolved.get(call_site)
+        if profile is None:
+            profile = self.default
+            if call_site:
+                for pattern, name in self.call_sites:
+                    if fnmatch.fnmatchcase(call_site, pattern):
+                        profile = self.profiles[name]
+                        break
+            self._resolved[call_site] = profile
+        return profile
+
+    def resolve(
+        self,
+        call_site: Optional[str],
+        messages: List[Dict[str, str]],
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None
+    ) -> Tuple[str, float, int]:
+        """
+        呼び出し元のプロファイルから、モデル・temperature・生成するトークンの最大数を決めます。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前。
+        messages : List[Dict[str, str]]
+            送信するメッセージのリスト。最後のメッセージのトークン数で生成トークン数を調整します。
+        temperature : float, optional
+            呼び出し側で指定したtemperature。指定しない場合はプロファイルの値。
+        max_tokens : int, optional
+            呼び出し側で指定した生成トークン数の上限。指定しない場合はプロファイルから計算した値。
+
+        Returns
+        -------
+        Tuple[str, float, int]
+            モデル・temperature・生成するトークンの最大数。
+        """
+        profile = self.get(call_site)
+        if temperature is None:
+            temperature = profile.temperature
+        if max_tokens is None:
+            max_tokens = profile.output_tokens(estimate_tokens(messages[-1].get("content") or "") if messages else 0)
+        return profile.model, temperature, max_tokens
+
+
+_default_profiles: Optional[LLMProfiles] = None
+_default_profiles_lock = threading.Lock()
+
+
+def get_llm_profiles() -> LLMProfiles:
+    """
+    プロセス全体で共有するプロファイルを取得します。
+
+    設定ファイルは環境変数 LLM_PROFILES_PATH から読み込みます
+    （未設定の場合は nook/common/llm_profiles.toml）。
+
+    Returns
+    -------
+    LLMProfiles
+        共有のプロファイル。
+    """
+    global _default_profiles
+
+    with _default_profiles_lock:
+        if _default_profiles is None:
+            _default_profiles = LLMProfiles.load(os.environ.get("LLM_PROFILES_PATH", DEFAULT_PROFILES_PATH))
+        return _default_profiles
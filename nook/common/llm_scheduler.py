@@ -0,0 +1,632 @@
+"""対話的なチャットとバッチ処理のLLM呼び出しに優先度を付けて送信枠を割り当てるスケジューラー。"""
+
+import asyncio
+import contextlib
+import fnmatch
+import os
+import secrets
+import sqlite3
+import threading
+import time
+from typing import Any, AsyncIterator, Dict, Iterator, List, Literal, Optional, Sequence, Tuple
+
+# スケジューラーのデフォルト設定
+DEFAULT_SCHEDULER_PATH = "data/.cache/llm_scheduler.sqlite3"
+DEFAULT_SLOTS = 8
+DEFAULT_INTERACTIVE_RESERVE = 2
+DEFAULT_LEASE_TTL = 180.0
+DEFAULT_INTERACTIVE_CALL_SITES = ("api.*",)
+
+# 送信枠が空くのを待つ間のポーリング間隔（秒）
+_POLL_INTERVAL = 0.05
+
+# この秒数ポーリングがない待機者は、プロセスが終了したものとみなして取り除く
+_WAITER_TTL = 5.0
+
+# 仮想時刻を保存する services テーブルの特別な行
+_VIRTUAL_CLOCK = "*"
+
+Priority = Literal["interactive", "batch"]
+
+
+def parse_weights(value: Optional[str]) -> Dict[str, float]:
+    """
+    ``reddit=1,paper=2`` 形式のサービスごとの重みを解析します。
+
+    Parameters
+    ----------
+    value : str or None
+        サービス名と重みをカンマで区切った文字列。
+
+    Returns
+    -------
+    Dict[str, float]
+        サービスごとの重み。解析できない項目は無視します。
+    """
+    weights = {}
+    for item in (value or "").split(","):
+        name, _, weight = item.partition("=")
+        try:
+            if name.strip() and float(weight) > 0:
+                weights[name.strip()] = float(weight)
+        except ValueError:
+            continue
+    return weights
+
+
+class LLMScheduler:
+    """
+    LLM APIへの送信枠（同時に送信中のリクエスト数）を優先度に応じて割り当てるクラス。
+
+    APIのチャットなどの対話的な呼び出しを、サービスのバッチ処理より常に優先します。
+    バッチ処理には ``slots - interactive_reserve`` 個までしか枠を割り当てないため、
+    クロール中でも対話的な呼び出しはほぼ待たずに送信できます。バッチ処理の呼び出し同士は、
+    サービス（call_site の最初の要素）ごとの重みに応じて公平に枠を割り当てます
+    （Start-time Fair Queuing）。
+
+    送信中のリクエストと待機中のリクエストはSQLiteのテーブルで管理するため、
+    同じファイルを使うプロセス間（APIサーバーとcronの ``run_services`` など）で
+    枠を共有できます。保持している枠は ``lease_ttl`` の3分の1ごとに期限を延ばすため、
+    レートリミッターの空きやストリームの読み込みを長く待っても失効しません。
+    異常終了したプロセスの枠は、最後に期限を延ばしてから ``lease_ttl`` 秒後に解放されます。
+
+    Parameters
+    ----------
+    path : str, default="data/.cache/llm_scheduler.sqlite3"
+        送信枠を管理するファイルのパス。``:memory:`` の場合はプロセス内だけで管理します。
+    slots : int, default=8
+        すべてのプロセスで同時に送信できるリクエスト数。
+    interactive_reserve : int, default=2
+        対話的な呼び出しのために空けておく枠の数。
+    lease_ttl : float, default=180.0
+        送信枠の期限を延ばさないまま経過したときに、自動的に解放するまでの秒数。
+    interactive_call_sites : Sequence[str], default=("api.*",)
+        対話的な呼び出しとして扱う呼び出し元のパターン（``fnmatch`` 形式）。
+    weights : Dict[str, float], optional
+        バッチ処理のサービスごとの重み。指定のないサービスは1。
+    """
+
+    def __init__(
+        self,
+        path: str = DEFAULT_SCHEDULER_PATH,
+        slots: int = DEFAULT_SLOTS,
+        interactive_reserve: int = DEFAULT_INTERACTIVE_RESERVE,
+        lease_ttl: float = DEFAULT_LEASE_TTL,
+        interactive_call_sites: Sequence[str] = DEFAULT_INTERACTIVE_CALL_SITES,
+        weights: Optional[Dict[str, float]] = None
+    ):
+        """
+        LLMSchedulerを初期化します。
+
+        Parameters
+        ----------
+        path : str, default="data/.cache/llm_scheduler.sqlite3"
+            送信枠を管理するファイルのパス。
+        slots : int, default=8
+            すべてのプロセスで同時に送信できるリクエスト数。
+        interactive_reserve : int, default=2
+            対話的な呼び出しのために空けておく枠の数。
+        lease_ttl : float, default=180.0
+            送信枠を自動的に解放するまでの秒数。
+        interactive_call_sites : Sequence[str], default=("api.*",)
+            対話的な呼び出しとして扱う呼び出し元のパターン。
+        weights : Dict[str, float], optional
+            バッチ処理のサービスごとの重み。
+        """
+        if slots < 1:
+            raise ValueError("slots must be a positive integer")
+        if not 0 <= interactive_reserve < slots:
+            raise ValueError("interactive_reserve must be in [0, slots)")
+
+        self.path = path
+        self.slots = slots
+        self.interactive_reserve = interactive_reserve
+        self.lease_ttl = lease_ttl
+        self.interactive_call_sites = tuple(interactive_call_sites)
+        self.weights = dict(weights or {})
+
+        self._lock = threading.Lock()
+        # このプロセスで待機中のリクエスト（ID -> 優先度・サービス・重み・待機開始時刻）
+        self._tickets: Dict[int, Tuple[Priority, str, float, float]] = {}
+        # 待機中のリクエストのプロセス内での順位（待機中のリクエストが変わったときに計算し直す）
+        self._ranks: Dict[int, int] = {}
+        self._ranks_stale = True
+        # 最後に読み込んだシステムとサービスごとの仮想時刻
+        self._clock = 0.0
+        self._virtual_time: Dict[str, float] = {}
+        self._granted = {"interactive": 0, "batch": 0}
+        self._wait_total = {"interactive": 0.0, "batch": 0.0}
+        self._wait_max = {"interactive": 0.0, "batch": 0.0}
+
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        # トランザクションは BEGIN IMMEDIATE で明示的に開始する
+        self._conn = sqlite3.connect(path, timeout=10, isolation_level=None, check_same_thread=False)
+        if path != ":memory:":
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(
+            """
+            CREATE TABLE IF NOT EXISTS waiters (
+                id INTEGER PRIMARY KEY,
+                priority TEXT NOT NULL,
+                service TEXT NOT NULL,
+                weight REAL NOT NULL,
+                since REAL NOT NULL,
+                heartbeat REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS leases (
+                id INTEGER PRIMARY KEY,
+                priority TEXT NOT NULL,
+                service TEXT NOT NULL,
+                expires_at REAL NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS services (
+                service TEXT PRIMARY KEY,
+                virtual_time REAL NOT NULL
+            );
+            """
+        )
+
+    def priority(self, call_site: Optional[str]) -> Priority:
+        """
+        呼び出し元の優先度を取得します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前（例: ``api.chat``）。
+
+        Returns
+        -------
+        Priority
+            対話的な呼び出しのパターンに一致する場合は ``interactive``、それ以外は ``batch``。
+        """
+        if call_site and any(fnmatch.fnmatchcase(call_site, pattern) for pattern in self.interactive_call_sites):
+            return "interactive"
+        return "batch"
+
+    @staticmethod
+    def service(call_site: Optional[str]) -> str:
+        """
+        呼び出し元のサービス名（``reddit.translate_title`` の ``reddit``）を取得します。
+        """
+        return call_site.split(".", 1)[0] if call_site else "default"
+
+    @contextlib.contextmanager
+    def lease(self, call_site: Optional[str]) -> Iterator[None]:
+        """
+        送信枠を確保できるまでスレッドをブロックし、with文の終了時に解放します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前。
+        """
+        ticket = self._enqueue(call_site)
+        try:
+            while not self._try_grant(ticket):
+                time.sleep(_POLL_INTERVAL)
+        except BaseException:
+            self._withdraw(ticket)
+            raise
+        stopped = threading.Event()
+        threading.Thread(target=self._keep_alive, args=(ticket, stopped), daemon=True).start()
+        try:
+            yield
+        finally:
+            stopped.set()
+            self._release(ticket)
+
+    @contextlib.asynccontextmanager
+    async def lease_async(self, call_site: Optional[str]) -> AsyncIterator[None]:
+        """
+        送信枠を確保できるまで待機し、async with文の終了時に解放します。
+
+        SQLiteへの書き込みは、他のプロセスのトランザクションを待つ間もイベントループを
+        止めないよう別スレッドで実行します。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前。
+        """
+        ticket = self._enqueue(call_site)
+        try:
+            while not await asyncio.to_thread(self._try_grant, ticket):
+                await asyncio.sleep(_POLL_INTERVAL)
+        except BaseException:
+            # キャンセルされても実行中の割り当てはスレッドで完了するため、割り当て済みの枠も解放する
+            await asyncio.to_thread(self._withdraw, ticket)
+            raise
+        keep_alive = asyncio.ensure_future(self._keep_alive_async(ticket))
+        try:
+            yield
+        finally:
+            keep_alive.cancel()
+            await asyncio.to_thread(self._release, ticket)
+
+    @contextlib.asynccontextmanager
+    async def lease_hedge_async(self, call_site: Optional[str], headroom: int) -> AsyncIterator[bool]:
+        """
+        重複リクエスト（ヘッジ）用の送信枠を、待機せずに確保できる場合のみ確保します。
+
+        ヘッジは応答が遅いリクエストの複製のため、待機中のリクエストの順番には並ばず、
+        送信枠の数（バッチ処理の場合は対話的な呼び出しの予約枠を除いた数）を
+        ``headroom`` 個まで超えて割り当てます。対話的な呼び出しが待っている間は
+        バッチ処理のヘッジを割り当てません。
+
+        Parameters
+        ----------
+        call_site : str or None
+            呼び出し元の名前。
+        headroom : int
+            送信枠の数を超えて割り当ててよい数。
+
+        Yields
+        ------
+        bool
+            確保した場合はTrue。確保した枠はasync with文の終了時に解放します。
+        """
+        ticket = secrets.randbits(62)
+        try:
+            granted = await asyncio.to_thread(self._try_grant_hedge, ticket, call_site, headroom)
+        except BaseException:
+            # キャンセルされても実行中の割り当てはスレッドで完了するため、割り当て済みの枠を解放する
+            await asyncio.to_thread(self._release, ticket)
+            raise
+        if not granted:
+            yield False
+            return
+        keep_alive = asyncio.ensure_future(self._keep_alive_async(ticket))
+        try:
+            yield True
+        finally:
+            keep_alive.cancel()
+            await asyncio.to_thread(self._release, ticket)
+
+    def _enqueue(self, call_site: Optional[str]) -> int:
+        """
+        待機中のリクエストとして登録し、そのIDを返します。
+
+        IDはプロセス間で重複しないよう乱数で生成します。
+        """
+        priority = self.priority(call_site)
+        service = self.service(call_site)
+        ticket = secrets.randbits(62)
+        with self._lock:
+            self._tickets[ticket] = (priority, service, self.weights.get(service, 1.0), time.time())
+            self._ranks_stale = True
+        return ticket
+
+    def _local_rank(self, ticket: int) -> int:
+        """
+        待機中のリクエストの、このプロセス内で割り当てる順番（0始まり）を取得します。
+        呼び出し元でロックを保持してください。
+
+        対話的な呼び出しを待機順に並べ、その後にバッチ処理の呼び出しを :meth:`_batch_order`
+        と同じ規則で並べます。
+        """
+        if self._ranks_stale:
+            interactive = []
+            batch = []
+            for key, (priority, service, weight, since) in self._tickets.items():
+                (interactive if priority == "interactive" else batch).append((key, service, weight, since))
+            order = [key for key, _, _, since in sorted(interactive, key=lambda item: (item[3], item[0]))]
+            order += self._fair_order(batch, self._clock, self._virtual_time)
+            self._ranks = {key: rank for rank, key in enumerate(order)}
+            self._ranks_stale = False
+        return self._ranks[ticket]
+
+    def _try_grant(self, ticket: int) -> bool:
+        """
+        送信枠を割り当てられれば割り当てます。
+
+        プロセス内の順番が ``slots`` 以内のリクエストだけが共有のテーブルに登録して
+        割り当てを試みるため、待機中のリクエストが多くてもテーブルへの書き込みは増えません。
+
+        Parameters
+        ----------
+        ticket : int
+            :meth:`_enqueue` で登録したID。
+
+        Returns
+        -------
+        bool
+            割り当てた場合はTrue。待機をやめたリクエストの場合はFalse。
+        """
+        with self._lock:
+            if ticket not in self._tickets:
+                return False
+            priority, service, weight, since = self._tickets[ticket]
+            if self._local_rank(ticket) >= self.slots:
+                return False
+
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                granted = self._grant_locked(ticket, priority, service, weight, since, now)
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+
+            if granted:
+                del self._tickets[ticket]
+                self._ranks_stale = True
+                waited = now - since
+                self._granted[priority] += 1
+                self._wait_total[priority] += waited
+                self._wait_max[priority] = max(self._wait_max[priority], waited)
+        return granted
+
+    def _try_grant_hedge(self, ticket: int, call_site: Optional[str], headroom: int) -> bool:
+        """
+        ヘッジ用の送信枠を割り当てられれば割り当てます。
+
+        Parameters
+        ----------
+        ticket : int
+            送信枠のID。
+        call_site : str or None
+            呼び出し元の名前。
+        headroom : int
+            送信枠の数を超えて割り当ててよい数。
+
+        Returns
+        -------
+        bool
+            割り当てた場合はTrue。
+        """
+        priority = self.priority(call_site)
+        service = self.service(call_site)
+        with self._lock:
+            now = time.time()
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                self._conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+                self._conn.execute("DELETE FROM waiters WHERE heartbeat < ?", (now - _WAITER_TTL,))
+                in_flight = dict(self._conn.execute(
+                    "SELECT priority, COUNT(*) FROM leases GROUP BY priority"
+                ).fetchall())
+                granted = sum(in_flight.values()) < self.slots + headroom
+                if granted and priority == "batch":
+                    interactive_waiting = self._conn.execute(
+                        "SELECT 1 FROM waiters WHERE priority = 'interactive' LIMIT 1"
+                    ).fetchone()
+                    granted = (
+                        interactive_waiting is None
+                        and in_flight.get("batch", 0) < self.slots - self.interactive_reserve + headroom
+                    )
+                if granted:
+                    self._conn.execute(
+                        "INSERT INTO leases (id, priority, service, expires_at) VALUES (?, ?, ?, ?)",
+                        (ticket, priority, service, now + self.lease_ttl)
+                    )
+                self._conn.execute("COMMIT")
+            except BaseException:
+                self._conn.execute("ROLLBACK")
+                raise
+        return granted
+
+    def _grant_locked(
+        self,
+        ticket: int,
+        priority: Priority,
+        service: str,
+        weight: float,
+        since: float,
+        now: float
+    ) -> bool:
+        """
+        トランザクション内で送信枠の割り当てを判定します。呼び出し元でロックを保持してください。
+        """
+        # 異常終了したプロセスの枠と待機者を取り除く
+        self._conn.execute("DELETE FROM leases WHERE expires_at < ?", (now,))
+        self._conn.execute("DELETE FROM waiters WHERE heartbeat < ?", (now - _WAITER_TTL,))
+
+        # 初めて割り当てを試みる場合と、長く止まっていて取り除かれた場合は登録する
+        self._conn.execute(
+            "INSERT OR IGNORE INTO waiters (id, priority, service, weight, since, heartbeat) VALUES (?, ?, ?, ?, ?, ?)",
+            (ticket, priority, service, weight, since, now)
+        )
+        self._conn.execute("UPDATE waiters SET heartbeat = ? WHERE id = ?", (now, ticket))
+
+        free = self.slots - self._conn.execute("SELECT COUNT(*) FROM leases").fetchone()[0]
+        interactive_waiters = [
+            row[0] for row in self._conn.execute(
+                "SELECT id FROM waiters WHERE priority = 'interactive' ORDER BY since, id"
+            )
+        ]
+
+        if priority == "interactive":
+            # 先に待っている対話的な呼び出しから順に、空いている枠を割り当てる
+            if interactive_waiters.index(ticket) >= free:
+                return False
+        else:
+            # 対話的な呼び出しが待っている間と、予約枠しか空いていない間は送信しない
+            free -= self.interactive_reserve
+            if interactive_waiters or free <= 0:
+                return False
+            order = self._batch_order()
+            if order.index(ticket) >= free:
+                return False
+
+            # 割り当てたサービスの仮想時刻を進める
+            start = max(self._clock, self._virtual_time.get(service, 0.0))
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO services (service, virtual_time) VALUES (?, ?)",
+                [(service, start + 1 / weight), (_VIRTUAL_CLOCK, start)]
+            )
+
+        self._conn.execute(
+            "INSERT INTO leases (id, priority, service, expires_at) VALUES (?, ?, ?, ?)",
+            (ticket, priority, service, now + self.lease_ttl)
+        )
+        self._conn.execute("DELETE FROM waiters WHERE id = ?", (ticket,))
+        return True
+
+    def _batch_order(self) -> List[int]:
+        """
+        すべてのプロセスで待機中のバッチ処理の呼び出しを、割り当てる順に並べたIDのリストを取得します。
+
+        あわせて仮想時刻を読み込み直します。呼び出し元でロックを保持してください。
+        """
+        virtual_time = dict(self._conn.execute("SELECT service, virtual_time FROM services").fetchall())
+        clock = virtual_time.pop(_VIRTUAL_CLOCK, 0.0)
+        if clock != self._clock or virtual_time != self._virtual_time:
+            self._clock, self._virtual_time = clock, virtual_time
+            self._ranks_stale = True
+
+        waiters = self._conn.execute(
+            "SELECT id, service, weight, since FROM waiters WHERE priority = 'batch'"
+        ).fetchall()
+        return self._fair_order(waiters, clock, virtual_time)
+
+    @staticmethod
+    def _fair_order(
+        waiters: Sequence[Tuple[int, str, float, float]],
+        clock: float,
+        virtual_time: Dict[str, float]
+    ) -> List[int]:
+        """
+        バッチ処理の呼び出しを、サービスの重みに応じて公平に割り当てる順に並べます。
+
+        サービスごとに待機順で並べ、k番目（0始まり）の呼び出しの開始タグを
+        ``max(システムの仮想時刻, サービスの仮想時刻) + k / 重み`` として、タグの小さい順に並べます。
+
+        Parameters
+        ----------
+        waiters : Sequence[Tuple[int, str, float, float]]
+            ID・サービス・重み・待機開始時刻の組のリスト。
+        clock : float
+            システムの仮想時刻（最後に割り当てた呼び出しの開始タグ）。
+        virtual_time : Dict[str, float]
+            サービスごとの仮想時刻（次に割り当てる呼び出しの開始タグの下限）。
+
+        Returns
+        -------
+        List[int]
+            割り当てる順に並べたIDのリスト。
+        """
+        tagged = []
+        position: Dict[str, int] = {}
+        for ticket, service, weight, since in sorted(waiters, key=lambda item: (item[3], item[0])):
+            k = position.get(service, 0)
+            position[service] = k + 1
+            tag = max(clock, virtual_time.get(service, 0.0)) + k / weight
+            tagged.append((tag, since, ticket))
+        return [ticket for _, _, ticket in sorted(tagged)]
+
+    def _withdraw(self, ticket: int) -> None:
+        """
+        待機をやめたリクエストの登録を取り消します。すでに割り当てていた場合は枠も解放します。
+        """
+        with self._lock:
+            self._tickets.pop(ticket, None)
+            self._ranks_stale = True
+            self._conn.execute("DELETE FROM waiters WHERE id = ?", (ticket,))
+            self._conn.execute("DELETE FROM leases WHERE id = ?", (ticket,))
+
+    def _renew(self, ticket: int) -> None:
+        """
+        保持している送信枠の期限を延ばします。
+        """
+        with self._lock:
+            self._conn.execute(
+                "UPDATE leases SET expires_at = ? WHERE id = ?", (time.time() + self.lease_ttl, ticket)
+            )
+
+    def _keep_alive(self, ticket: int, stopped: threading.Event) -> None:
+        """
+        ``stopped`` がセットされるまで、送信枠の期限を定期的に延ばします（スレッド用）。
+        """
+        while not stopped.wait(self.lease_ttl / 3):
+            self._renew(ticket)
+
+    async def _keep_alive_async(self, ticket: int) -> None:
+        """
+        キャンセルされるまで、送信枠の期限を定期的に延ばします。
+        """
+        while True:
+            await asyncio.sleep(self.lease_ttl / 3)
+            await asyncio.to_thread(self._renew, ticket)
+
+    def _release(self, ticket: int) -> None:
+        """
+        送信枠を解放します。
+        """
+        with self._lock:
+            self._conn.execute("DELETE FROM leases WHERE id = ?", (ticket,))
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        スケジューラーの統計情報を取得します。
+
+        Returns
+        -------
+        Dict[str, Any]
+            すべてのプロセスで送信中・待機中の数と、このプロセスでの優先度ごとの
+            割り当て数・平均待機時間・最大待機時間（秒）。
+        """
+        with self._lock:
+            in_flight = dict(self._conn.execute(
+                "SELECT priority, COUNT(*) FROM leases GROUP BY priority"
+            ).fetchall())
+            waiting = dict(self._conn.execute(
+                "SELECT priority, COUNT(*) FROM waiters GROUP BY priority"
+            ).fetchall())
+            return {
+                "slots": self.slots,
+                "interactive_reserve": self.interactive_reserve,
+                "priorities": {
+                    priority: {
+                        "in_flight": in_flight.get(priority, 0),
+                        "waiting": waiting.get(priority, 0),
+                        "granted": self._granted[priority],
+                        "wait_avg": round(self._wait_total[priority] / self._granted[priority], 3)
+                        if self._granted[priority] else 0.0,
+                        "wait_max": round(self._wait_max[priority], 3)
+                    }
+                    for priority in ("interactive", "batch")
+                }
+            }
+
+
+_default_scheduler: Optional[LLMScheduler] = None
+_default_scheduler_lock = threading.Lock()
+
+
+def get_llm_scheduler() -> Optional[LLMScheduler]:
+    """
+    プロセス全体で共有するスケジューラーを取得します。
+
+    設定は環境変数 GROK_SCHEDULER_ENABLED・GROK_SCHEDULER_PATH・GROK_SCHEDULER_SLOTS・
+    GROK_SCHEDULER_INTERACTIVE_RESERVE・GROK_SCHEDULER_LEASE_TTL（秒）・
+    GROK_SCHEDULER_INTERACTIVE（カンマ区切りのパターン）・GROK_SCHEDULER_WEIGHTS から読み込みます。
+
+    Returns
+    -------
+    LLMScheduler or None
+        共有のスケジューラー。GROK_SCHEDULER_ENABLED が false の場合はNone。
+    """
+    global _default_scheduler
+
+    if os.environ.get("GROK_SCHEDULER_ENABLED", "true").lower() in ("0", "false", "no", "off"):
+        return None
+
+    with _default_scheduler_lock:
+        if _default_scheduler is None:
+            interactive = os.environ.get("GROK_SCHEDULER_INTERACTIVE")
+            _default_scheduler = LLMScheduler(
+                path=os.environ.get("GROK_SCHEDULER_PATH", DEFAULT_SCHEDULER_PATH),
+                slots=int(os.environ.get("GROK_SCHEDULER_SLOTS", DEFAULT_SLOTS)),
+                interactive_reserve=int(
+                    os.environ.get("GROK_SCHEDULER_INTERACTIVE_RESERVE", DEFAULT_INTERACTIVE_RESERVE)
+                ),
+                lease_ttl=float(os.environ.get("GROK_SCHEDULER_LEASE_TTL", DEFAULT_LEASE_TTL)),
+                interactive_call_sites=[pattern.strip() for pattern in interactive.split(",") if pattern.strip()]
+                if interactive else DEFAULT_INTERACTIVE_CALL_SITES,
+                weights=parse_weights(os.environ.get("GROK_SCHEDULER_WEIGHTS"))
+            )
+        return _default_scheduler
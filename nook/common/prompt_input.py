@@ -0,0 +1,207 @@
+"""LLMに送る入力テキスト（記事の本文・投稿・コメントなど）を整形し、トークン数を切り詰めるユーティリティ。"""
+
+import html
+import os
+import re
+
+from bs4 import BeautifulSoup
+
+from nook.common.llm_metrics import get_metrics
+from nook.common.llm_profiles import get_llm_profiles
+from nook.common.token_counter import estimate_tokens
+
+# HTMLのタグを含むかの判定
+_TAG_PATTERN = re.compile(r"<(?:[a-zA-Z][a-zA-Z0-9]*|/[a-zA-Z][a-zA-Z0-9]*|!--)[^>]*>")
+
+# 本文として意味のない要素（トラッキングピクセル・スクリプト・埋め込みなど）
+_DROP_TAGS = ["script", "style", "noscript", "iframe", "img", "svg", "picture", "video", "audio", "object", "embed", "form"]
+
+# 前後で改行するブロック要素
+_BLOCK_TAGS = [
+    "p", "div", "li", "ul", "ol", "blockquote", "pre", "table", "tr",
+    "h1", "h2", "h3", "h4", "h5", "h6", "section", "article", "header", "footer", "figcaption"
+]
+
+# Markdownの画像とリンク（リンクは表示テキストだけを残す）
+_MARKDOWN_IMAGE_PATTERN = re.compile(r"!\[[^\]]*\]\([^)]*\)")
+_MARKDOWN_LINK_PATTERN = re.compile(r"\[([^\]]+)\]\((?:https?://|www\.|/)[^)]*\)")
+
+# URL
+_URL_PATTERN = re.compile(r"(?:https?://|www\.)[^\s<>\"')\]]+")
+
+# 定型文とみなす行（短い行のみ対象）
+_BOILERPLATE_PATTERNS = [
+    re.compile(pattern, re.IGNORECASE)
+    for pattern in (
+        r"^the post .+ appeared first on .+$",
+        r"^(read more|continue reading|read the full (article|story|post)|full article|click here|view (the )?(full )?(article|post))\b.*$",
+        r"^(share|share this|tweet|subscribe|sign up|advertisement|sponsored|related( posts| articles)?)\b[\s:!.…]*$",
+        r"^(article url|comments url|points|# comments):.*$",
+        r"^comments$",
+        r"^(\[(…|\.\.\.)\]|…|\.\.\.)$"
+    )
+]
+
+# 定型文とみなす行の最大の文字数
+_BOILERPLATE_MAX_CHARS = 120
+
+# 表示されない文字
+_INVISIBLE_PATTERN = re.compile(r"[\u200b\u200c\u200d\u2060\ufeff]")
+
+# 文の終わり（切り詰める位置の候補）
+_SENTENCE_END_PATTERN = re.compile(r"[.!?。！？](?=\s|$)|\n")
+
+# 切り詰めたことを示す記号
+_ELLIPSIS = "…"
+
+
+def prompt_compaction_enabled() -> bool:
+    """
+    入力テキストの整形と切り詰めを行うかを取得します。
+
+    環境変数 PROMPT_COMPACTION_ENABLED が false の場合は、取得したテキストをそのまま送ります。
+
+    Returns
+    -------
+    bool
+        行う場合はTrue。
+    """
+    return os.environ.get("PROMPT_COMPACTION_ENABLED", "true").lower() not in ("0", "false", "no", "off")
+
+
+def strip_markup(text: str) -> str:
+    """
+    HTMLのタグ・実体参照とMarkdownの画像・リンクを取り除きます。
+
+    Parameters
+    ----------
+    text : str
+        元のテキスト。
+
+    Returns
+    -------
+    str
+        表示されるテキストのみ。ブロック要素の区切りは改行で残します。
+    """
+    if _TAG_PATTERN.search(text):
+        soup = BeautifulSoup(text, "html.parser")
+        for tag in soup.find_all(_DROP_TAGS):
+            tag.decompose()
+        for tag in soup.find_all("br"):
+            tag.replace_with("\n")
+        for tag in soup.find_all(_BLOCK_TAGS):
+            tag.insert_before("\n")
+            tag.insert_after("\n")
+        text = soup.get_text()
+    else:
+        # Redditの本文は実体参照が二重にエスケープされることがある（例: &amp;#x200B;）
+        text = html.unescape(html.unescape(text))
+
+    text = _MARKDOWN_IMAGE_PATTERN.sub("", text)
+    return _MARKDOWN_LINK_PATTERN.sub(r"\1", text)
+
+
+def normalize_text(text: str) -> str:
+    """
+    LLMに送る入力テキストを整形します。
+
+    マークアップ・URL・定型文（「続きを読む」やフィードの署名など）を取り除き、空白をまとめます。
+
+    Parameters
+    ----------
+    text : str
+        元のテキスト。
+
+    Returns
+    -------
+    str
+        整形したテキスト。
+    """
+    if not text:
+        return ""
+
+    text = strip_markup(text)
+    text = _INVISIBLE_PATTERN.sub("", text)
+    text = _URL_PATTERN.sub("", text)
+
+    lines = []
+    for line in text.splitlines():
+        line = " ".join(line.split())
+        if len(line) <= _BOILERPLATE_MAX_CHARS and any(pattern.match(line) for pattern in _BOILERPLATE_PATTERNS):
+            continue
+        # 段落の区切りは空行1つにまとめる
+        if line or (lines and lines[-1]):
+            lines.append(line)
+
+    return "\n".join(lines).strip()
+
+
+def truncate_to_tokens(text: str, max_tokens: int) -> str:
+    """
+    テキストを見積もりのトークン数が上限に収まるよう切り詰めます。
+
+    なるべく文の終わりで切り、末尾に「…」を付けます。
+
+    Parameters
+    ----------
+    text : str
+        元のテキスト。
+    max_tokens : int
+        トークン数の上限。0以下の場合は切り詰めません。
+
+    Returns
+    -------
+    str
+        切り詰めたテキスト。
+    """
+    if max_tokens <= 0 or estimate_tokens(text) <= max_tokens:
+        return text
+
+    # 見積もりは先頭からの文字数に対して単調に増えるため、収まる最長の長さを二分探索で求める
+    low, high = 0, len(text)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if estimate_tokens(text[:middle]) < max_tokens:
+            low = middle
+        else:
+            high = middle - 1
+    head = text[:low]
+
+    # 後半に文の終わりがあればそこで切る
+    ends = [match.end() for match in _SENTENCE_END_PATTERN.finditer(head)]
+    if ends and ends[-1] >= len(head) // 2:
+        head = head[:ends[-1]]
+
+    return head.rstrip() + _ELLIPSIS
+
+
+def compact_prompt_input(text: str, call_site: str) -> str:
+    """
+    LLMに送る入力テキストを整形し、呼び出し元のプロファイルのトークン数に切り詰めます。
+
+    削減したトークン数（見積もり）は呼び出し元ごとに計測結果へ記録します。
+
+    Parameters
+    ----------
+    text : str
+        元のテキスト。
+    call_site : str
+        このテキストを送る呼び出し元の名前（例: ``tech_feed.translate_text``）。
+        プロファイルの ``input_tokens`` を上限にします。
+
+    Returns
+    -------
+    str
+        整形したテキスト。
+    """
+    if not text or not prompt_compaction_enabled():
+        return text
+
+    compacted = truncate_to_tokens(normalize_text(text), get_llm_profiles().get(call_site).input_tokens)
+
+    original_tokens = estimate_tokens(text)
+    compacted_tokens = estimate_tokens(compacted)
+    if compacted_tokens < original_tokens:
+        get_metrics().record_compaction(call_site, original_tokens, compacted_tokens)
+
+    return compacted
@@ -0,0 +1,419 @@
+"""LLM APIのレート制限を管理するユーティリティ。"""
+
+import asyncio
+import os
+import re
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from typing import Any, Mapping, Optional
+
+from tenacity import RetryCallState
+from tenacity.wait import wait_base, wait_exponential
+
+# レート制限のデフォルト設定
+DEFAULT_REQUESTS_PER_MINUTE = 60
+DEFAULT_TOKENS_PER_MINUTE = 100000
+DEFAULT_MAX_CONCURRENCY = 8
+
+# 同時実行数が空くのを待つ間のポーリング間隔（秒）
+_POLL_INTERVAL = 0.05
+
+# "1s", "6m0s", "250ms" 形式の期間
+_DURATION_PATTERN = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_duration(value: Optional[str]) -> Optional[float]:
+    """
+    レート制限ヘッダーの期間表記を秒に変換します。
+
+    Parameters
+    ----------
+    value : str or None
+        "20", "1.5s", "6m0s", "250ms" などの期間表記。
+
+    Returns
+    -------
+    float or None
+        秒数。解析できない場合はNone。
+    """
+    if not value:
+        return None
+
+    value = value.strip()
+    try:
+        return float(value)
+    except ValueError:
+        pass
+
+    matches = _DURATION_PATTERN.findall(value)
+    if not matches:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in matches)
+
+
+def retry_after_seconds(headers: Optional[Mapping[str, str]]) -> Optional[float]:
+    """
+    レスポンスヘッダーから再試行までの待機時間を取得します。
+
+    Parameters
+    ----------
+    headers : Mapping[str, str] or None
+        レスポンスヘッダー。
+
+    Returns
+    -------
+    float or None
+        待機秒数。ヘッダーがない場合はNone。
+    """
+    if not headers:
+        return None
+
+    retry_after_ms = headers.get("retry-after-ms")
+    if retry_after_ms:
+        try:
+            return float(retry_after_ms) / 1000
+        except ValueError:
+            pass
+
+    retry_after = headers.get("retry-after")
+    if not retry_after:
+        return None
+
+    seconds = parse_duration(retry_after)
+    if seconds is not None:
+        return seconds
+
+    # HTTP日付形式
+    try:
+        return max(0.0, parsedate_to_datetime(retry_after).timestamp() - time.time())
+    except (TypeError, ValueError):
+        return None
+
+
+def _response_headers(exception: Optional[BaseException]) -> Optional[Mapping[str, str]]:
+    """
+    例外に含まれるHTTPレスポンスのヘッダーを取得します。
+    """
+    response = getattr(exception, "response", None)
+    return getattr(response, "headers", None)
+
+
+class wait_retry_after(wait_base):
+    """
+    Retry-Afterヘッダーを優先するtenacityの待機戦略。
+
+    例外のレスポンスにRetry-Afterがあればその秒数だけ待機し、
+    なければ指数バックオフで待機します。
+
+    Parameters
+    ----------
+    multiplier : float, default=1
+        指数バックオフの係数。
+    min : float, default=2
+        指数バックオフの最小待機秒数。
+    max : float, default=10
+        待機秒数の上限。Retry-Afterの値にも適用されます。
+    """
+
+    def __init__(self, multiplier: float = 1, min: float = 2, max: float = 10):
+        self.max = max
+        self.fallback = wait_exponential(multiplier=multiplier, min=min, max=max)
+
+    def __call__(self, retry_state: RetryCallState) -> float:
+        exception = retry_state.outcome.exception() if retry_state.outcome else None
+        seconds = retry_after_seconds(_response_headers(exception))
+        if seconds is not None:
+            return min(seconds, self.max)
+        return self.fallback(retry_state)
+
+
+class _TokenBucket:
+    """
+    一定の速度で補充されるトークンバケット。
+
+    Parameters
+    ----------
+    per_minute : float
+        1分あたりの補充量（バケットの容量）。
+    """
+
+    def __init__(self, per_minute: float):
+        # 設定した上限（ヘッダーの値でこれより大きくはしない）
+        self.limit = float(per_minute)
+        self.capacity = float(per_minute)
+        self.available = float(per_minute)
+        self.updated_at = time.monotonic()
+
+    def refill(self, now: float) -> None:
+        elapsed = now - self.updated_at
+        self.available = min(self.capacity, self.available + elapsed * self.capacity / 60)
+        self.updated_at = now
+
+    def wait_time(self, amount: float) -> float:
+        # 容量を超える要求は満杯になった時点で通す
+        amount = min(amount, self.capacity)
+        if self.available >= amount:
+            return 0.0
+        return (amount - self.available) * 60 / self.capacity
+
+
+class RateLimiter:
+    """
+    リクエスト数・トークン数・同時実行数を制御するレートリミッター。
+
+    1分あたりのリクエスト数（RPM）とトークン数（TPM）をトークンバケットで制限し、
+    同時実行数はAIMD（成功時に加算的に増やし、429応答時に乗算的に減らす）で調整します。
+    レスポンスのレート制限ヘッダーとRetry-Afterを読み取り、クォータに合わせて
+    バケットの残量と待機時間を補正します。スレッドセーフで、同期・非同期の
+    どちらのクライアントからも共有できます。
+
+    Parameters
+    ----------
+    requests_per_minute : int, default=60
+        1分あたりのリクエスト数の上限。
+    tokens_per_minute : int, default=100000
+        1分あたりのトークン数の上限。
+    max_concurrency : int, default=8
+        同時実行数の上限。
+    min_concurrency : int, default=1
+        AIMDで減少させる同時実行数の下限。
+    """
+
+    def __init__(
+        self,
+        requests_per_minute: int = DEFAULT_REQUESTS_PER_MINUTE,
+        tokens_per_minute: int = DEFAULT_TOKENS_PER_MINUTE,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        min_concurrency: int = 1
+    ):
+        """
+        RateLimiterを初期化します。
+
+        Parameters
+        ----------
+        requests_per_minute : int, default=60
+            1分あたりのリクエスト数の上限。
+        tokens_per_minute : int, default=100000
+            1分あたりのトークン数の上限。
+        max_concurrency : int, default=8
+            同時実行数の上限。
+        min_concurrency : int, default=1
+            AIMDで減少させる同時実行数の下限。
+        """
+        self._lock = threading.Lock()
+        self._requests = _TokenBucket(requests_per_minute)
+        self._tokens = _TokenBucket(tokens_per_minute)
+        self.max_concurrency = max_concurrency
+        self.min_concurrency = min_concurrency
+        self.concurrency_limit = float(max_concurrency)
+        self.in_flight = 0
+        self._blocked_until = 0.0
+
+        self.rate_limited_count = 0
+
+    def _try_acquire(self, tokens: int, headroom: int = 0) -> float:
+        """
+        枠を確保できれば確保し、できなければ待機すべき秒数を返します。
+
+        Parameters
+        ----------
+        tokens : int
+            このリクエストで消費する見込みのトークン数。
+        headroom : int, default=0
+            同時実行数の上限を超えて確保してよい数。
+
+        Returns
+        -------
+        float
+            0.0の場合は確保済み。正の値の場合は再試行までの待機秒数。
+        """
+        with self._lock:
+            now = time.monotonic()
+            if now < self._blocked_until:
+                return self._blocked_until - now
+
+            if self.in_flight >= int(self.concurrency_limit) + headroom:
+                return _POLL_INTERVAL
+
+            self._requests.refill(now)
+            self._tokens.refill(now)
+            wait = max(self._requests.wait_time(1), self._tokens.wait_time(tokens))
+            if wait > 0:
+                return wait
+
+            self._requests.available -= 1
+            self._tokens.available -= min(tokens, self._tokens.capacity)
+            self.in_flight += 1
+            return 0.0
+
+    def acquire(self, tokens: int) -> None:
+        """
+        リクエストを送信できるまでスレッドをブロックします。
+
+        Parameters
+        ----------
+        tokens : int
+            このリクエストで消費する見込みのトークン数。
+        """
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            time.sleep(wait)
+
+    async def acquire_async(self, tokens: int) -> None:
+        """
+        リクエストを送信できるまで待機します。
+
+        Parameters
+        ----------
+        tokens : int
+            このリクエストで消費する見込みのトークン数。
+        """
+        while True:
+            wait = self._try_acquire(tokens)
+            if wait <= 0:
+                return
+            await asyncio.sleep(wait)
+
+    def try_acquire(self, tokens: int, headroom: int = 0) -> bool:
+        """
+        待機せずに送信できる場合のみ枠を確保します。
+
+        重複リクエスト（ヘッジ）用です。RPM・TPMの制限と429応答後の待機は通常どおり守り、
+        同時実行数だけは上限を ``headroom`` 個まで超えて確保します。
+
+        Parameters
+        ----------
+        tokens : int
+            このリクエストで消費する見込みのトークン数。
+        headroom : int, default=0
+            同時実行数の上限を超えて確保してよい数。
+
+        Returns
+        -------
+        bool
+            確保した場合はTrue。確保した場合は通常どおり :meth:`release` を呼び出してください。
+        """
+        return self._try_acquire(tokens, headroom) <= 0
+
+    def release(
+        self,
+        reserved_tokens: int,
+        used_tokens: Optional[int] = None,
+        headers: Optional[Mapping[str, str]] = None,
+        rate_limited: bool = False,
+        succeeded: bool = False
+    ) -> None:
+        """
+        リクエストの完了を通知し、結果に応じて制限を調整します。
+
+        Parameters
+        ----------
+        reserved_tokens : int
+            acquireで確保したトークン数。
+        used_tokens : int, optional
+            実際に消費したトークン数。指定した場合は差分をバケットに戻します。
+        headers : Mapping[str, str], optional
+            レスポンスヘッダー。レート制限ヘッダーとRetry-Afterを読み取ります。
+        rate_limited : bool, default=False
+            429応答を受け取った場合はTrue。
+        succeeded : bool, default=False
+            応答を正常に受け取った場合はTrue。同時実行数はこの場合のみ増やします
+            （5xxやタイムアウトでは増やしません）。
+        """
+        with self._lock:
+            now = time.monotonic()
+            self.in_flight = max(0, self.in_flight - 1)
+
+            if used_tokens is not None:
+                self._tokens.refill(now)
+                refund = min(reserved_tokens, self._tokens.capacity) - used_tokens
+                self._tokens.available = min(self._tokens.capacity, self._tokens.available + refund)
+
+            if rate_limited:
+                # 乗算的減少
+                self.rate_limited_count += 1
+                self.concurrency_limit = max(float(self.min_concurrency), self.concurrency_limit / 2)
+                self._requests.available = min(self._requests.available, 0.0)
+                wait = retry_after_seconds(headers)
+                if wait is None:
+                    wait = parse_duration((headers or {}).get("x-ratelimit-reset-requests")) or 1.0
+                self._blocked_until = max(self._blocked_until, now + wait)
+            elif succeeded:
+                # 加算的増加（同時実行数ぶん成功するとおよそ1増える）
+                self.concurrency_limit = min(
+                    float(self.max_concurrency),
+                    self.concurrency_limit + 1 / self.concurrency_limit
+                )
+
+            if headers:
+                self._apply_headers(headers, now)
+
+    def _apply_headers(self, headers: Mapping[str, Any], now: float) -> None:
+        """
+        レート制限ヘッダーの値でバケットを補正します。呼び出し元でロックを保持してください。
+
+        ヘッダーの上限が設定した上限より小さい場合のみ、バケットの容量をヘッダーの上限に合わせます。
+        """
+        for bucket, kind in ((self._requests, "requests"), (self._tokens, "tokens")):
+            limit = headers.get(f"x-ratelimit-limit-{kind}")
+            remaining = headers.get(f"x-ratelimit-remaining-{kind}")
+            try:
+                if limit is not None:
+                    bucket.capacity = min(bucket.limit, float(limit))
+                    bucket.available = min(bucket.available, bucket.capacity)
+                if remaining is not None:
+                    bucket.available = min(bucket.available, float(remaining))
+            except ValueError:
+                continue
+
+            if remaining is not None and bucket.available <= 0:
+                reset = parse_duration(headers.get(f"x-ratelimit-reset-{kind}"))
+                if reset:
+                    self._blocked_until = max(self._blocked_until, now + reset)
+
+    def stats(self) -> dict:
+        """
+        現在の状態を取得します。
+
+        Returns
+        -------
+        dict
+            同時実行数の上限・実行中の数・429応答の回数。
+        """
+        with self._lock:
+            return {
+                "concurrency_limit": round(self.concurrency_limit, 2),
+                "in_flight": self.in_flight,
+                "rate_limited": self.rate_limited_count
+            }
+
+
+_default_limiter: Optional[RateLimiter] = None
+_default_limiter_lock = threading.Lock()
+
+
+def get_rate_limiter() -> RateLimiter:
+    """
+    プロセス全体で共有するレートリミッターを取得します。
+
+    設定は環境変数 GROK_RPM・GROK_TPM・GROK_MAX_CONCURRENCY から読み込みます。
+
+    Returns
+    -------
+    RateLimiter
+        共有レートリミッター。
+    """
+    global _default_limiter
+
+    with _default_limiter_lock:
+        if _default_limiter is None:
+            _default_limiter = RateLimiter(
+                requests_per_minute=int(os.environ.get("GROK_RPM", DEFAULT_REQUESTS_PER_MINUTE)),
+                tokens_per_minute=int(os.environ.get("GROK_TPM", DEFAULT_TOKENS_PER_MINUTE)),
+                max_concurrency=int(os.environ.get("GROK_MAX_CONCURRENCY", DEFAULT_MAX_CONCURRENCY))
+            )
+        return _default_limiter
@@ -0,0 +1,175 @@
+"""サービスの実行で項目ごとに完了した段階を記録し、途中で終了した実行を再開するためのジャーナル。"""
+
+import json
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from nook.common.storage import JsonLinesWriter
+
+# ジャーナルを保存するディレクトリ（ベースディレクトリからの相対パス）
+_JOURNAL_DIR = ".journal"
+
+# 項目ごとに記録する段階（この順に進む）
+STAGES = ("fetched", "translated", "summarized", "stored")
+
+
+class RunJournal:
+    """
+    1回の実行で、項目ごとに完了した段階（取得・翻訳・要約・保存）を記録するクラス。
+
+    ジャーナルは ``<ベースディレクトリ>/.journal/<サービス名>/<日付>.jsonl`` に、
+    1件の記録を1行として追記します。実行が最後まで完了した場合は削除されるため、
+    残っているジャーナルは途中で終了した実行のものです。
+
+    Parameters
+    ----------
+    path : Path
+        ジャーナルのファイルのパス。
+    resume : bool, default=False
+        Trueの場合は既存の記録を読み込んで続きから記録します。Falseの場合は既存の記録を破棄します。
+    """
+
+    def __init__(self, path: Path, resume: bool = False):
+        """
+        RunJournalを初期化します。
+
+        Parameters
+        ----------
+        path : Path
+            ジャーナルのファイルのパス。
+        resume : bool, default=False
+            Trueの場合は既存の記録を読み込んで続きから記録します。Falseの場合は既存の記録を破棄します。
+        """
+        self.path = path
+        # 項目IDごとの、完了した段階とその時点のデータ
+        self._stages: Dict[str, Dict[str, Dict[str, Any]]] = {}
+
+        if resume:
+            self._load()
+        else:
+            self.path.unlink(missing_ok=True)
+
+        self._writer = JsonLinesWriter(self.path)
+
+    @classmethod
+    def open(cls, base_dir: Path, service_name: str, resume: bool = False) -> "RunJournal":
+        """
+        サービスの実行のジャーナルを開きます。
+
+        Parameters
+        ----------
+        base_dir : Path
+            ストレージのベースディレクトリ。
+        service_name : str
+            サービス名。
+        resume : bool, default=False
+            Trueの場合、今日の実行が途中で終了していれば、そのジャーナルを開きます。
+            Falseの場合や今日の実行のジャーナルがない場合は、今日の日付で新しいジャーナルを作成します。
+            前日以前のジャーナルは、その日の項目を今日の日付で保存してしまうため再開に使わず削除します。
+
+        Returns
+        -------
+        RunJournal
+            ジャーナル。
+        """
+        journal_dir = Path(base_dir) / _JOURNAL_DIR / service_name
+        path = journal_dir / f"{datetime.now().strftime('%Y-%m-%d')}.jsonl"
+
+        # 前日以前に途中で終了した実行の記録は使わない
+        for stale_path in journal_dir.glob("*.jsonl"):
+            if stale_path != path:
+                print(f"前日以前のジャーナルを削除します: {stale_path}")
+                stale_path.unlink(missing_ok=True)
+
+        if resume and path.exists():
+            print(f"前回の実行を再開します: {path}")
+            return cls(path, resume=True)
+
+        return cls(path)
+
+    def record(self, item_id: str, stage: str, data: Optional[Dict[str, Any]] = None) -> None:
+        """
+        項目の段階が完了したことを記録します。
+
+        Parameters
+        ----------
+        item_id : str
+            項目ID（投稿ID・記事のURLなど）。
+        stage : str
+            完了した段階（``STAGES`` のいずれか）。
+        data : Dict[str, Any], optional
+            再開するときに使うデータ（取得した内容・翻訳結果・要約など）。
+        """
+        if stage not in STAGES:
+            raise ValueError(f"Unknown stage: {stage}")
+
+        data = data or {}
+        self._writer.append_record({"id": item_id, "stage": stage, "data": data})
+        self._stages.setdefault(item_id, {})[stage] = data
+
+    def get(self, item_id: str, stage: str) -> Optional[Dict[str, Any]]:
+        """
+        項目の段階が完了したときに記録したデータを取得します。
+
+        Parameters
+        ----------
+        item_id : str
+            項目ID。
+        stage : str
+            段階。
+
+        Returns
+        -------
+        Dict[str, Any] or None
+            記録したデータ。その段階が完了していない場合はNone。
+        """
+        return self._stages.get(item_id, {}).get(stage)
+
+    def has(self, item_id: str, stage: str) -> bool:
+        """
+        項目の段階が完了しているかを取得します。
+
+        Parameters
+        ----------
+        item_id : str
+            項目ID。
+        stage : str
+            段階。
+
+        Returns
+        -------
+        bool
+            完了している場合はTrue。
+        """
+        return stage in self._stages.get(item_id, {})
+
+    def close(self) -> None:
+        """
+        ジャーナルを閉じます。記録は次の再開のために残します。
+        """
+        self._writer.close()
+
+    def finish(self) -> None:
+        """
+        実行が最後まで完了したものとして、ジャーナルを閉じて削除します。
+        """
+        self._writer.close()
+        self.path.unlink(missing_ok=True)
+
+    def _load(self) -> None:
+        """
+        既存の記録を読み込みます。書き込み中に終了した不完全な行は読み飛ばします。
+        """
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return
+
+        for line in lines:
+            try:
+                entry = json.loads(line)
+                self._stages.setdefault(entry["id"], {})[entry["stage"]] = entry.get("data") or {}
+            except (json.JSONDecodeError, KeyError, TypeError):
+                continue
@@ -0,0 +1,270 @@
+"""キャッシュや翻訳メモリで共有する、合計サイズの上限付きのSQLiteのキーバリューストア。"""
+
+import os
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterable, Optional, Sequence, Tuple
+
+# 何回書き込むごとに期限切れ・サイズ超過のエントリを削除するか
+_PURGE_INTERVAL = 100
+
+# SQLiteのプレースホルダ数の上限を超えないよう、まとめて検索する件数
+_LOOKUP_CHUNK = 500
+
+
+def enabled_from_env(name: str) -> bool:
+    """
+    機能を有効にするかを環境変数から取得します。
+
+    Parameters
+    ----------
+    name : str
+        環境変数名。
+
+    Returns
+    -------
+    bool
+        環境変数が 0・false・no・off のいずれでもない場合（未設定の場合を含む）はTrue。
+    """
+    return os.environ.get(name, "true").lower() not in ("0", "false", "no", "off")
+
+
+def max_bytes_from_env(name: str, default_mb: float) -> int:
+    """
+    メガバイト単位で指定された合計サイズの上限を環境変数から取得します。
+
+    Parameters
+    ----------
+    name : str
+        環境変数名。
+    default_mb : float
+        環境変数が未設定の場合の上限（メガバイト）。
+
+    Returns
+    -------
+    int
+        合計サイズの上限（バイト）。
+    """
+    return int(float(os.environ.get(name, default_mb)) * 1024 * 1024)
+
+
+class SQLiteLRUStore:
+    """
+    キーと値の列をSQLiteのテーブルに保存し、合計サイズの上限を超えた分を最終アクセスが古い順に削除するストア。
+
+    テーブルには値の列に加えて、キー（``key``）・サイズ（``size``）・作成時刻（``created_at``）・
+    最終アクセス時刻（``accessed_at``）の列を持ちます。キーの生成方法と値の列は
+    サブクラスで決めてください。
+
+    Parameters
+    ----------
+    path : str | Path
+        保存するファイルのパス。
+    table : str
+        テーブル名。
+    columns : Sequence[str]
+        値の列名のリスト（いずれも ``TEXT NOT NULL``）。
+    max_bytes : int
+        保存する値の合計サイズの上限（バイト）。
+    ttl_seconds : int, optional
+        エントリの有効期間（秒）。指定しない場合は期限切れにしません。
+    """
+
+    def __init__(
+        self,
+        path: str | Path,
+        table: str,
+        columns: Sequence[str],
+        max_bytes: int,
+        ttl_seconds: Optional[int] = None
+    ):
+        """
+        SQLiteLRUStoreを初期化します。
+
+        Parameters
+        ----------
+        path : str | Path
+            保存するファイルのパス。
+        table : str
+            テーブル名。
+        columns : Sequence[str]
+            値の列名のリスト。
+        max_bytes : int
+            保存する値の合計サイズの上限（バイト）。
+        ttl_seconds : int, optional
+            エントリの有効期間（秒）。
+        """
+        self.path = Path(path)
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.max_bytes = max_bytes
+        self.ttl_seconds = ttl_seconds
+
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+        self._table = table
+        self._columns = tuple(columns)
+        self._lock = threading.Lock()
+        self._writes_since_purge = 0
+        self._conn = sqlite3.connect(self.path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        value_columns = "".join(f"{column} TEXT NOT NULL,\n" for column in self._columns)
+        self._conn.execute(
+            f"""
+            CREATE TABLE IF NOT EXISTS {table} (
+                key TEXT PRIMARY KEY,
+                {value_columns}size INTEGER NOT NULL,
+                created_at REAL NOT NULL,
+                accessed_at REAL NOT NULL
+            )
+            """
+        )
+        self._conn.execute(
+            f"CREATE INDEX IF NOT EXISTS idx_{table}_accessed_at ON {table} (accessed_at)"
+        )
+        self._conn.commit()
+        self.purge()
+
+    def _lookup(self, keys: Iterable[str], column: str) -> Dict[str, Any]:
+        """
+        キーの値をまとめて取得し、見つかったエントリの最終アクセス時刻を更新します。
+
+        ヒット数・ミス数は、入力のキー（重複を含む）ごとに数えます。
+
+        Parameters
+        ----------
+        keys : Iterable[str]
+            キーのリスト。
+        column : str
+            取得する値の列名。
+
+        Returns
+        -------
+        Dict[str, Any]
+            見つかったキーと値の辞書。存在しないキーと期限切れのキーは含みません。
+        """
+        keys = list(keys)
+        unique_keys = list(dict.fromkeys(keys))
+        found: Dict[str, Any] = {}
+        now = time.time()
+        expired_before = now - self.ttl_seconds if self.ttl_seconds is not None else None
+        with self._lock:
+            for start in range(0, len(unique_keys), _LOOKUP_CHUNK):
+                chunk = unique_keys[start:start + _LOOKUP_CHUNK]
+                placeholders = ", ".join("?" * len(chunk))
+                for key, value, created_at in self._conn.execute(
+                    f"SELECT key, {column}, created_at FROM {self._table} WHERE key IN ({placeholders})", chunk
+                ):
+                    if expired_before is None or created_at >= expired_before:
+                        found[key] = value
+
+            if found:
+                self._conn.executemany(
+                    f"UPDATE {self._table} SET accessed_at = ? WHERE key = ?",
+                    [(now, key) for key in found]
+                )
+                self._conn.commit()
+
+            hits = sum(1 for key in keys if key in found)
+            self.hits += hits
+            self.misses += len(keys) - hits
+        return found
+
+    def _store(self, key: str, values: Tuple[str, ...]) -> None:
+        """
+        キーと値を保存します。サイズは値のUTF-8でのバイト数の合計です。
+
+        Parameters
+        ----------
+        key : str
+            キー。
+        values : Tuple[str, ...]
+            値の列と同じ順序で並んだ値。
+        """
+        now = time.time()
+        size = sum(len(value.encode("utf-8")) for value in values)
+        names = ", ".join(("key",) + self._columns + ("size", "created_at", "accessed_at"))
+        placeholders = ", ".join("?" * (len(self._columns) + 4))
+        with self._lock:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self._table} ({names}) VALUES ({placeholders})",
+                (key, *values, size, now, now)
+            )
+            self._conn.commit()
+            self._writes_since_purge += 1
+            should_purge = self._writes_since_purge >= _PURGE_INTERVAL
+
+        if should_purge:
+            self.purge()
+
+    def purge(self) -> int:
+        """
+        期限切れのエントリと、サイズ上限を超えた分の最終アクセスが古いエントリを削除します。
+
+        Returns
+        -------
+        int
+            削除したエントリ数。
+        """
+        with self._lock:
+            self._writes_since_purge = 0
+            removed = 0
+            if self.ttl_seconds is not None:
+                cursor = self._conn.execute(
+                    f"DELETE FROM {self._table} WHERE created_at < ?",
+                    (time.time() - self.ttl_seconds,)
+                )
+                removed = cursor.rowcount
+
+            total_bytes = self._conn.execute(
+                f"SELECT COALESCE(SUM(size), 0) FROM {self._table}"
+            ).fetchone()[0]
+            if total_bytes > self.max_bytes:
+                # 最終アクセスが古い順に、上限を下回るまで削除
+                excess = total_bytes - self.max_bytes
+                victims = []
+                for key, size in self._conn.execute(
+                    f"SELECT key, size FROM {self._table} ORDER BY accessed_at"
+                ):
+                    victims.append((key,))
+                    excess -= size
+                    if excess <= 0:
+                        break
+                self._conn.executemany(f"DELETE FROM {self._table} WHERE key = ?", victims)
+                removed += len(victims)
+
+            self._conn.commit()
+            self.evictions += removed
+            return removed
+
+    def clear(self) -> None:
+        """
+        すべてのエントリを削除します。
+        """
+        with self._lock:
+            self._conn.execute(f"DELETE FROM {self._table}")
+            self._conn.commit()
+
+    def stats(self) -> Dict[str, int]:
+        """
+        統計情報を取得します。
+
+        Returns
+        -------
+        Dict[str, int]
+            ヒット数・ミス数・削除数・エントリ数・合計サイズ。
+        """
+        with self._lock:
+            entries, total_bytes = self._conn.execute(
+                f"SELECT COUNT(*), COALESCE(SUM(size), 0) FROM {self._table}"
+            ).fetchone()
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "evictions": self.evictions,
+            "entries": entries,
+            "bytes": total_bytes
+        }
@@ -0,0 +1,539 @@
+"""項目をSQLiteに保存し、全文検索できるようにするストレージ。"""
+
+import json
+import re
+import sqlite3
+import threading
+from dataclasses import dataclass
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional, Sequence, Tuple
+
+from nook.common.items import Item
+from nook.common.storage import LocalStorage
+
+# データベースのファイル名（ベースディレクトリからの相対パス）
+DEFAULT_DATABASE_NAME = "nook.sqlite3"
+
+# 検索結果の順位付けでの列ごとの重み（タイトル・要約・本文）
+_RANK_WEIGHTS = (10.0, 5.0, 1.0)
+
+# 検索結果の抜粋に含めるトークン数
+_SNIPPET_TOKENS = 24
+
+# trigramトークナイザーで検索できる最短の語の文字数
+_TRIGRAM_MIN_CHARS = 3
+
+# 短い語の索引で、バイグラムに分割する語（文字と数字の連続）
+_WORD_PATTERN = re.compile(r"[^\W_]+")
+
+
+@dataclass
+class SearchHit:
+    """
+    検索結果の1件。
+
+    Parameters
+    ----------
+    service : str
+        サービス名（ディレクトリ名）。
+    date : str
+        日付（YYYY-MM-DD）。
+    title : str
+        タイトル。
+    url : str | None
+        項目へのリンク。
+    snippet : str
+        一致した箇所の抜粋。一致した語は ``<mark>`` で囲みます。
+    rank : float
+        関連度（小さいほど関連が高い）。
+    """
+
+    service: str
+    date: str
+    title: str
+    url: Optional[str]
+    snippet: str
+    rank: float
+
+
+class SQLiteStorage(LocalStorage):
+    """
+    項目をSQLiteにも保存し、タイトル・要約・本文を全文検索できるストレージ。
+
+    MarkdownとJSON Linesのファイルは従来どおり保存し、SQLiteはそのファイルから
+    作り直せる索引として扱います。WALモードで開くため、APIが検索している間も
+    run_servicesが書き込めます。
+
+    Parameters
+    ----------
+    base_dir : str
+        ベースディレクトリのパス。
+    cache_bytes : int, default=0
+        読み込んだMarkdownをメモリに保持する上限（バイト）。0の場合はキャッシュしません。
+    path : str | Path, optional
+        データベースのファイルのパス。指定しない場合はベースディレクトリの nook.sqlite3。
+    """
+
+    def __init__(self, base_dir: str, cache_bytes: int = 0, path: Optional[str | Path] = None):
+        """
+        SQLiteStorageを初期化します。
+
+        データベースが空の場合は、保存済みのJSON Linesのファイルから項目を取り込みます。
+
+        Parameters
+        ----------
+        base_dir : str
+            ベースディレクトリのパス。
+        cache_bytes : int, default=0
+            読み込んだMarkdownをメモリに保持する上限（バイト）。
+        path : str | Path, optional
+            データベースのファイルのパス。
+        """
+        super().__init__(base_dir, cache_bytes=cache_bytes)
+        self.path = Path(path) if path else self.base_dir / DEFAULT_DATABASE_NAME
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(self.path, check_same_thread=False, timeout=30)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.execute(
+            """
+            CREATE TABLE IF NOT EXISTS items (
+                id INTEGER PRIMARY KEY,
+                service TEXT NOT NULL,
+                date TEXT NOT NULL,
+                position INTEGER NOT NULL,
+                title TEXT NOT NULL,
+                url TEXT,
+                text TEXT NOT NULL,
+                summary TEXT NOT NULL,
+                score INTEGER,
+                category TEXT,
+                channel TEXT,
+                extra TEXT NOT NULL
+            )
+            """
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_items_service_date ON items (service, date)")
+        self._conn.execute("CREATE INDEX IF NOT EXISTS idx_items_date ON items (date)")
+        self.trigram = self._create_fts_table()
+        # trigramで検索できない1〜2文字の語（「論文」「AI」など）を検索するための、バイグラムの索引
+        self._conn.create_function("nook_bigrams", 1, _bigrams, deterministic=True)
+        created = self._conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'items_bigram'").fetchone() is None
+        self._conn.execute(
+            "CREATE VIRTUAL TABLE IF NOT EXISTS items_bigram USING fts5("
+            "title, summary, text, tokenize='unicode61', prefix='1')"
+        )
+        if created:
+            # 以前のバージョンで作成したデータベースは、既存の項目から索引を作る
+            self._conn.execute(
+                "INSERT INTO items_bigram (rowid, title, summary, text) "
+                "SELECT id, nook_bigrams(title), nook_bigrams(summary), nook_bigrams(text) FROM items"
+            )
+        self._conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS items_after_insert AFTER INSERT ON items BEGIN
+                INSERT INTO items_fts (rowid, title, summary, text)
+                VALUES (new.id, new.title, new.summary, new.text);
+            END
+            """
+        )
+        self._conn.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS items_after_delete AFTER DELETE ON items BEGIN
+                INSERT INTO items_fts (items_fts, rowid, title, summary, text)
+                VALUES ('delete', old.id, old.title, old.summary, old.text);
+            END
+            """
+        )
+        self._conn.commit()
+
+        if self._conn.execute("SELECT 1 FROM items LIMIT 1").fetchone() is None:
+            self.reindex()
+
+    def _create_fts_table(self) -> bool:
+        """
+        全文検索の索引を作成します。
+
+        日本語は単語の区切りがないため、使える場合はtrigramトークナイザーで部分一致を検索します。
+
+        Returns
+        -------
+        bool
+            trigramトークナイザーを使う場合はTrue。
+        """
+        row = self._conn.execute("SELECT sql FROM sqlite_master WHERE name = 'items_fts'").fetchone()
+        if row:
+            return "trigram" in row[0]
+
+        try:
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE items_fts USING fts5("
+                "title, summary, text, content='items', content_rowid='id', tokenize='trigram')"
+            )
+            return True
+        except sqlite3.OperationalError:
+            # trigramに対応していない古いSQLiteでは単語単位で検索する
+            self._conn.execute(
+                "CREATE VIRTUAL TABLE items_fts USING fts5("
+                "title, summary, text, content='items', content_rowid='id', tokenize='unicode61')"
+            )
+            return False
+
+    def save_items(self, items: List[Item], service_name: str, date: Optional[datetime] = None) -> Path:
+        """
+        項目をJSON Lines形式で保存し、データベースの同じ日の項目を置き換えます。
+
+        Parameters
+        ----------
+        items : List[Item]
+            保存する項目のリスト。
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date : datetime, optional
+            日付。指定しない場合は現在の日付。
+
+        Returns
+        -------
+        Path
+            保存されたファイルのパス。
+        """
+        if date is None:
+            date = datetime.now()
+
+        file_path = super().save_items(items, service_name, date)
+        self._replace_items(service_name, date.strftime("%Y-%m-%d"), items)
+        return file_path
+
+    def load_items(self, service_name: str, date: Optional[datetime] = None) -> Optional[List[Item]]:
+        """
+        保存した項目を読み込みます。
+
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date : datetime, optional
+            日付。指定しない場合は現在の日付。
+
+        Returns
+        -------
+        List[Item] or None
+            読み込まれた項目のリスト。データベースにない場合はファイルから読み込み、
+            ファイルも存在しない場合はNone。
+        """
+        if date is None:
+            date = datetime.now()
+
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT title, url, text, summary, score, category, channel, extra FROM items "
+                "WHERE service = ? AND date = ? ORDER BY position",
+                (service_name, date.strftime("%Y-%m-%d"))
+            ).fetchall()
+
+        if not rows:
+            return super().load_items(service_name, date)
+
+        return [
+            Item(
+                title=title, url=url, text=text, summary=summary, score=score,
+                category=category, channel=channel, extra=json.loads(extra)
+            )
+            for title, url, text, summary, score, category, channel, extra in rows
+        ]
+
+    def reindex(self) -> int:
+        """
+        保存済みのJSON Linesのファイル（月ごとの圧縮ファイルにまとめたものを含む）から、
+        データベースの項目を作り直します。
+
+        Returns
+        -------
+        int
+            取り込んだ日数。
+        """
+        days = 0
+        for service_dir in sorted(self.base_dir.iterdir()):
+            if not service_dir.is_dir() or service_dir.name.startswith("."):
+                continue
+
+            # 月ごとの圧縮ファイルにまとめた日も取り込む
+            for date_str in self._stored_days(service_dir.name, ".jsonl"):
+                date = datetime.strptime(date_str, "%Y-%m-%d")
+                items = LocalStorage.load_items(self, service_dir.name, date)
+                self._replace_items(service_dir.name, date_str, items or [])
+                days += 1
+
+        if days:
+            print(f"{days} 日分の項目を検索の索引に取り込みました: {self.path}")
+        return days
+
+    def search(
+        self,
+        query: str,
+        services: Optional[Sequence[str]] = None,
+        date_from: Optional[datetime] = None,
+        date_to: Optional[datetime] = None,
+        limit: int = 20,
+        offset: int = 0
+    ) -> Tuple[int, List[SearchHit]]:
+        """
+        タイトル・要約・本文を全文検索します。
+
+        空白で区切った語をすべて含む項目を、関連度の高い順に返します。
+        trigramの索引で検索できない短い語を含む場合は、バイグラムの索引で検索します。
+
+        Parameters
+        ----------
+        query : str
+            検索語。
+        services : Sequence[str], optional
+            対象のサービス名。指定しない場合はすべてのサービス。
+        date_from : datetime, optional
+            この日付以降に絞り込みます。
+        date_to : datetime, optional
+            この日付以前に絞り込みます。
+        limit : int, default=20
+            返す件数。
+        offset : int, default=0
+            先頭から読み飛ばす件数。
+
+        Returns
+        -------
+        Tuple[int, List[SearchHit]]
+            一致した件数と、検索結果。
+        """
+        terms = query.split()
+        if not terms:
+            return 0, []
+
+        filters = []
+        params: List[object] = []
+        if services:
+            filters.append(f"items.service IN ({', '.join('?' * len(services))})")
+            params.extend(services)
+        if date_from:
+            filters.append("items.date >= ?")
+            params.append(date_from.strftime("%Y-%m-%d"))
+        if date_to:
+            filters.append("items.date <= ?")
+            params.append(date_to.strftime("%Y-%m-%d"))
+
+        if self.trigram and any(len(term) < _TRIGRAM_MIN_CHARS for term in terms):
+            return self._search_bigrams(terms, filters, params, limit, offset)
+
+        # 語を引用符で囲み、FTS5の演算子として解釈されないようにする
+        match = " ".join('"' + term.replace('"', '""') + '"' for term in terms)
+        where = " AND ".join(["items_fts MATCH ?"] + filters)
+        weights = ", ".join(str(weight) for weight in _RANK_WEIGHTS)
+
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM items_fts JOIN items ON items.id = items_fts.rowid WHERE {where}",
+                [match, *params]
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"""
+                SELECT items.service, items.date, items.title, items.url,
+                       snippet(items_fts, -1, '<mark>', '</mark>', '…', {_SNIPPET_TOKENS}),
+                       bm25(items_fts, {weights}) AS rank
+                FROM items_fts JOIN items ON items.id = items_fts.rowid
+                WHERE {where}
+                ORDER BY rank, items.date DESC
+                LIMIT ? OFFSET ?
+                """,
+                [match, *params, limit, offset]
+            ).fetchall()
+
+        return total, [SearchHit(*row) for row in rows]
+
+    def _search_bigrams(
+        self,
+        terms: List[str],
+        filters: List[str],
+        params: List[object],
+        limit: int,
+        offset: int
+    ) -> Tuple[int, List[SearchHit]]:
+        """
+        trigramの索引で検索できない短い語を含む場合に、バイグラムの索引で検索します。
+
+        各語はバイグラムの連続（フレーズ）として検索し、1文字の語はその文字で始まる
+        バイグラムの前方一致で検索します。
+
+        Parameters
+        ----------
+        terms : List[str]
+            検索語。
+        filters : List[str]
+            サービス・日付の絞り込みの条件。
+        params : List[object]
+            絞り込みの条件のパラメータ。
+        limit : int
+            返す件数。
+        offset : int
+            先頭から読み飛ばす件数。
+
+        Returns
+        -------
+        Tuple[int, List[SearchHit]]
+            一致した件数と、関連度の高い順の検索結果。
+        """
+        match = " ".join(_bigram_query(term) for term in terms).strip()
+        if not match:
+            return 0, []
+
+        where = " AND ".join(["items_bigram MATCH ?"] + filters)
+        weights = ", ".join(str(weight) for weight in _RANK_WEIGHTS)
+
+        with self._lock:
+            total = self._conn.execute(
+                f"SELECT COUNT(*) FROM items_bigram JOIN items ON items.id = items_bigram.rowid WHERE {where}",
+                [match, *params]
+            ).fetchone()[0]
+            rows = self._conn.execute(
+                f"""
+                SELECT items.service, items.date, items.title, items.url, items.summary, items.text,
+                       bm25(items_bigram, {weights}) AS rank
+                FROM items_bigram JOIN items ON items.id = items_bigram.rowid
+                WHERE {where}
+                ORDER BY rank, items.date DESC
+                LIMIT ? OFFSET ?
+                """,
+                [match, *params, limit, offset]
+            ).fetchall()
+
+        # 索引はバイグラムのため、抜粋は元のテキストから作る
+        hits = []
+        for service, date, title, url, summary, text, rank in rows:
+            snippet = _like_snippet(summary or text, terms[0])
+            hits.append(SearchHit(service=service, date=date, title=title, url=url, snippet=snippet, rank=rank))
+        return total, hits
+
+    def _replace_items(self, service_name: str, date_str: str, items: List[Item]) -> None:
+        """
+        データベースのサービス・日付の項目を置き換えます。
+
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date_str : str
+            日付（YYYY-MM-DD）。
+        items : List[Item]
+            項目のリスト。
+        """
+        rows = [
+            (
+                service_name, date_str, position, item.title, item.url, item.text or "", item.summary or "",
+                item.score, item.category, item.channel, json.dumps(item.extra, ensure_ascii=False)
+            )
+            for position, item in enumerate(items)
+        ]
+        with self._lock, self._conn:
+            self._conn.execute(
+                "DELETE FROM items_bigram WHERE rowid IN (SELECT id FROM items WHERE service = ? AND date = ?)",
+                (service_name, date_str)
+            )
+            self._conn.execute("DELETE FROM items WHERE service = ? AND date = ?", (service_name, date_str))
+            self._conn.executemany(
+                "INSERT INTO items (service, date, position, title, url, text, summary, score, category, channel, extra) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                rows
+            )
+            self._conn.execute(
+                "INSERT INTO items_bigram (rowid, title, summary, text) "
+                "SELECT id, nook_bigrams(title), nook_bigrams(summary), nook_bigrams(text) FROM items "
+                "WHERE service = ? AND date = ?",
+                (service_name, date_str)
+            )
+
+    def close(self) -> None:
+        """
+        データベースの接続を閉じます。
+        """
+        with self._lock:
+            self._conn.close()
+
+
+def _like_snippet(text: str, term: str, width: int = 60) -> str:
+    """
+    元のテキストから、検索語に一致した箇所の抜粋を作成します。
+
+    Parameters
+    ----------
+    text : str
+        抜粋を作るテキスト。
+    term : str
+        強調する語。
+    width : int, default=60
+        一致した箇所の前後に含める文字数。
+
+    Returns
+    -------
+    str
+        一致した語を ``<mark>`` で囲んだ抜粋。
+    """
+    position = text.lower().find(term.lower())
+    if position == -1:
+        return text[:width * 2] + ("…" if len(text) > width * 2 else "")
+
+    start = max(0, position - width)
+    end = min(len(text), position + len(term) + width)
+    return (
+        ("…" if start > 0 else "")
+        + text[start:position]
+        + "<mark>" + text[position:position + len(term)] + "</mark>"
+        + text[position + len(term):end]
+        + ("…" if end < len(text) else "")
+    )
+
+
+def _bigrams(text: Optional[str]) -> str:
+    """
+    バイグラムの索引に登録するトークン列を作成します。
+
+    文字と数字の連続ごとに、隣り合う2文字（バイグラム）と末尾の1文字をトークンにします。
+
+    Parameters
+    ----------
+    text : str or None
+        元のテキスト。
+
+    Returns
+    -------
+    str
+        空白で区切ったトークン列。
+    """
+    tokens = []
+    for word in _WORD_PATTERN.findall((text or "").lower()):
+        tokens.extend(word[i:i + 2] for i in range(len(word) - 1))
+        # 末尾の1文字も登録し、1文字の語の前方一致で語の末尾も見つかるようにする
+        tokens.append(word[-1])
+    return " ".join(tokens)
+
+
+def _bigram_query(term: str) -> str:
+    """
+    検索語をバイグラムの索引に対するFTS5の検索式に変換します。
+
+    Parameters
+    ----------
+    term : str
+        検索語。
+
+    Returns
+    -------
+    str
+        検索式。語に文字や数字が含まれない場合は空文字列。
+    """
+    phrases = []
+    for word in _WORD_PATTERN.findall(term.lower()):
+        if len(word) == 1:
+            phrases.append(f'"{word}"*')
+        else:
+            phrases.append('"' + " ".join(word[i:i + 2] for i in range(len(word) - 1)) + '"')
+    return " ".join(phrases)
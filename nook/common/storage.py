@@ -1,9 +1,158 @@
 """ローカルファイルシステムでのデータ操作ユーティリティ。"""
 
+import bisect
+import json
 import os
-from datetime import datetime
+import threading
+import zipfile
+from collections import OrderedDict
+from dataclasses import dataclass
+from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import Any, Dict, List, Optional, Tuple
+
+from nook.common.items import Item
+
+# 日付の索引を保存するディレクトリ（ベースディレクトリからの相対パス）
+_INDEX_DIR = ".index"
+
+# 古い日のファイルを月ごとにまとめた圧縮ファイルのディレクトリ（サービスのディレクトリからの相対パス）
+_ARCHIVE_DIR = "archive"
+
+# 月ごとの圧縮ファイルにまとめるファイルの拡張子
+_ARCHIVE_SUFFIXES = (".md", ".jsonl")
+
+# 生成中の日の項目を1件ずつ追記するファイルの拡張子
+_PARTIAL_SUFFIX = ".partial.jsonl"
+
+_DATE_FORMAT = "%Y-%m-%d"
+
+
+@dataclass
+class _CachedFile:
+    """
+    キャッシュしたファイルの内容。
+
+    Parameters
+    ----------
+    mtime_ns : int
+        読み込んだ時点のファイル（または月ごとの圧縮ファイル）の更新時刻（ナノ秒）。
+    size : int
+        読み込んだ時点のファイル（または月ごとの圧縮ファイル）のサイズ（バイト）。
+    content : str
+        ファイルの内容。
+    nbytes : int
+        内容のバイト数（キャッシュの上限の計算に使う）。
+    """
+
+    mtime_ns: int
+    size: int
+    content: str
+    nbytes: int
+
+
+class JsonLinesWriter:
+    """
+    レコードをJSON Lines形式で1件ずつファイルへ追記するクラス。
+    
+    各レコードは1行として1回の書き込みで追記し、fsyncしてから戻ります。
+    実行が途中で失敗しても、それまでに追記したレコードは失われません。
+    
+    Parameters
+    ----------
+    path : Path
+        追記するファイルのパス。
+    """
+    
+    def __init__(self, path: Path):
+        """
+        JsonLinesWriterを初期化し、ファイルを追記用に開きます。
+        
+        Parameters
+        ----------
+        path : Path
+            追記するファイルのパス。既にある場合は続きに追記します。
+        """
+        self.path = path
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self._lock = threading.Lock()
+        self._fd: Optional[int] = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+        self._drop_torn_line()
+    
+    def append_record(self, record: Dict[str, Any]) -> None:
+        """
+        レコードを1行追記します。
+        
+        Parameters
+        ----------
+        record : Dict[str, Any]
+            追記するレコード。
+        """
+        data = (json.dumps(record, ensure_ascii=False, separators=(",", ":")) + "\n").encode("utf-8")
+        with self._lock:
+            if self._fd is None:
+                raise ValueError(f"{type(self).__name__} is closed: {self.path}")
+            written = 0
+            while written < len(data):
+                written += os.write(self._fd, data[written:])
+            os.fsync(self._fd)
+    
+    def close(self) -> None:
+        """
+        ファイルを閉じます。1件も追記しなかった場合はファイルを削除します。
+        """
+        with self._lock:
+            if self._fd is not None:
+                empty = os.fstat(self._fd).st_size == 0
+                os.close(self._fd)
+                self._fd = None
+                if empty:
+                    self.path.unlink(missing_ok=True)
+    
+    def __enter__(self) -> "JsonLinesWriter":
+        return self
+    
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+    
+    def _drop_torn_line(self) -> None:
+        """
+        前回の実行が書き込みの途中で終了していた場合に、末尾の不完全な行を切り詰めます。
+        
+        残したままだと、次に追記する行が不完全な行とつながって読めなくなるためです。
+        """
+        size = os.fstat(self._fd).st_size
+        if size == 0:
+            return
+        
+        with open(self.path, "rb") as f:
+            content = f.read()
+        if content.endswith(b"\n"):
+            return
+        
+        os.truncate(self.path, content.rfind(b"\n") + 1)
+
+
+class ItemWriter(JsonLinesWriter):
+    """
+    生成中の日の項目を、1件ずつ生成されるたびにファイルへ追記するクラス。
+    
+    Parameters
+    ----------
+    path : Path
+        追記するファイルのパス。
+    """
+    
+    def append(self, item: Item) -> None:
+        """
+        項目を1行追記します。
+        
+        Parameters
+        ----------
+        item : Item
+            追記する項目。
+        """
+        self.append_record(item.to_dict())
 
 
 class LocalStorage:
@@ -14,9 +163,11 @@ class LocalStorage:
     ----------
     base_dir : str
         ベースディレクトリのパス。
+    cache_bytes : int, default=0
+        読み込んだMarkdownをメモリに保持する上限（バイト）。0の場合はキャッシュしません。
     """
     
-    def __init__(self, base_dir: str):
+    def __init__(self, base_dir: str, cache_bytes: int = 0):
         """
         LocalStorageを初期化します。
         
@@ -24,9 +175,23 @@ class LocalStorage:
         ----------
         base_dir : str
             ベースディレクトリのパス。
+        cache_bytes : int, default=0
+            読み込んだMarkdownをメモリに保持する上限（バイト）。0の場合はキャッシュしません。
+            キャッシュは（サービス名, 日付）ごとに保持し、ファイルの更新時刻とサイズが
+            変わっていないことを確かめてから返します。上限を超えた分は最後に使われたのが古いものから破棄します。
         """
         self.base_dir = Path(base_dir)
         self.base_dir.mkdir(parents=True, exist_ok=True)
+        self.cache_bytes = cache_bytes
+        self._cache: "OrderedDict[Tuple[str, str], _CachedFile]" = OrderedDict()
+        self._cache_lock = threading.Lock()
+        self._cached_bytes = 0
+        self._hits = 0
+        self._misses = 0
+        self._evictions = 0
+        # サービスごとの日付の索引（索引を作った時点のディレクトリの更新時刻と、昇順の日付）
+        self._date_indexes: Dict[str, Tuple[int, List[str]]] = {}
+        self._index_lock = threading.Lock()
     
     def save_markdown(self, content: str, service_name: str, date: Optional[datetime] = None) -> Path:
         """
@@ -54,10 +219,28 @@ class LocalStorage:
         service_dir.mkdir(parents=True, exist_ok=True)
         
         file_path = service_dir / f"{date_str}.md"
+        partial_path = service_dir / f"{date_str}{_PARTIAL_SUFFIX}"
+        dir_mtime_ns = service_dir.stat().st_mtime_ns
+        # 新しい日付のファイルは、書き込む前の索引に追加する
+        dates = None if file_path.exists() else self._date_index(service_name)
         
         with open(file_path, "w", encoding="utf-8") as f:
             f.write(content)
         
+        # 1日分のMarkdownができたので、生成中に追記した項目は不要になる
+        # （ディレクトリの更新時刻が変わるため、索引を更新する前に削除する）
+        removed = partial_path.exists()
+        partial_path.unlink(missing_ok=True)
+        
+        if dates is not None:
+            self._add_to_date_index(service_name, date_str, dates)
+        elif removed:
+            self._keep_date_index(service_name, dir_mtime_ns)
+        
+        # 書き込んだ内容でキャッシュを更新する
+        if self.cache_bytes > 0:
+            self._cache_put((service_name, date_str), file_path.stat(), content)
+        
         return file_path
     
     def load_markdown(self, service_name: str, date: Optional[datetime] = None) -> Optional[str]:
@@ -80,40 +263,659 @@ class LocalStorage:
             date = datetime.now()
         
         date_str = date.strftime("%Y-%m-%d")
-        file_path = self.base_dir / service_name / f"{date_str}.md"
         
-        if not file_path.exists():
+        if self.cache_bytes <= 0:
+            return self._read_day(service_name, date_str, ".md")
+        
+        key = (service_name, date_str)
+        stat = self._stat_day(service_name, date_str, ".md")
+        if stat is None:
+            self._cache_discard(key)
             return None
         
-        with open(file_path, "r", encoding="utf-8") as f:
-            return f.read()
+        # 更新時刻とサイズが読み込んだ時点と同じ場合のみキャッシュから返す
+        with self._cache_lock:
+            cached = self._cache.get(key)
+            if cached and cached.mtime_ns == stat.st_mtime_ns and cached.size == stat.st_size:
+                self._cache.move_to_end(key)
+                self._hits += 1
+                return cached.content
+            self._misses += 1
+        
+        content = self._read_day(service_name, date_str, ".md")
+        if content is None:
+            return None
+        
+        # 読み込み中に書き換えられた場合も、次の読み込みで更新時刻が一致せず読み直される
+        self._cache_put(key, stat, content)
+        return content
     
-    def list_dates(self, service_name: str) -> List[datetime]:
+    def save_items(self, items: List[Item], service_name: str, date: Optional[datetime] = None) -> Path:
         """
-        利用可能な日付の一覧を取得します。
+        項目をJSON Lines形式（1行に1件）で保存します。
         
         Parameters
         ----------
+        items : List[Item]
+            保存する項目のリスト。
         service_name : str
             サービス名（ディレクトリ名）。
+        date : datetime, optional
+            日付。指定しない場合は現在の日付。
             
         Returns
         -------
-        List[datetime]
-            利用可能な日付のリスト。
+        Path
+            保存されたファイルのパス。
         """
+        if date is None:
+            date = datetime.now()
+        
         service_dir = self.base_dir / service_name
+        service_dir.mkdir(parents=True, exist_ok=True)
         
-        if not service_dir.exists():
-            return []
+        file_path = service_dir / f"{date.strftime(_DATE_FORMAT)}.jsonl"
+        created = not file_path.exists()
+        dir_mtime_ns = service_dir.stat().st_mtime_ns
+        
+        with open(file_path, "w", encoding="utf-8") as f:
+            for item in items:
+                f.write(json.dumps(item.to_dict(), ensure_ascii=False, separators=(",", ":")) + "\n")
+        
+        # Markdown以外のファイルの追加で、日付の索引が無効にならないようにする
+        if created:
+            self._keep_date_index(service_name, dir_mtime_ns)
+        
+        return file_path
+    
+    def load_items(self, service_name: str, date: Optional[datetime] = None) -> Optional[List[Item]]:
+        """
+        JSON Lines形式で保存した項目を読み込みます。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date : datetime, optional
+            日付。指定しない場合は現在の日付。
+            
+        Returns
+        -------
+        List[Item] or None
+            読み込まれた項目のリスト。ファイルが存在しない場合はNone。
+        """
+        if date is None:
+            date = datetime.now()
+        
+        content = self._read_day(service_name, date.strftime(_DATE_FORMAT), ".jsonl")
+        if content is None:
+            return None
+        
+        return [Item.from_dict(json.loads(line)) for line in content.splitlines() if line.strip()]
+    
+    def open_item_writer(self, service_name: str, date: Optional[datetime] = None) -> ItemWriter:
+        """
+        生成中の日の項目を1件ずつ追記するライターを開きます。
+        
+        追記した項目は、その日のMarkdownを保存した時点で削除されます。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date : datetime, optional
+            日付。指定しない場合は現在の日付。
+            
+        Returns
+        -------
+        ItemWriter
+            ライター。使い終わったら閉じてください。
+        """
+        if date is None:
+            date = datetime.now()
+        
+        service_dir = self.base_dir / service_name
+        service_dir.mkdir(parents=True, exist_ok=True)
+        file_path = service_dir / f"{date.strftime(_DATE_FORMAT)}{_PARTIAL_SUFFIX}"
+        created = not file_path.exists()
+        dir_mtime_ns = service_dir.stat().st_mtime_ns
+        
+        writer = ItemWriter(file_path)
+        
+        # Markdown以外のファイルの追加で、日付の索引が無効にならないようにする
+        if created:
+            self._keep_date_index(service_name, dir_mtime_ns)
+        return writer
+    
+    def load_partial_items(self, service_name: str, date: Optional[datetime] = None) -> Optional[List[Item]]:
+        """
+        生成中の日に、それまでに追記された項目を読み込みます。
+        
+        書き込み中の不完全な行は読み飛ばします。前回の実行で追記した項目と重複する場合は、
+        後から追記したものを残します。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date : datetime, optional
+            日付。指定しない場合は現在の日付。
+            
+        Returns
+        -------
+        List[Item] or None
+            追記された順の項目のリスト。ファイルが存在しない場合や項目がない場合はNone。
+        """
+        if date is None:
+            date = datetime.now()
+        
+        file_path = self.base_dir / service_name / f"{date.strftime(_DATE_FORMAT)}{_PARTIAL_SUFFIX}"
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                lines = f.read().splitlines()
+        except FileNotFoundError:
+            return None
+        
+        items: Dict[str, Item] = {}
+        for line in lines:
+            try:
+                item = Item.from_dict(json.loads(line))
+            except (json.JSONDecodeError, AttributeError, TypeError):
+                continue
+            key = item.extra.get("id") or item.url or item.title
+            items.pop(key, None)
+            items[key] = item
+        
+        return list(items.values()) or None
+    
+    def archive(self, older_than_days: int, today: Optional[datetime] = None) -> Dict[str, int]:
+        """
+        古い日のファイルを、サービス・月ごとの圧縮ファイル（ZIP）にまとめます。
+        
+        ``<サービス>/<日付>.md`` と ``<サービス>/<日付>.jsonl`` を
+        ``<サービス>/archive/<YYYY-MM>.zip`` に移します。ZIPは末尾の目次から1日分だけを
+        展開できるため、まとめた日も load_markdown・load_items・list_dates からそのまま読み込めます。
+        すでに圧縮ファイルがある月は、その内容に追加します（同じ日のファイルは置き換えます）。
+        
+        Parameters
+        ----------
+        older_than_days : int
+            この日数より前の日をまとめます。
+        today : datetime, optional
+            基準の日付。指定しない場合は現在の日付。
+            
+        Returns
+        -------
+        Dict[str, int]
+            まとめた日数、ファイル数、まとめる前と後の合計バイト数。
+        """
+        cutoff = ((today or datetime.now()) - timedelta(days=older_than_days)).strftime(_DATE_FORMAT)
+        stats = {"days": 0, "files": 0, "bytes_before": 0, "bytes_after": 0}
+        
+        for service_dir in sorted(self.base_dir.iterdir()):
+            if not service_dir.is_dir() or service_dir.name.startswith("."):
+                continue
+            
+            # 月ごとに、まとめるファイルを集める
+            months: Dict[str, List[Path]] = {}
+            for file_path in service_dir.iterdir():
+                if not file_path.is_file() or file_path.suffix not in _ARCHIVE_SUFFIXES:
+                    continue
+                try:
+                    datetime.strptime(file_path.stem, _DATE_FORMAT)
+                except ValueError:
+                    continue
+                if file_path.stem < cutoff:
+                    months.setdefault(file_path.stem[:7], []).append(file_path)
+            
+            for month, file_paths in sorted(months.items()):
+                bundle_path = service_dir / _ARCHIVE_DIR / f"{month}.zip"
+                before = sum(file_path.stat().st_size for file_path in file_paths)
+                previous = bundle_path.stat().st_size if bundle_path.exists() else 0
+                
+                self._pack_bundle(bundle_path, file_paths)
+                
+                stats["days"] += len({file_path.stem for file_path in file_paths})
+                stats["files"] += len(file_paths)
+                stats["bytes_before"] += before
+                stats["bytes_after"] += bundle_path.stat().st_size - previous
+        
+        return stats
+    
+    def _pack_bundle(self, bundle_path: Path, file_paths: List[Path]) -> None:
+        """
+        ファイルを月ごとの圧縮ファイルに追加し、元のファイルを削除します。
+        
+        圧縮ファイルは一時ファイルに書き出してから置き換えるため、読み込み中のプロセスが
+        途中までしか書かれていない圧縮ファイルを読むことはありません。
+        
+        Parameters
+        ----------
+        bundle_path : Path
+            月ごとの圧縮ファイルのパス。
+        file_paths : List[Path]
+            追加するファイルのパス。
+        """
+        bundle_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = bundle_path.with_name(f"{bundle_path.name}.{os.getpid()}.tmp")
+        names = {file_path.name for file_path in file_paths}
+        
+        with zipfile.ZipFile(temp_path, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=9) as bundle:
+            if bundle_path.exists():
+                with zipfile.ZipFile(bundle_path) as previous:
+                    for info in previous.infolist():
+                        if info.filename not in names:
+                            bundle.writestr(info, previous.read(info))
+            for file_path in sorted(file_paths):
+                bundle.write(file_path, arcname=file_path.name)
+        
+        os.replace(temp_path, bundle_path)
+        for file_path in file_paths:
+            file_path.unlink()
+    
+    def _bundle_path(self, service_name: str, date_str: str) -> Path:
+        """
+        日付を含む月ごとの圧縮ファイルのパスを取得します。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date_str : str
+            日付（YYYY-MM-DD）。
+            
+        Returns
+        -------
+        Path
+            圧縮ファイルのパス。
+        """
+        return self.base_dir / service_name / _ARCHIVE_DIR / f"{date_str[:7]}.zip"
+    
+    def _stat_day(self, service_name: str, date_str: str, suffix: str) -> Optional[os.stat_result]:
+        """
+        1日分のファイルの情報を取得します。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date_str : str
+            日付（YYYY-MM-DD）。
+        suffix : str
+            拡張子（``.md`` または ``.jsonl``）。
+            
+        Returns
+        -------
+        os.stat_result or None
+            ファイルの情報。月ごとの圧縮ファイルにまとめた日は圧縮ファイルの情報。
+            どちらもない場合はNone。
+        """
+        for path in (self.base_dir / service_name / f"{date_str}{suffix}", self._bundle_path(service_name, date_str)):
+            try:
+                return path.stat()
+            except FileNotFoundError:
+                continue
+        return None
+    
+    def _read_day(self, service_name: str, date_str: str, suffix: str) -> Optional[str]:
+        """
+        1日分のファイルを読み込みます。
+        
+        まとめる前のファイルがあればそれを読み込み、なければ月ごとの圧縮ファイルから展開します。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date_str : str
+            日付（YYYY-MM-DD）。
+        suffix : str
+            拡張子（``.md`` または ``.jsonl``）。
+            
+        Returns
+        -------
+        str or None
+            ファイルの内容。どちらにもない場合はNone。
+        """
+        try:
+            with open(self.base_dir / service_name / f"{date_str}{suffix}", "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            pass
+        
+        try:
+            with zipfile.ZipFile(self._bundle_path(service_name, date_str)) as bundle:
+                return bundle.read(f"{date_str}{suffix}").decode("utf-8")
+        except (FileNotFoundError, KeyError):
+            return None
+    
+    def _stored_days(self, service_name: str, suffix: str) -> List[str]:
+        """
+        ファイルが保存されている日付を、月ごとの圧縮ファイルにまとめた日も含めて取得します。
         
-        dates = []
-        for file_path in service_dir.glob("*.md"):
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        suffix : str
+            拡張子（``.md`` または ``.jsonl``）。
+            
+        Returns
+        -------
+        List[str]
+            日付（YYYY-MM-DD）の昇順のリスト。
+        """
+        service_dir = self.base_dir / service_name
+        names = [file_path.name for file_path in service_dir.glob(f"*{suffix}")]
+        # 圧縮ファイルは末尾の目次のみを読む
+        for bundle_path in (service_dir / _ARCHIVE_DIR).glob("*.zip"):
             try:
-                date_str = file_path.stem
-                date = datetime.strptime(date_str, "%Y-%m-%d")
-                dates.append(date)
+                with zipfile.ZipFile(bundle_path) as bundle:
+                    names.extend(bundle.namelist())
+            except (OSError, zipfile.BadZipFile) as e:
+                print(f"Error reading archive {bundle_path}: {str(e)}")
+        
+        dates = set()
+        for name in names:
+            if not name.endswith(suffix):
+                continue
+            date_str = name[:-len(suffix)]
+            try:
+                datetime.strptime(date_str, _DATE_FORMAT)
+                dates.add(date_str)
             except ValueError:
                 continue
+        return sorted(dates)
+    
+    def list_dates(
+        self,
+        service_name: str,
+        start: Optional[datetime] = None,
+        end: Optional[datetime] = None
+    ) -> List[datetime]:
+        """
+        利用可能な日付の一覧を取得します。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        start : datetime, optional
+            この日付以降に絞り込みます。
+        end : datetime, optional
+            この日付以前に絞り込みます。
+            
+        Returns
+        -------
+        List[datetime]
+            利用可能な日付のリスト（新しい順）。
+        """
+        dates = self._date_index(service_name)
+        low = bisect.bisect_left(dates, start.strftime(_DATE_FORMAT)) if start else 0
+        high = bisect.bisect_right(dates, end.strftime(_DATE_FORMAT)) if end else len(dates)
+        return [datetime.strptime(date_str, _DATE_FORMAT) for date_str in reversed(dates[low:high])]
+    
+    def latest_date(self, service_name: str) -> Optional[datetime]:
+        """
+        最新の日付を取得します。
         
-        return sorted(dates, reverse=True) 
\ No newline at end of file
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+            
+        Returns
+        -------
+        datetime or None
+            最新の日付。ファイルがない場合はNone。
+        """
+        dates = self._date_index(service_name)
+        return datetime.strptime(dates[-1], _DATE_FORMAT) if dates else None
+    
+    def _date_index(self, service_name: str) -> List[str]:
+        """
+        サービスの日付の索引を取得します。
+        
+        ファイルの追加・削除でディレクトリの更新時刻が変わるため、更新時刻が索引を作った時点と
+        同じ間はメモリまたは保存した索引を使い、変わった場合のみディレクトリを走査して作り直します。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+            
+        Returns
+        -------
+        List[str]
+            日付（YYYY-MM-DD）の昇順のリスト。
+        """
+        service_dir = self.base_dir / service_name
+        try:
+            dir_mtime_ns = service_dir.stat().st_mtime_ns
+        except FileNotFoundError:
+            return []
+        
+        with self._index_lock:
+            dates = self._valid_date_index(service_name, dir_mtime_ns)
+            if dates is not None:
+                return dates
+            
+            # 走査中に追加されたファイルは、次の呼び出しで更新時刻が一致せず作り直される
+            dates = self._stored_days(service_name, ".md")
+            
+            self._save_date_index(service_name, dir_mtime_ns, dates)
+            return dates
+    
+    def _valid_date_index(self, service_name: str, dir_mtime_ns: int) -> Optional[List[str]]:
+        """
+        ディレクトリの更新時刻が一致する、メモリまたは保存した索引を取得します。
+        
+        呼び出し元で ``_index_lock`` を取得してください。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        dir_mtime_ns : int
+            ディレクトリの更新時刻（ナノ秒）。
+            
+        Returns
+        -------
+        List[str] or None
+            日付（YYYY-MM-DD）の昇順のリスト。有効な索引がない場合はNone。
+        """
+        cached = self._date_indexes.get(service_name)
+        if cached and cached[0] == dir_mtime_ns:
+            return cached[1]
+        
+        index_path = self._date_index_path(service_name)
+        try:
+            with open(index_path, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            if saved.get("dir_mtime_ns") == dir_mtime_ns:
+                self._date_indexes[service_name] = (dir_mtime_ns, saved["dates"])
+                return saved["dates"]
+        except (OSError, ValueError, KeyError, AttributeError):
+            pass
+        return None
+    
+    def _keep_date_index(self, service_name: str, dir_mtime_ns: int) -> None:
+        """
+        Markdown以外のファイル（JSON Lines・生成中の項目）を追加・削除したあとも、索引を有効なままにします。
+        
+        変更前の更新時刻で有効だった索引を、変更後の更新時刻で保存し直します。
+        変更前から無効だった場合は何もしません（次の読み込みで作り直されます）。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        dir_mtime_ns : int
+            ファイルを追加・削除する前のディレクトリの更新時刻（ナノ秒）。
+        """
+        with self._index_lock:
+            dates = self._valid_date_index(service_name, dir_mtime_ns)
+            if dates is None:
+                return
+            self._save_date_index(service_name, (self.base_dir / service_name).stat().st_mtime_ns, dates)
+    
+    def _add_to_date_index(self, service_name: str, date_str: str, dates: List[str]) -> None:
+        """
+        新しく保存した日付を索引に追加します。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date_str : str
+            日付（YYYY-MM-DD）。
+        dates : List[str]
+            ファイルを書き込む前の索引。
+        """
+        dir_mtime_ns = (self.base_dir / service_name).stat().st_mtime_ns
+        dates = list(dates)
+        position = bisect.bisect_left(dates, date_str)
+        if position == len(dates) or dates[position] != date_str:
+            dates.insert(position, date_str)
+        with self._index_lock:
+            self._save_date_index(service_name, dir_mtime_ns, dates)
+    
+    def _save_date_index(self, service_name: str, dir_mtime_ns: int, dates: List[str]) -> None:
+        """
+        日付の索引をメモリに保持し、ファイルに保存します。
+        
+        呼び出し元で ``_index_lock`` を取得してください。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        dir_mtime_ns : int
+            索引を作った時点のディレクトリの更新時刻（ナノ秒）。
+        dates : List[str]
+            日付（YYYY-MM-DD）の昇順のリスト。
+        """
+        self._date_indexes[service_name] = (dir_mtime_ns, dates)
+        
+        index_path = self._date_index_path(service_name)
+        index_path.parent.mkdir(parents=True, exist_ok=True)
+        temp_path = index_path.with_name(f"{index_path.name}.{os.getpid()}.tmp")
+        try:
+            with open(temp_path, "w", encoding="utf-8") as f:
+                json.dump({"dir_mtime_ns": dir_mtime_ns, "dates": dates}, f)
+            os.replace(temp_path, index_path)
+        except OSError as e:
+            print(f"Error saving date index for {service_name}: {str(e)}")
+    
+    def _date_index_path(self, service_name: str) -> Path:
+        """
+        日付の索引を保存するファイルのパスを取得します。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+            
+        Returns
+        -------
+        Path
+            索引のファイルのパス。
+        """
+        return self.base_dir / _INDEX_DIR / f"{service_name}.dates.json"
+    
+    def cache_stats(self) -> Dict[str, Any]:
+        """
+        読み込みのキャッシュの集計値を取得します。
+        
+        Returns
+        -------
+        Dict[str, Any]
+            ヒット数、ミス数、ヒット率、保持しているファイル数とバイト数、上限、破棄した数。
+        """
+        with self._cache_lock:
+            lookups = self._hits + self._misses
+            return {
+                "hits": self._hits,
+                "misses": self._misses,
+                "hit_ratio": round(self._hits / lookups, 3) if lookups else None,
+                "entries": len(self._cache),
+                "bytes": self._cached_bytes,
+                "max_bytes": self.cache_bytes,
+                "evictions": self._evictions
+            }
+    
+    def _cache_put(self, key: Tuple[str, str], stat: os.stat_result, content: str) -> None:
+        """
+        ファイルの内容をキャッシュに保持し、上限を超えた分を古いものから破棄します。
+        
+        Parameters
+        ----------
+        key : Tuple[str, str]
+            サービス名と日付（YYYY-MM-DD）。
+        stat : os.stat_result
+            読み込む前に取得したファイルの情報。
+        content : str
+            ファイルの内容。
+        """
+        nbytes = len(content.encode("utf-8"))
+        with self._cache_lock:
+            previous = self._cache.pop(key, None)
+            if previous:
+                self._cached_bytes -= previous.nbytes
+            
+            # 上限より大きいファイルはキャッシュしない
+            if nbytes > self.cache_bytes:
+                return
+            
+            self._cache[key] = _CachedFile(
+                mtime_ns=stat.st_mtime_ns, size=stat.st_size, content=content, nbytes=nbytes
+            )
+            self._cached_bytes += nbytes
+            while self._cached_bytes > self.cache_bytes:
+                _, evicted = self._cache.popitem(last=False)
+                self._cached_bytes -= evicted.nbytes
+                self._evictions += 1
+    
+    def _cache_discard(self, key: Tuple[str, str]) -> None:
+        """
+        キャッシュからファイルの内容を破棄します。
+        
+        Parameters
+        ----------
+        key : Tuple[str, str]
+            サービス名と日付（YYYY-MM-DD）。
+        """
+        with self._cache_lock:
+            previous = self._cache.pop(key, None)
+            if previous:
+                self._cached_bytes -= previous.nbytes
+
+
+def create_storage(base_dir: str, cache_bytes: int = 0) -> LocalStorage:
+    """
+    環境変数 STORAGE_BACKEND に応じたストレージを作成します。
+    
+    ``local``（既定）の場合はファイルのみの LocalStorage を作成します。``sqlite`` の場合は、
+    ファイルに加えて項目をSQLiteにも保存し、全文検索できる SQLiteStorage を作成します。
+    
+    Parameters
+    ----------
+    base_dir : str
+        ベースディレクトリのパス。
+    cache_bytes : int, default=0
+        読み込んだMarkdownをメモリに保持する上限（バイト）。0の場合はキャッシュしません。
+        
+    Returns
+    -------
+    LocalStorage
+        作成したストレージ。
+    """
+    backend = os.environ.get("STORAGE_BACKEND", "local").lower()
+    if backend == "local":
+        return LocalStorage(base_dir, cache_bytes=cache_bytes)
+    if backend != "sqlite":
+        raise ValueError(f"Unknown storage backend: {backend}")
+    
+    from nook.common.sqlite_storage import SQLiteStorage
+    
+    return SQLiteStorage(base_dir, cache_bytes=cache_bytes, path=os.environ.get("STORAGE_SQLITE_PATH") or None)
@@ -0,0 +1,123 @@
+"""長いテキストを文・段落の境界で分割するユーティリティ。"""
+
+import re
+from typing import List
+
+from nook.common.token_counter import estimate_tokens
+
+# 1チャンクあたりのトークン数のデフォルト値
+DEFAULT_CHUNK_TOKENS = 400
+
+# 分割に使う境界（優先度の高い順）: 段落・行・文・単語
+_BOUNDARY_PATTERNS = [
+    re.compile(r"\n[ \t]*\n\s*"),
+    re.compile(r"\n\s*"),
+    re.compile(r"(?<=[.!?])[\"')\]]*\s+|(?<=[。！？])\s*"),
+    re.compile(r"\s+")
+]
+
+
+def _split_after(text: str, pattern: re.Pattern) -> List[str]:
+    """
+    境界の直後で分割します。境界の空白は直前の断片に含めるため、連結すると元に戻ります。
+    """
+    pieces = []
+    start = 0
+    for match in pattern.finditer(text):
+        end = match.end()
+        if start < end < len(text):
+            pieces.append(text[start:end])
+            start = end
+    pieces.append(text[start:])
+    return pieces
+
+
+def _segments(text: str, max_tokens: int, level: int = 0) -> List[str]:
+    """
+    各断片がトークン数の上限に収まるまで、より細かい境界で再帰的に分割します。
+    """
+    if estimate_tokens(text) <= max_tokens:
+        return [text]
+
+    if level == len(_BOUNDARY_PATTERNS):
+        # 境界のない長い文字列は、CJK文字でも上限を超えない文字数で区切る
+        return [text[i:i + max_tokens] for i in range(0, len(text), max_tokens)]
+
+    segments = []
+    for piece in _split_after(text, _BOUNDARY_PATTERNS[level]):
+        segments.extend(_segments(piece, max_tokens, level + 1))
+    return segments
+
+
+def split_text(text: str, max_tokens: int = DEFAULT_CHUNK_TOKENS) -> List[str]:
+    """
+    テキストをトークン数の上限に収まるチャンクに分割します。
+
+    段落・行・文・単語の順に境界を探し、できるだけ大きな単位のまま
+    上限いっぱいまでまとめます。各チャンクは末尾の空白を含み、
+    すべてのチャンクを連結すると元のテキストに戻ります。
+
+    Parameters
+    ----------
+    text : str
+        分割するテキスト。
+    max_tokens : int, default=400
+        1チャンクあたりのトークン数の上限。
+
+    Returns
+    -------
+    List[str]
+        チャンクのリスト。空のテキストの場合は空のリスト。
+    """
+    if max_tokens < 1:
+        raise ValueError("max_tokens must be a positive integer")
+
+    if not text:
+        return []
+
+    chunks: List[str] = []
+    current = ""
+    for segment in _segments(text, max_tokens):
+        if current and estimate_tokens(current + segment) > max_tokens:
+            chunks.append(current)
+            current = segment
+        else:
+            current += segment
+
+    if current:
+        chunks.append(current)
+
+    return chunks
+
+
+def join_chunks(chunks: List[str], replacements: List[str]) -> str:
+    """
+    チャンクごとの変換結果（翻訳など）を、元のチャンク間の区切りを保って連結します。
+
+    Parameters
+    ----------
+    chunks : List[str]
+        :func:`split_text` で分割した元のチャンク。
+    replacements : List[str]
+        各チャンクの変換結果。
+
+    Returns
+    -------
+    str
+        連結したテキスト。段落の区切りは空行、行の区切りは改行、
+        それ以外は空白で連結します。
+    """
+    parts = []
+    for chunk, replacement in zip(chunks, replacements):
+        trailing = chunk[len(chunk.rstrip()):]
+        if trailing.count("\n") >= 2:
+            separator = "\n\n"
+        elif "\n" in trailing:
+            separator = "\n"
+        elif trailing:
+            separator = " "
+        else:
+            separator = ""
+        parts.append(replacement.strip() + separator)
+
+    return "".join(parts).strip()
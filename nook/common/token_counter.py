@@ -0,0 +1,35 @@
+"""トークン数の簡易見積もりユーティリティ。"""
+
+import math
+import re
+
+# 日本語・中国語・韓国語の文字（1文字あたりおよそ1トークン）
+_CJK_PATTERN = re.compile(r"[\u3040-\u30ff\u3400-\u4dbf\u4e00-\u9fff\uac00-\ud7af\uff00-\uffef]")
+
+# CJK以外の文字はおよそ4文字で1トークン
+_CHARS_PER_TOKEN = 4
+
+
+def estimate_tokens(text: str) -> int:
+    """
+    テキストのトークン数を見積もります。
+
+    トークナイザーを読み込まずに済むよう、CJK文字は1文字1トークン、
+    それ以外は4文字1トークンとして概算します。
+
+    Parameters
+    ----------
+    text : str
+        見積もるテキスト。
+
+    Returns
+    -------
+    int
+        見積もったトークン数。
+    """
+    if not text:
+        return 0
+
+    cjk_count = len(_CJK_PATTERN.findall(text))
+    other_count = len(text) - cjk_count
+    return cjk_count + math.ceil(other_count / _CHARS_PER_TOKEN)
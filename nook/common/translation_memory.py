@@ -0,0 +1,165 @@
+"""原文の正規化したテキストをキーにした、サービス間で共有する翻訳メモリ。"""
+
+import hashlib
+import os
+import re
+import threading
+import unicodedata
+from pathlib import Path
+from typing import Iterable, List, Optional
+
+from nook.common.sqlite_lru import SQLiteLRUStore, enabled_from_env, max_bytes_from_env
+
+# 翻訳メモリのデフォルト設定
+DEFAULT_MEMORY_PATH = "data/.cache/translation_memory.sqlite3"
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+_WHITESPACE_PATTERN = re.compile(r"\s+")
+
+
+def normalize_text(text: str) -> str:
+    """
+    翻訳メモリのキーに使うため、原文を正規化します。
+
+    Unicodeの互換文字を統一（NFKC）し、連続する空白・改行を1つの空白にまとめて
+    前後の空白を取り除きます。大文字・小文字は区別します。
+
+    Parameters
+    ----------
+    text : str
+        原文。
+
+    Returns
+    -------
+    str
+        正規化したテキスト。
+    """
+    return _WHITESPACE_PATTERN.sub(" ", unicodedata.normalize("NFKC", text)).strip()
+
+
+class TranslationMemory(SQLiteLRUStore):
+    """
+    原文から日本語訳を引く、SQLiteに保存する翻訳メモリ。
+
+    キーは正規化した原文のハッシュのみで、プロンプトの指示文やモデルの設定を含まないため、
+    同じテキストであれば別のサービス・別の日の翻訳でも再利用できます。
+    合計サイズの上限を超えた分は、最終アクセスが古いエントリから削除します。
+
+    Parameters
+    ----------
+    path : str | Path, default="data/.cache/translation_memory.sqlite3"
+        翻訳メモリのファイルのパス。
+    max_bytes : int, default=67108864
+        保存する原文と訳文の合計サイズの上限（バイト）。
+    """
+
+    def __init__(
+        self,
+        path: str | Path = DEFAULT_MEMORY_PATH,
+        max_bytes: int = DEFAULT_MAX_BYTES
+    ):
+        """
+        TranslationMemoryを初期化します。
+
+        Parameters
+        ----------
+        path : str | Path, default="data/.cache/translation_memory.sqlite3"
+            翻訳メモリのファイルのパス。
+        max_bytes : int, default=67108864
+            保存する原文と訳文の合計サイズの上限（バイト）。
+        """
+        super().__init__(path, "translations", ("source", "translation"), max_bytes)
+
+    @staticmethod
+    def make_key(text: str) -> str:
+        """
+        原文から翻訳メモリのキーを生成します。
+
+        Parameters
+        ----------
+        text : str
+            原文。
+
+        Returns
+        -------
+        str
+            正規化した原文のSHA-256のハッシュ値（16進数）。
+        """
+        return hashlib.sha256(normalize_text(text).encode("utf-8")).hexdigest()
+
+    def get(self, text: str) -> Optional[str]:
+        """
+        原文の訳文を取得します。
+
+        Parameters
+        ----------
+        text : str
+            原文。
+
+        Returns
+        -------
+        str or None
+            保存されている訳文。存在しない場合はNone。
+        """
+        return self.get_many([text])[0]
+
+    def get_many(self, texts: Iterable[str]) -> List[Optional[str]]:
+        """
+        複数の原文の訳文をまとめて取得します。
+
+        Parameters
+        ----------
+        texts : Iterable[str]
+            原文のリスト。
+
+        Returns
+        -------
+        List[str | None]
+            入力と同じ順序で並んだ訳文のリスト。存在しない要素はNone。
+        """
+        keys = [self.make_key(text) for text in texts]
+        found = self._lookup(keys, "translation")
+        return [found.get(key) for key in keys]
+
+    def set(self, text: str, translation: str) -> None:
+        """
+        原文と訳文を保存します。
+
+        Parameters
+        ----------
+        text : str
+            原文。
+        translation : str
+            訳文。
+        """
+        self._store(self.make_key(text), (text, translation))
+
+
+_default_memory: Optional[TranslationMemory] = None
+_default_memory_lock = threading.Lock()
+
+
+def get_translation_memory() -> Optional[TranslationMemory]:
+    """
+    プロセス全体で共有する翻訳メモリを取得します。
+
+    設定は環境変数 TRANSLATION_MEMORY_ENABLED・TRANSLATION_MEMORY_PATH・
+    TRANSLATION_MEMORY_MAX_MB から読み込みます。
+
+    Returns
+    -------
+    TranslationMemory or None
+        共有の翻訳メモリ。TRANSLATION_MEMORY_ENABLED が false の場合はNone。
+    """
+    global _default_memory
+
+    if not enabled_from_env("TRANSLATION_MEMORY_ENABLED"):
+        return None
+
+    with _default_memory_lock:
+        if _default_memory is None:
+            _default_memory = TranslationMemory(
+                path=os.environ.get("TRANSLATION_MEMORY_PATH", DEFAULT_MEMORY_PATH),
+                max_bytes=max_bytes_from_env("TRANSLATION_MEMORY_MAX_MB", 64)
+            )
+        return _default_memory
@@ -0,0 +1,482 @@
+"""テキストをまとめて、または分割して並行に翻訳するユーティリティ。"""
+
+import asyncio
+import json
+import re
+from typing import Dict, List, Optional
+
+from nook.common.grok_client import AsyncGrok3Client
+from nook.common.language_detector import classify_text
+from nook.common.text_chunker import DEFAULT_CHUNK_TOKENS, join_chunks, split_text
+from nook.common.token_counter import estimate_tokens
+from nook.common.translation_memory import TranslationMemory, get_translation_memory, normalize_text
+
+# バッチ翻訳のデフォルト設定
+DEFAULT_MAX_BATCH_TOKENS = 1500
+DEFAULT_MAX_BATCH_ITEMS = 20
+DEFAULT_MAX_ITEM_TOKENS = 200
+
+_BATCH_SYSTEM_INSTRUCTION = """
+あなたはプロの翻訳者です。
+入力はidとtextを持つオブジェクトのJSON配列です。
+各textを翻訳し、{"id": 入力と同じid, "translation": 翻訳結果} のオブジェクトを
+入力と同じ順序・同じ要素数で並べたJSON配列のみを出力してください。説明文は不要です。
+"""
+
+_JSON_ARRAY_PATTERN = re.compile(r"\[.*\]", re.DOTALL)
+
+
+class Translator:
+    """
+    テキストを日本語に翻訳するクラス。
+
+    短いテキストはトークン予算内で1つのJSON形式のプロンプトにまとめて翻訳し、
+    長いテキストやバッチ翻訳で結果を得られなかったテキストは1件ずつ翻訳します。
+    1件ずつ翻訳するテキストが ``max_chunk_tokens`` を超える場合は文・段落の境界で
+    分割し、チャンクを並行に翻訳してから元の順序で連結します。
+    すでに日本語のテキストや、URL・コード・絵文字のみのテキストはLLMに送らず
+    そのまま返し、省略した回数を呼び出し元ごとに記録します。
+    LLMに送る前に翻訳メモリを参照し、過去に翻訳したことのあるテキストは
+    プロンプトの指示文に関係なく保存済みの訳文を返します。
+    翻訳に失敗した場合は原文を返します。
+
+    Parameters
+    ----------
+    client : AsyncGrok3Client
+        翻訳に使用するGrok APIクライアント。
+    instruction : str
+        翻訳の指示文（例: 「以下の英語のテキストを自然な日本語に翻訳してください。」）。
+    temperature : float, optional
+        生成の多様性を制御するパラメータ。指定しない場合は呼び出し元のプロファイルの値。
+    max_tokens : int, optional
+        生成するトークンの最大数。指定しない場合は呼び出し元のプロファイル
+        （``translate.title``・``translate.text``・``translate.batch`` など）で
+        入力の長さから計算します。
+    max_batch_tokens : int, default=1500
+        1回のバッチに含める入力テキストの合計トークン数の上限。
+    max_batch_items : int, default=20
+        1回のバッチに含めるテキスト数の上限。
+    max_item_tokens : int, default=200
+        バッチにまとめるテキストのトークン数の上限。これを超えるテキストは1件ずつ翻訳します。
+    max_chunk_tokens : int, default=400
+        1回のリクエストで翻訳するテキストのトークン数の上限。これを超えるテキストは分割します。
+    call_site : str, optional
+        計測用の呼び出し元の名前のデフォルト値（例: ``reddit.translate``）。
+        バッチ翻訳のリクエストには末尾に ``.batch`` を付けて記録します。
+    memory : TranslationMemory, optional
+        参照・保存する翻訳メモリ。指定しない場合はプロセス共有の翻訳メモリ。
+    """
+
+    def __init__(
+        self,
+        client: AsyncGrok3Client,
+        instruction: str,
+        temperature: Optional[float] = None,
+        max_tokens: Optional[int] = None,
+        max_batch_tokens: int = DEFAULT_MAX_BATCH_TOKENS,
+        max_batch_items: int = DEFAULT_MAX_BATCH_ITEMS,
+        max_item_tokens: int = DEFAULT_MAX_ITEM_TOKENS,
+        max_chunk_tokens: int = DEFAULT_CHUNK_TOKENS,
+        call_site: Optional[str] = None,
+        memory: Optional[TranslationMemory] = None
+    ):
+        """
+        Translatorを初期化します。
+
+        Parameters
+        ----------
+        client : AsyncGrok3Client
+            翻訳に使用するGrok APIクライアント。
+        instruction : str
+            翻訳の指示文。
+        temperature : float, optional
+            生成の多様性を制御するパラメータ。
+        max_tokens : int, optional
+            生成するトークンの最大数。
+        max_batch_tokens : int, default=1500
+            1回のバッチに含める入力テキストの合計トークン数の上限。
+        max_batch_items : int, default=20
+            1回のバッチに含めるテキスト数の上限。
+        max_item_tokens : int, default=200
+            バッチにまとめるテキストのトークン数の上限。
+        max_chunk_tokens : int, default=400
+            1回のリクエストで翻訳するテキストのトークン数の上限。
+        call_site : str, optional
+            計測用の呼び出し元の名前のデフォルト値。
+        memory : TranslationMemory, optional
+            参照・保存する翻訳メモリ。
+        """
+        self.client = client
+        self.instruction = instruction
+        self.temperature = temperature
+        self.max_tokens = max_tokens
+        self.max_batch_tokens = max_batch_tokens
+        self.max_batch_items = max_batch_items
+        self.max_item_tokens = min(max_item_tokens, max_batch_tokens)
+        self.max_chunk_tokens = max_chunk_tokens
+        self.call_site = call_site
+        self.memory = memory or get_translation_memory()
+
+    async def translate(self, text: str, call_site: Optional[str] = None) -> str:
+        """
+        1件のテキストを翻訳します。
+
+        ``max_chunk_tokens`` を超えるテキストは文・段落の境界で分割し、
+        チャンクを並行に翻訳して元の順序で連結します。
+
+        Parameters
+        ----------
+        text : str
+            翻訳するテキスト。
+        call_site : str, optional
+            計測用の呼び出し元の名前。指定しない場合はコンストラクタで指定した値。
+
+        Returns
+        -------
+        str
+            翻訳されたテキスト。失敗した場合は原文（分割した場合は失敗したチャンクのみ原文）。
+        """
+        call_site = call_site or self.call_site
+        if not text or not self._needs_translation(text, call_site):
+            return text
+
+        remembered = (await self._recall([text], call_site))[0]
+        if remembered is not None:
+            return remembered
+
+        return await self._translate_text(text, call_site)
+
+    async def _translate_text(self, text: str, call_site: Optional[str]) -> str:
+        """
+        翻訳メモリになかったテキストを、必要に応じて分割して翻訳します。
+
+        Parameters
+        ----------
+        text : str
+            翻訳するテキスト。
+        call_site : str, optional
+            計測用の呼び出し元の名前。
+
+        Returns
+        -------
+        str
+            翻訳されたテキスト。失敗した場合は原文（分割した場合は失敗したチャンクのみ原文）。
+        """
+        if estimate_tokens(text) <= self.max_chunk_tokens:
+            return await self._translate_one(text, call_site) or text
+
+        failed = False
+
+        async def translate_chunk(chunk: str) -> str:
+            nonlocal failed
+            # コードブロックだけのチャンクなどはそのまま残す
+            if not self._needs_translation(chunk, call_site):
+                return chunk
+            remembered = (await self._recall([chunk], call_site))[0]
+            if remembered is not None:
+                return remembered
+            translation = await self._translate_one(chunk, call_site)
+            if translation is None:
+                failed = True
+                return chunk
+            return translation
+
+        chunks = split_text(text, self.max_chunk_tokens)
+        translations = await asyncio.gather(*(translate_chunk(chunk) for chunk in chunks))
+        result = join_chunks(chunks, translations)
+        # 原文のまま残ったチャンクを含む結果は保存しない
+        if not failed:
+            await self._remember(text, result)
+        return result
+
+    async def _recall(self, texts: List[str], call_site: Optional[str]) -> List[Optional[str]]:
+        """
+        翻訳メモリから訳文を取得し、見つかった分はLLM呼び出しの省略として記録します。
+
+        翻訳メモリのファイルは他のプロセスと共有するため、読み書きは別スレッドで実行します。
+
+        Parameters
+        ----------
+        texts : List[str]
+            原文のリスト。
+        call_site : str, optional
+            計測用の呼び出し元の名前。
+
+        Returns
+        -------
+        List[str | None]
+            入力と同じ順序で並んだ訳文のリスト。見つからなかった要素はNone。
+        """
+        if not self.memory or not texts:
+            return [None] * len(texts)
+
+        try:
+            translations = await asyncio.to_thread(self.memory.get_many, texts)
+        except Exception as e:
+            print(f"Error reading translation memory: {str(e)}")
+            return [None] * len(texts)
+
+        for translation in translations:
+            if translation is not None:
+                self.client.metrics.record_skip(call_site, "translation_memory")
+        return translations
+
+    async def _remember(self, text: str, translation: str) -> None:
+        """
+        翻訳結果を翻訳メモリに保存します。
+
+        Parameters
+        ----------
+        text : str
+            原文。
+        translation : str
+            訳文。原文と同じ場合は翻訳に失敗した可能性があるため保存しません。
+        """
+        if not self.memory or not translation.strip() or translation.strip() == text.strip():
+            return
+
+        try:
+            await asyncio.to_thread(self.memory.set, text, translation)
+        except Exception as e:
+            print(f"Error writing translation memory: {str(e)}")
+
+    def _needs_translation(self, text: str, call_site: Optional[str]) -> bool:
+        """
+        テキストをLLMで翻訳する必要があるかを判定し、不要な場合は省略を記録します。
+
+        Parameters
+        ----------
+        text : str
+            判定するテキスト。
+        call_site : str, optional
+            計測用の呼び出し元の名前。
+
+        Returns
+        -------
+        bool
+            翻訳が必要な場合はTrue。
+        """
+        kind = classify_text(text)
+        if kind == "translatable":
+            return True
+        self.client.metrics.record_skip(call_site, kind)
+        return False
+
+    async def _translate_one(self, text: str, call_site: Optional[str] = None) -> Optional[str]:
+        """
+        1件のテキストを1回のリクエストで翻訳し、結果を翻訳メモリに保存します。
+
+        Parameters
+        ----------
+        text : str
+            翻訳するテキスト。
+        call_site : str, optional
+            計測用の呼び出し元の名前。
+
+        Returns
+        -------
+        str or None
+            翻訳されたテキスト。失敗した場合はNone。
+        """
+        try:
+            translation = await self.client.generate_content(
+                prompt=f"{self.instruction}\n\n{text}",
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                call_site=call_site
+            )
+        except Exception as e:
+            print(f"Error translating text: {str(e)}")
+            return None
+
+        if not translation:
+            return None
+        await self._remember(text, translation)
+        return translation
+
+    async def translate_many(self, texts: List[str], call_site: Optional[str] = None) -> List[str]:
+        """
+        複数のテキストを翻訳します。
+
+        翻訳メモリにあるテキストと、同じ呼び出しの中で重複するテキストはLLMに送りません。
+        残りの短いテキストはバッチにまとめ、各バッチと長いテキスト（分割したチャンク）の
+        翻訳を並行して実行します。
+
+        Parameters
+        ----------
+        texts : List[str]
+            翻訳するテキストのリスト。
+        call_site : str, optional
+            計測用の呼び出し元の名前。指定しない場合はコンストラクタで指定した値。
+
+        Returns
+        -------
+        List[str]
+            入力と同じ順序で並んだ翻訳結果のリスト。
+        """
+        results = list(texts)
+        call_site = call_site or self.call_site
+
+        # 正規化すると同じになるテキストは最初の1件だけを翻訳し、結果を共有する
+        pending: List[int] = []
+        duplicates: Dict[int, List[int]] = {}
+        first_index: Dict[str, int] = {}
+        for index, text in enumerate(texts):
+            if not text or not self._needs_translation(text, call_site):
+                continue
+            normalized = normalize_text(text)
+            if normalized in first_index:
+                duplicates.setdefault(first_index[normalized], []).append(index)
+                self.client.metrics.record_skip(call_site, "duplicate")
+                continue
+            first_index[normalized] = index
+            pending.append(index)
+
+        remembered = await self._recall([texts[index] for index in pending], call_site)
+        for index, translation in zip(pending, remembered):
+            if translation is not None:
+                results[index] = translation
+
+        batches: List[List[int]] = []
+        singles: List[int] = []
+        current: List[int] = []
+        current_tokens = 0
+
+        for index, translation in zip(pending, remembered):
+            if translation is not None:
+                continue
+
+            text = texts[index]
+            tokens = estimate_tokens(text)
+            if tokens > self.max_item_tokens:
+                singles.append(index)
+                continue
+
+            if current and (
+                current_tokens + tokens > self.max_batch_tokens
+                or len(current) >= self.max_batch_items
+            ):
+                batches.append(current)
+                current, current_tokens = [], 0
+
+            current.append(index)
+            current_tokens += tokens
+
+        if current:
+            batches.append(current)
+
+        async def run_single(index: int) -> None:
+            results[index] = await self._translate_text(texts[index], call_site)
+
+        async def run_batch(indices: List[int]) -> None:
+            # 1件だけのバッチはJSONにまとめる意味がないため通常の翻訳を行う
+            if len(indices) == 1:
+                await run_single(indices[0])
+                return
+
+            translated = await self._translate_batch([texts[i] for i in indices], call_site)
+            failed = []
+            for index, translation in zip(indices, translated):
+                if translation is None:
+                    failed.append(index)
+                else:
+                    results[index] = translation
+                    await self._remember(texts[index], translation)
+
+            # バッチで結果を得られなかったテキストは1件ずつ翻訳する
+            if failed:
+                await asyncio.gather(*(run_single(index) for index in failed))
+
+        await asyncio.gather(
+            *(run_batch(indices) for indices in batches),
+            *(run_single(index) for index in singles)
+        )
+
+        for index, others in duplicates.items():
+            for other in others:
+                results[other] = results[index]
+
+        return results
+
+    async def _translate_batch(self, texts: List[str], call_site: Optional[str] = None) -> List[Optional[str]]:
+        """
+        複数のテキストを1回のリクエストで翻訳します。
+
+        Parameters
+        ----------
+        texts : List[str]
+            翻訳するテキストのリスト。
+        call_site : str, optional
+            計測用の呼び出し元の名前。
+
+        Returns
+        -------
+        List[str | None]
+            入力と同じ順序で並んだ翻訳結果のリスト。結果を得られなかった要素はNone。
+        """
+        payload = json.dumps(
+            [{"id": i, "text": text} for i, text in enumerate(texts)],
+            ensure_ascii=False
+        )
+
+        try:
+            response = await self.client.generate_content(
+                prompt=f"{self.instruction}\n\n{payload}",
+                system_instruction=_BATCH_SYSTEM_INSTRUCTION,
+                temperature=self.temperature,
+                max_tokens=self.max_tokens,
+                call_site=f"{call_site}.batch" if call_site else None
+            )
+        except Exception as e:
+            print(f"Error translating batch of {len(texts)} texts: {str(e)}")
+            return [None] * len(texts)
+
+        return self._parse_batch_response(response, len(texts))
+
+    @staticmethod
+    def _parse_batch_response(response: Optional[str], count: int) -> List[Optional[str]]:
+        """
+        バッチ翻訳の応答を解析します。
+
+        Parameters
+        ----------
+        response : str or None
+            LLMの応答。
+        count : int
+            入力したテキストの数。
+
+        Returns
+        -------
+        List[str | None]
+            idの順に並んだ翻訳結果のリスト。欠けている要素はNone。
+        """
+        translations: List[Optional[str]] = [None] * count
+
+        match = _JSON_ARRAY_PATTERN.search(response or "")
+        if not match:
+            print("Batch translation response is not a JSON array")
+            return translations
+
+        try:
+            items = json.loads(match.group(0))
+        except json.JSONDecodeError as e:
+            print(f"Error parsing batch translation response: {str(e)}")
+            return translations
+
+        if not isinstance(items, list) or len(items) != count:
+            print(f"Batch translation returned {len(items) if isinstance(items, list) else 0} items, expected {count}")
+
+        for item in items if isinstance(items, list) else []:
+            if not isinstance(item, dict):
+                continue
+            item_id = item.get("id")
+            translation = item.get("translation")
+            if (
+                isinstance(item_id, int)
+                and 0 <= item_id < count
+                and isinstance(translation, str)
+                and translation.strip()
+            ):
+                translations[item_id] = translation
+
+        return translations
@@ -3,7 +3,7 @@ import { useQuery } from 'react-query';
 import { format, subDays } from 'date-fns';
 import { Layout, RefreshCw, Menu, Calendar, Sun, Moon } from 'lucide-react';
 import { ContentCard } from './components/ContentCard';
-import { getContent } from './api';
+import { getContent, getDates } from './api';
 
 const sources = ['reddit', 'hackernews', 'github', 'techfeed', 'paper'];
 
@@ -36,6 +36,16 @@ function App() {
     }
   );
 
+  // コンテンツがある日付の範囲を取得し、カレンダーの選択範囲に使う
+  const { data: datesData } = useQuery(
+    ['dates', selectedSource],
+    () => getDates(selectedSource),
+    {
+      staleTime: 5 * 60 * 1000,
+    }
+  );
+  const availableDates = datesData?.dates ?? [];
+
   const SidebarContent = () => (
     <>
       <div className="p-4 border-b border-gray-200 dark:border-gray-700">
@@ -52,8 +62,8 @@ function App() {
         <input
           type="date"
           value={format(selectedDate, 'yyyy-MM-dd')}
-          max={format(new Date(), 'yyyy-MM-dd')}
-          min={format(subDays(new Date(), 30), 'yyyy-MM-dd')}
+          max={datesData?.latest ?? format(new Date(), 'yyyy-MM-dd')}
+          min={availableDates.length > 0 ? availableDates[availableDates.length - 1] : format(subDays(new Date(), 30), 'yyyy-MM-dd')}
           onChange={(e) => setSelectedDate(new Date(e.target.value))}
           className="w-full px-3 py-2 border border-gray-300 dark:border-gray-600 rounded-lg focus:outline-none focus:ring-2 focus:ring-blue-500 focus:border-transparent dark:bg-gray-700 dark:text-white"
         />
@@ -1,5 +1,5 @@
 import axios from 'axios';
-import { ContentResponse, WeatherResponse } from './types';
+import { ContentResponse, DatesResponse, WeatherResponse } from './types';
 
 const api = axios.create({
   baseURL: 'http://localhost:8000/api'
@@ -12,6 +12,11 @@ export const getContent = async (source: string, date?: string) => {
   return data;
 };
 
+export const getDates = async (source: string) => {
+  const { data } = await api.get<DatesResponse>(`/dates/${source}`);
+  return data;
+};
+
 export const getWeather = async () => {
   const { data } = await api.get<WeatherResponse>('/weather');
   return data;
@@ -9,6 +9,12 @@ export interface ContentResponse {
   items: ContentItem[];
 }
 
+export interface DatesResponse {
+  source: string;
+  dates: string[];
+  latest?: string;
+}
+
 export interface WeatherResponse {
   temperature: number;
   icon: string;
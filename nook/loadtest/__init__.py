@@ -0,0 +1 @@
+"""オフライン負荷試験用のパッケージ。"""
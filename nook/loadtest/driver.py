@@ -0,0 +1,261 @@
+"""
+各サービスをスタブサーバーとHTTPフィクスチャに対してエンドツーエンドで実行し、
+処理時間とLLM呼び出しの統計を計測するドライバー。
+
+使い方::
+
+    # 一度だけ実際のサイトから取得してフィクスチャを記録する（LLMはスタブ）
+    python -m nook.loadtest.driver --http record
+    # 以降はネットワークなしで再生して計測する
+    python -m nook.loadtest.driver --http replay --latency-mean 1.0 --error-429-rate 0.05
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import threading
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional
+
+import httpx
+import uvicorn
+
+from nook.common.circuit_breaker import get_circuit_breaker
+from nook.common.llm_metrics import get_metrics
+from nook.common.llm_scheduler import get_llm_scheduler
+from nook.common.rate_limiter import get_rate_limiter
+from nook.loadtest.fake_llm_server import add_config_arguments, config_from_args, create_app
+from nook.loadtest.http_fixtures import HttpFixtures
+from nook.services.github_trending.github_trending import GithubTrending
+from nook.services.hacker_news.hacker_news import HackerNewsRetriever
+from nook.services.paper_summarizer.paper_summarizer import PaperSummarizer
+from nook.services.reddit_explorer.reddit_explorer import RedditExplorer
+from nook.services.tech_feed.tech_feed import TechFeed
+
+DEFAULT_FIXTURES_DIR = "data/loadtest/fixtures"
+DEFAULT_RUNS_DIR = "data/loadtest/runs"
+
+
+# 計測対象のサービス（Xへの投稿は外部に副作用があるため対象外）
+SERVICES: Dict[str, Callable[..., Any]] = {
+    "github": GithubTrending,
+    "hackernews": HackerNewsRetriever,
+    "reddit": RedditExplorer,
+    "techfeed": TechFeed,
+    "paper": PaperSummarizer
+}
+
+
+class _ServerThread:
+    """
+    スタブサーバーをバックグラウンドのスレッドで起動するクラス。
+    """
+
+    def __init__(self, app: Any, host: str, port: int):
+        self.server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+        self.thread = threading.Thread(target=self.server.run, daemon=True)
+
+    def start(self, timeout: float = 10.0) -> None:
+        self.thread.start()
+        deadline = time.monotonic() + timeout
+        while not self.server.started:
+            if not self.thread.is_alive() or time.monotonic() > deadline:
+                raise RuntimeError("Failed to start the fake LLM server")
+            time.sleep(0.05)
+
+    def stop(self) -> None:
+        self.server.should_exit = True
+        self.thread.join(timeout=10)
+
+
+def _server_stats(base_url: str, reset: bool = False) -> Optional[Dict[str, Any]]:
+    """
+    スタブサーバーの統計を取得します。requestsは再生用に差し替えているためhttpxを使います。
+    """
+    root = base_url.rstrip("/").removesuffix("/v1")
+    try:
+        if reset:
+            response = httpx.post(f"{root}/stats/reset", timeout=5)
+        else:
+            response = httpx.get(f"{root}/stats", timeout=5)
+        response.raise_for_status()
+        return response.json()
+    except httpx.HTTPError as e:
+        print(f"スタブサーバーの統計を取得できませんでした: {str(e)}")
+        return None
+
+
+def run_service(name: str, service_class: Callable[..., Any], storage_dir: str, base_url: str) -> Dict[str, Any]:
+    """
+    1つのサービスを実行し、処理時間とLLM呼び出しの統計を返します。
+
+    Parameters
+    ----------
+    name : str
+        サービス名。
+    service_class : Callable[..., Any]
+        サービスのクラス。``storage_dir`` を受け取り、``run()`` を持つもの。
+    storage_dir : str
+        サービスの出力先ディレクトリ。
+    base_url : str
+        スタブサーバーのベースURL。
+
+    Returns
+    -------
+    Dict[str, Any]
+        処理時間・成否・LLM呼び出しの集計・スタブサーバーの統計。
+    """
+    metrics = get_metrics()
+    metrics.reset()
+    _server_stats(base_url, reset=True)
+
+    print(f"[{name}] 実行しています...")
+    started_at = time.perf_counter()
+    error = None
+    try:
+        service_class(storage_dir=storage_dir).run()
+    except Exception as e:
+        error = f"{type(e).__name__}: {str(e)}"
+        print(f"[{name}] エラーが発生しました: {error}")
+    elapsed = time.perf_counter() - started_at
+
+    snapshot = metrics.snapshot()
+    total = snapshot["total"]
+    result = {
+        "service": name,
+        "elapsed": round(elapsed, 3),
+        "error": error,
+        "llm": total,
+        "llm_calls_per_second": round(total["api_calls"] / elapsed, 3) if elapsed > 0 else None,
+        "call_sites": snapshot["call_sites"],
+        "server": _server_stats(base_url)
+    }
+    print(f"[{name}] {elapsed:.1f} 秒, LLM呼び出し {total['api_calls']} 回 "
+          f"(再試行 {total['retries']}, エラー {total['errors']}, 省略 {total['skipped']})")
+    return result
+
+
+def main():
+    """
+    コマンドライン引数に基づいて、サービスをスタブサーバーに対して実行します。
+    """
+    parser = argparse.ArgumentParser(description="サービスをスタブサーバーとHTTPフィクスチャに対して実行します")
+    parser.add_argument(
+        "--service",
+        type=str,
+        choices=["all"] + list(SERVICES),
+        nargs="+",
+        default=["all"],
+        help="実行するサービス (デフォルト: all)"
+    )
+    parser.add_argument(
+        "--http",
+        type=str,
+        choices=["live", "record", "replay"],
+        default="replay",
+        help="LLM以外のHTTP通信: live=実際に通信, record=通信して記録, replay=記録を再生 (デフォルト: replay)"
+    )
+    parser.add_argument(
+        "--fixtures-dir",
+        type=str,
+        default=DEFAULT_FIXTURES_DIR,
+        help=f"HTTPフィクスチャのディレクトリ (デフォルト: {DEFAULT_FIXTURES_DIR})"
+    )
+    parser.add_argument(
+        "--output-dir",
+        type=str,
+        default=None,
+        help=f"サービスの出力先とレポートの保存先 (デフォルト: {DEFAULT_RUNS_DIR}/<日時>)"
+    )
+    parser.add_argument(
+        "--base-url",
+        type=str,
+        default=None,
+        help="起動済みのスタブサーバーのURL。指定しない場合はプロセス内で起動します"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8001,
+        help="プロセス内で起動するスタブサーバーのポート番号 (デフォルト: 8001)"
+    )
+    parser.add_argument(
+        "--use-cache",
+        action="store_true",
+        help="LLMレスポンスキャッシュを有効にする（デフォルトではすべての呼び出しをスタブに送ります）"
+    )
+    parser.add_argument("--rpm", type=int, default=None, help="GROK_RPM を上書きする")
+    parser.add_argument("--tpm", type=int, default=None, help="GROK_TPM を上書きする")
+    parser.add_argument("--max-concurrency", type=int, default=None, help="GROK_MAX_CONCURRENCY を上書きする")
+    add_config_arguments(parser)
+
+    args = parser.parse_args()
+
+    output_dir = Path(args.output_dir or os.path.join(DEFAULT_RUNS_DIR, datetime.now().strftime("%Y%m%d-%H%M%S")))
+    output_dir.mkdir(parents=True, exist_ok=True)
+
+    server_thread = None
+    base_url = args.base_url
+    if base_url is None:
+        config = config_from_args(args)
+        server_thread = _ServerThread(create_app(config), "127.0.0.1", args.port)
+        server_thread.start()
+        base_url = f"http://127.0.0.1:{args.port}/v1"
+        print(f"スタブサーバーを起動しました: {base_url}")
+
+    # クライアント・レートリミッター・キャッシュを生成する前に設定する
+    os.environ["GROK_BASE_URL"] = base_url
+    os.environ.setdefault("GROK_API_KEY", "loadtest")
+    if not args.use_cache:
+        os.environ["GROK_CACHE_ENABLED"] = "false"
+    for name, value in (("GROK_RPM", args.rpm), ("GROK_TPM", args.tpm), ("GROK_MAX_CONCURRENCY", args.max_concurrency)):
+        if value is not None:
+            os.environ[name] = str(value)
+    if args.http == "replay":
+        # 認証もフィクスチャから再生するため、認証情報はダミーでよい
+        for name in ("REDDIT_CLIENT_ID", "REDDIT_CLIENT_SECRET", "REDDIT_USER_AGENT"):
+            os.environ.setdefault(name, "loadtest")
+
+    names = list(SERVICES) if "all" in args.service else args.service
+    fixtures = HttpFixtures(args.fixtures_dir, args.http) if args.http != "live" else None
+
+    results: List[Dict[str, Any]] = []
+    started = datetime.now()
+    started_at = time.perf_counter()
+    try:
+        with fixtures or contextlib.nullcontext():
+            for name in names:
+                results.append(run_service(name, SERVICES[name], str(output_dir), base_url))
+    finally:
+        if server_thread:
+            server_thread.stop()
+    elapsed = time.perf_counter() - started_at
+    circuit_breaker = get_circuit_breaker()
+    scheduler = get_llm_scheduler()
+
+    report = {
+        "started_at": started.isoformat(timespec="seconds"),
+        "base_url": base_url,
+        "http": fixtures.stats() if fixtures else {"mode": "live"},
+        "elapsed": round(elapsed, 3),
+        "rate_limiter": get_rate_limiter().stats(),
+        "circuit_breaker": circuit_breaker.stats() if circuit_breaker else None,
+        "scheduler": scheduler.stats() if scheduler else None,
+        "services": results
+    }
+    report_path = output_dir / "report.json"
+    with open(report_path, "w", encoding="utf-8") as f:
+        json.dump(report, f, ensure_ascii=False, indent=2)
+
+    print(f"合計 {elapsed:.1f} 秒")
+    if fixtures:
+        stats = fixtures.stats()
+        print(f"HTTPフィクスチャ: 記録 {stats['recorded']} 件 / 再生 {stats['replayed']} 件 / 欠落 {stats['missing']} 件")
+    print(f"レポートを保存しました: {report_path}")
+
+
+if __name__ == "__main__":
+    main()
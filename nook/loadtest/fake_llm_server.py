@@ -0,0 +1,791 @@
+"""
+負荷試験用のOpenAI互換Chat Completionsスタブサーバー。
+
+応答はリクエストの内容から決定的に生成し（エコー。構造化出力ではJSON Schemaの
+文字列プロパティにエコーを入れたオブジェクト）、レイテンシの分布・
+出力のスループット・429/500エラーの発生率を設定できます。
+バッチジョブ（``/v1/files``・``/v1/batches``）の簡易的な代替も提供します。
+Grok3Client は環境変数 GROK_BASE_URL をこのサーバーに向けることで切り替えられます。
+
+使い方::
+
+    python -m nook.loadtest.fake_llm_server --port 8001 --latency-mean 0.8 --error-429-rate 0.05
+    GROK_BASE_URL=http://127.0.0.1:8001/v1 python -m nook.services.run_services --service hackernews
+"""
+
+import argparse
+import contextlib
+import asyncio
+import email
+import json
+import random
+import re
+import time
+from dataclasses import asdict, dataclass
+from typing import Any, AsyncIterator, Dict, List, Literal, Optional, Tuple
+
+import uvicorn
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, Response, StreamingResponse
+
+from nook.common.token_counter import estimate_tokens
+
+_JSON_ARRAY_PATTERN = re.compile(r"\[.*\]", re.DOTALL)
+
+# エコー応答の接頭辞
+ECHO_PREFIX = "[echo] "
+
+
+@dataclass
+class FakeServerConfig:
+    """
+    スタブサーバーの設定。
+
+    Parameters
+    ----------
+    latency : {"fixed", "uniform", "lognormal"}, default="lognormal"
+        最初のトークンを返すまでのレイテンシの分布。
+    latency_mean : float, default=0.5
+        レイテンシの平均（秒）。
+    latency_sigma : float, default=0.5
+        レイテンシのばらつき。lognormalでは対数の標準偏差、uniformでは平均に対する幅の比率。
+    tokens_per_second : float, default=0.0
+        出力トークンの生成速度。0の場合は生成時間を加算しません。
+    error_429_rate : float, default=0.0
+        429エラーを返す確率。
+    error_500_rate : float, default=0.0
+        500エラーを返す確率。
+    retry_after : float, default=1.0
+        429エラーのRetry-Afterヘッダーの値（秒）。
+    requests_per_minute : int, default=0
+        1分あたりに受け付けるリクエスト数。超過すると429を返します。0の場合は無制限。
+    capacity : int, default=0
+        同時に処理するリクエスト数。超えた分はサーバー側で順番を待たせます。0の場合は無制限。
+    seed : int, default=0
+        レイテンシとエラー注入に使用する乱数のシード。
+    batch_latency : float, default=5.0
+        バッチジョブを作成してから完了するまでの時間（秒）。
+    """
+
+    latency: Literal["fixed", "uniform", "lognormal"] = "lognormal"
+    latency_mean: float = 0.5
+    latency_sigma: float = 0.5
+    tokens_per_second: float = 0.0
+    error_429_rate: float = 0.0
+    error_500_rate: float = 0.0
+    retry_after: float = 1.0
+    requests_per_minute: int = 0
+    capacity: int = 0
+    seed: int = 0
+    batch_latency: float = 5.0
+
+
+def echo_response(messages: List[Dict[str, Any]], max_tokens: int) -> Tuple[str, str]:
+    """
+    メッセージから決定的な応答を生成します。
+
+    最後のユーザーメッセージにidとtextを持つオブジェクトのJSON配列が含まれる場合は、
+    バッチ翻訳の形式（idとtranslation）で各textをエコーします。
+    それ以外の場合はユーザーメッセージ全体をエコーし、max_tokensで切り詰めます。
+
+    Parameters
+    ----------
+    messages : List[Dict[str, Any]]
+        リクエストのメッセージのリスト。
+    max_tokens : int
+        生成するトークンの最大数。
+
+    Returns
+    -------
+    Tuple[str, str]
+        応答のテキストと終了理由（"stop" または "length"）。
+    """
+    prompt = ""
+    for message in reversed(messages):
+        if message.get("role") == "user":
+            prompt = message.get("content") or ""
+            break
+
+    match = _JSON_ARRAY_PATTERN.search(prompt)
+    if match:
+        try:
+            items = json.loads(match.group(0))
+        except json.JSONDecodeError:
+            items = None
+        if (
+            isinstance(items, list)
+            and items
+            and all(isinstance(item, dict) and "id" in item and "text" in item for item in items)
+        ):
+            translations = [
+                {"id": item["id"], "translation": f"{ECHO_PREFIX}{item['text']}"} for item in items
+            ]
+            return json.dumps(translations, ensure_ascii=False), "stop"
+
+    text = f"{ECHO_PREFIX}{prompt}"
+    tokens = estimate_tokens(text)
+    if tokens <= max_tokens:
+        return text, "stop"
+    return text[: max(1, len(text) * max_tokens // tokens)], "length"
+
+
+def schema_response(messages: List[Dict[str, Any]], response_format: Dict[str, Any]) -> str:
+    """
+    構造化出力（``json_schema``）のリクエストに対して、スキーマに従うJSONオブジェクトを生成します。
+
+    文字列のプロパティには最後のユーザーメッセージの冒頭をエコーし、
+    それ以外の型のプロパティは空の値にします。
+
+    Parameters
+    ----------
+    messages : List[Dict[str, Any]]
+        リクエストのメッセージのリスト。
+    response_format : Dict[str, Any]
+        リクエストの ``response_format``。
+
+    Returns
+    -------
+    str
+        JSONオブジェクトの文字列。
+    """
+    prompt = next(
+        (message.get("content") or "" for message in reversed(messages) if message.get("role") == "user"),
+        ""
+    )
+    excerpt = " ".join(prompt.split())[:200]
+    schema = (response_format.get("json_schema") or {}).get("schema") or {}
+    empty = {"string": "", "integer": 0, "number": 0, "boolean": False, "array": [], "object": {}}
+    result = {}
+    for name, spec in (schema.get("properties") or {}).items():
+        kind = spec.get("type") if isinstance(spec, dict) else None
+        result[name] = f"{ECHO_PREFIX}{name}: {excerpt}" if kind == "string" else empty.get(kind)
+    return json.dumps(result, ensure_ascii=False)
+
+
+class FakeLLMServer:
+    """
+    スタブサーバーの状態（乱数・レート制限の窓・統計）を保持するクラス。
+
+    Parameters
+    ----------
+    config : FakeServerConfig
+        スタブサーバーの設定。
+    """
+
+    def __init__(self, config: FakeServerConfig):
+        """
+        FakeLLMServerを初期化します。
+
+        Parameters
+        ----------
+        config : FakeServerConfig
+            スタブサーバーの設定。
+        """
+        self.config = config
+        self.reset()
+
+    def reset(self) -> None:
+        """
+        乱数と統計を初期化します。
+        """
+        self._random = random.Random(self.config.seed)
+        self._window_started_at = time.monotonic()
+        self._window_requests = 0
+        self._sequence = 0
+        self.started_at = time.monotonic()
+        self.requests = 0
+        self.completed = 0
+        self.streamed = 0
+        self.injected_429 = 0
+        self.injected_500 = 0
+        self.quota_429 = 0
+        self.in_flight = 0
+        self.max_in_flight = 0
+        self.prompt_tokens = 0
+        self.completion_tokens = 0
+        self.batches = 0
+        self.batch_requests = 0
+        self.files: Dict[str, Dict[str, Any]] = {}
+        self.batch_jobs: Dict[str, Dict[str, Any]] = {}
+        self._capacity = asyncio.Semaphore(self.config.capacity) if self.config.capacity > 0 else None
+
+    def capacity(self) -> Any:
+        """
+        同時に処理するリクエスト数を制限するコンテキストマネージャーを取得します。
+        """
+        return self._capacity or contextlib.nullcontext()
+
+    def sample_latency(self) -> float:
+        """
+        設定された分布からレイテンシを1つ取り出します。
+
+        Returns
+        -------
+        float
+            レイテンシ（秒）。
+        """
+        mean, sigma = self.config.latency_mean, self.config.latency_sigma
+        if self.config.latency == "fixed" or mean <= 0:
+            return max(0.0, mean)
+        if self.config.latency == "uniform":
+            return self._random.uniform(max(0.0, mean * (1 - sigma)), mean * (1 + sigma))
+        # 平均がlatency_meanになるよう対数正規分布の位置を補正
+        return mean * self._random.lognormvariate(-sigma * sigma / 2, sigma)
+
+    def generation_time(self, tokens: int) -> float:
+        """
+        出力トークンの生成にかかる時間を計算します。
+
+        Parameters
+        ----------
+        tokens : int
+            出力トークン数。
+
+        Returns
+        -------
+        float
+            生成時間（秒）。
+        """
+        if self.config.tokens_per_second <= 0:
+            return 0.0
+        return tokens / self.config.tokens_per_second
+
+    def quota_headers(self) -> Dict[str, str]:
+        """
+        レート制限ヘッダーを生成します。
+        """
+        if self.config.requests_per_minute <= 0:
+            return {}
+        reset = max(0.0, 60 - (time.monotonic() - self._window_started_at))
+        return {
+            "x-ratelimit-limit-requests": str(self.config.requests_per_minute),
+            "x-ratelimit-remaining-requests": str(
+                max(0, self.config.requests_per_minute - self._window_requests)
+            ),
+            "x-ratelimit-reset-requests": f"{reset:.1f}s"
+        }
+
+    def admit(self) -> Optional[JSONResponse]:
+        """
+        リクエストを受け付けるか判定し、拒否する場合はエラー応答を返します。
+
+        Returns
+        -------
+        JSONResponse or None
+            429または500のエラー応答。受け付ける場合はNone。
+        """
+        self.requests += 1
+
+        if self.config.requests_per_minute > 0:
+            now = time.monotonic()
+            if now - self._window_started_at >= 60:
+                self._window_started_at = now
+                self._window_requests = 0
+            if self._window_requests >= self.config.requests_per_minute:
+                self.quota_429 += 1
+                headers = self.quota_headers()
+                headers["retry-after"] = f"{60 - (now - self._window_started_at):.1f}"
+                return _error_response(429, "rate_limit_exceeded", "Request quota exceeded", headers)
+            self._window_requests += 1
+
+        roll = self._random.random()
+        if roll < self.config.error_429_rate:
+            self.injected_429 += 1
+            headers = self.quota_headers()
+            headers["retry-after"] = str(self.config.retry_after)
+            return _error_response(429, "rate_limit_exceeded", "Injected rate limit error", headers)
+        if roll < self.config.error_429_rate + self.config.error_500_rate:
+            self.injected_500 += 1
+            return _error_response(500, "server_error", "Injected server error")
+
+        return None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        受け付けたリクエストの統計を取得します。
+
+        Returns
+        -------
+        Dict[str, Any]
+            リクエスト数・エラー注入数・最大同時実行数・トークン数など。
+        """
+        elapsed = time.monotonic() - self.started_at
+        return {
+            "config": asdict(self.config),
+            "elapsed": round(elapsed, 3),
+            "requests": self.requests,
+            "completed": self.completed,
+            "streamed": self.streamed,
+            "injected_429": self.injected_429,
+            "injected_500": self.injected_500,
+            "quota_429": self.quota_429,
+            "in_flight": self.in_flight,
+            "max_in_flight": self.max_in_flight,
+            "prompt_tokens": self.prompt_tokens,
+            "completion_tokens": self.completion_tokens,
+            "batches": self.batches,
+            "batch_requests": self.batch_requests,
+            "requests_per_second": round(self.completed / elapsed, 3) if elapsed > 0 else None
+        }
+
+    def next_id(self, prefix: str = "chatcmpl") -> str:
+        """
+        応答・ファイル・バッチのIDを採番します。
+        """
+        self._sequence += 1
+        return f"{prefix}-fake-{self._sequence}"
+
+    def add_file(self, filename: str, purpose: str, content: bytes) -> Dict[str, Any]:
+        """
+        アップロードされたファイルを保存し、OpenAI形式のファイル情報を返します。
+        """
+        file_id = self.next_id("file")
+        self.files[file_id] = {
+            "object": {
+                "id": file_id,
+                "object": "file",
+                "bytes": len(content),
+                "created_at": int(time.time()),
+                "filename": filename,
+                "purpose": purpose
+            },
+            "content": content
+        }
+        return self.files[file_id]["object"]
+
+    def complete_batch(self, batch: Dict[str, Any]) -> None:
+        """
+        バッチの入力ファイルの各行にエコー応答を生成し、出力ファイルを作成します。
+
+        エラー注入の確率に応じて、一部の行は500エラーの結果になります。
+        """
+        lines = self.files[batch["input_file_id"]]["content"].decode("utf-8").splitlines()
+        outputs = []
+        failed = 0
+        for line in lines:
+            if not line.strip():
+                continue
+            request = json.loads(line)
+            body = request.get("body") or {}
+            self.batch_requests += 1
+            if self._random.random() < self.config.error_500_rate:
+                failed += 1
+                self.injected_500 += 1
+                response = {
+                    "status_code": 500,
+                    "request_id": self.next_id("req"),
+                    "body": {"error": {"message": "Injected server error", "type": "server_error"}}
+                }
+            else:
+                messages = body.get("messages") or []
+                content, finish_reason = echo_response(messages, int(body.get("max_tokens") or 1000))
+                prompt_tokens = sum(estimate_tokens(message.get("content") or "") for message in messages)
+                completion_tokens = estimate_tokens(content)
+                self.prompt_tokens += prompt_tokens
+                self.completion_tokens += completion_tokens
+                response = {
+                    "status_code": 200,
+                    "request_id": self.next_id("req"),
+                    "body": {
+                        "id": self.next_id(),
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model") or "fake",
+                        "choices": [
+                            {
+                                "index": 0,
+                                "message": {"role": "assistant", "content": content},
+                                "finish_reason": finish_reason
+                            }
+                        ],
+                        "usage": {
+                            "prompt_tokens": prompt_tokens,
+                            "completion_tokens": completion_tokens,
+                            "total_tokens": prompt_tokens + completion_tokens
+                        }
+                    }
+                }
+            outputs.append(json.dumps(
+                {"id": self.next_id("batch_req"), "custom_id": request.get("custom_id"), "response": response, "error": None},
+                ensure_ascii=False
+            ))
+
+        output = self.add_file(f"{batch['id']}_output.jsonl", "batch_output", "\n".join(outputs).encode("utf-8"))
+        batch.update({
+            "status": "completed",
+            "output_file_id": output["id"],
+            "completed_at": int(time.time()),
+            "request_counts": {"total": len(outputs), "completed": len(outputs) - failed, "failed": failed}
+        })
+
+
+def _error_response(
+    status_code: int,
+    error_type: str,
+    message: str,
+    headers: Optional[Dict[str, str]] = None
+) -> JSONResponse:
+    """
+    OpenAI形式のエラー応答を生成します。
+    """
+    return JSONResponse(
+        status_code=status_code,
+        content={"error": {"message": message, "type": error_type, "code": error_type}},
+        headers=headers
+    )
+
+
+def _parse_multipart(body: bytes, content_type: str) -> Dict[str, Tuple[Optional[str], bytes]]:
+    """
+    multipart/form-data の本文をフィールド名ごとの（ファイル名, 内容）に分解します。
+
+    python-multipart に依存しないよう、標準ライブラリのemailパーサーで解析します。
+    """
+    message = email.message_from_bytes(
+        f"Content-Type: {content_type}\r\n\r\n".encode("utf-8") + body
+    )
+    fields = {}
+    for part in message.get_payload() if message.is_multipart() else []:
+        name = part.get_param("name", header="content-disposition")
+        if name:
+            fields[name] = (part.get_filename(), part.get_payload(decode=True) or b"")
+    return fields
+
+
+def create_app(config: Optional[FakeServerConfig] = None) -> FastAPI:
+    """
+    スタブサーバーのFastAPIアプリケーションを生成します。
+
+    Parameters
+    ----------
+    config : FakeServerConfig, optional
+        スタブサーバーの設定。指定しない場合はデフォルト値。
+
+    Returns
+    -------
+    FastAPI
+        ``/v1/chat/completions``・``/v1/models``・``/v1/files``・``/v1/batches``・``/stats``
+        を提供するアプリケーション。
+    """
+    config = config or FakeServerConfig()
+    server = FakeLLMServer(config)
+    app = FastAPI(title="Nook Fake LLM Server")
+    app.state.server = server
+
+    @app.get("/v1/models")
+    async def list_models():
+        return {"object": "list", "data": [{"id": "fake", "object": "model", "owned_by": "nook"}]}
+
+    @app.get("/stats")
+    async def get_stats():
+        return server.stats()
+
+    @app.post("/stats/reset")
+    async def reset_stats():
+        server.reset()
+        return server.stats()
+
+    @app.post("/v1/files")
+    async def upload_file(request: Request):
+        fields = _parse_multipart(await request.body(), request.headers.get("content-type", ""))
+        if "file" not in fields:
+            return _error_response(400, "invalid_request_error", "Missing file")
+        filename, content = fields["file"]
+        purpose = fields.get("purpose", (None, b"batch"))[1].decode("utf-8")
+        return server.add_file(filename or "upload.jsonl", purpose, content)
+
+    @app.get("/v1/files/{file_id}/content")
+    async def file_content(file_id: str):
+        if file_id not in server.files:
+            return _error_response(404, "invalid_request_error", f"No such file: {file_id}")
+        return Response(content=server.files[file_id]["content"], media_type="application/octet-stream")
+
+    @app.post("/v1/batches")
+    async def create_batch(request: Request):
+        body = await request.json()
+        input_file_id = body.get("input_file_id")
+        if input_file_id not in server.files:
+            return _error_response(400, "invalid_request_error", f"No such file: {input_file_id}")
+        server.batches += 1
+        batch = {
+            "id": server.next_id("batch"),
+            "object": "batch",
+            "endpoint": body.get("endpoint") or "/v1/chat/completions",
+            "input_file_id": input_file_id,
+            "completion_window": body.get("completion_window") or "24h",
+            "status": "in_progress",
+            "output_file_id": None,
+            "error_file_id": None,
+            "created_at": int(time.time()),
+            "completed_at": None,
+            "request_counts": {"total": 0, "completed": 0, "failed": 0},
+            "metadata": body.get("metadata")
+        }
+        server.batch_jobs[batch["id"]] = batch
+        return batch
+
+    @app.get("/v1/batches/{batch_id}")
+    async def retrieve_batch(batch_id: str):
+        batch = server.batch_jobs.get(batch_id)
+        if batch is None:
+            return _error_response(404, "invalid_request_error", f"No such batch: {batch_id}")
+        if batch["status"] == "in_progress" and time.time() - batch["created_at"] >= config.batch_latency:
+            server.complete_batch(batch)
+        return batch
+
+    @app.post("/v1/batches/{batch_id}/cancel")
+    async def cancel_batch(batch_id: str):
+        batch = server.batch_jobs.get(batch_id)
+        if batch is None:
+            return _error_response(404, "invalid_request_error", f"No such batch: {batch_id}")
+        if batch["status"] == "in_progress":
+            batch["status"] = "cancelled"
+        return batch
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages") or []
+        model = body.get("model") or "fake"
+        max_tokens = int(body.get("max_tokens") or 1000)
+
+        rejected = server.admit()
+        if rejected is not None:
+            return rejected
+
+        response_format = body.get("response_format") or {}
+        if response_format.get("type") == "json_schema":
+            content, finish_reason = schema_response(messages, response_format), "stop"
+        else:
+            content, finish_reason = echo_response(messages, max_tokens)
+        prompt_tokens = sum(estimate_tokens(message.get("content") or "") for message in messages)
+        completion_tokens = estimate_tokens(content)
+        usage = {
+            "prompt_tokens": prompt_tokens,
+            "completion_tokens": completion_tokens,
+            "total_tokens": prompt_tokens + completion_tokens
+        }
+        response_id = server.next_id()
+        created = int(time.time())
+        latency = server.sample_latency()
+        headers = server.quota_headers()
+
+        if body.get("stream"):
+            return StreamingResponse(
+                _stream_chunks(server, response_id, created, model, content, finish_reason, latency, usage),
+                media_type="text/event-stream",
+                headers=headers
+            )
+
+        server.in_flight += 1
+        server.max_in_flight = max(server.max_in_flight, server.in_flight)
+        try:
+            async with server.capacity():
+                await asyncio.sleep(latency + server.generation_time(completion_tokens))
+        finally:
+            server.in_flight -= 1
+
+        server.completed += 1
+        server.prompt_tokens += prompt_tokens
+        server.completion_tokens += completion_tokens
+        return JSONResponse(
+            content={
+                "id": response_id,
+                "object": "chat.completion",
+                "created": created,
+                "model": model,
+                "choices": [
+                    {
+                        "index": 0,
+                        "message": {"role": "assistant", "content": content},
+                        "finish_reason": finish_reason
+                    }
+                ],
+                "usage": usage
+            },
+            headers=headers
+        )
+
+    return app
+
+
+async def _stream_chunks(
+    server: FakeLLMServer,
+    response_id: str,
+    created: int,
+    model: str,
+    content: str,
+    finish_reason: str,
+    latency: float,
+    usage: Dict[str, int]
+) -> AsyncIterator[str]:
+    """
+    応答を単語単位の断片に分けてServer-Sent Eventsで返します。
+    """
+
+    def chunk(delta: Dict[str, str], finish: Optional[str] = None) -> str:
+        payload = {
+            "id": response_id,
+            "object": "chat.completion.chunk",
+            "created": created,
+            "model": model,
+            "choices": [{"index": 0, "delta": delta, "finish_reason": finish}]
+        }
+        return f"data: {json.dumps(payload, ensure_ascii=False)}\n\n"
+
+    server.in_flight += 1
+    server.max_in_flight = max(server.max_in_flight, server.in_flight)
+    try:
+        async with server.capacity():
+            await asyncio.sleep(latency)
+            yield chunk({"role": "assistant", "content": ""})
+            for piece in re.findall(r"\S+\s*|\s+", content):
+                await asyncio.sleep(server.generation_time(estimate_tokens(piece)))
+                yield chunk({"content": piece})
+            yield chunk({}, finish_reason)
+            yield "data: [DONE]\n\n"
+    finally:
+        server.in_flight -= 1
+
+    server.completed += 1
+    server.streamed += 1
+    server.prompt_tokens += usage["prompt_tokens"]
+    server.completion_tokens += usage["completion_tokens"]
+
+
+def add_config_arguments(parser: argparse.ArgumentParser) -> None:
+    """
+    スタブサーバーの設定をコマンドライン引数として追加します。
+
+    Parameters
+    ----------
+    parser : argparse.ArgumentParser
+        引数を追加するパーサー。
+    """
+    defaults = FakeServerConfig()
+    parser.add_argument(
+        "--latency",
+        type=str,
+        choices=["fixed", "uniform", "lognormal"],
+        default=defaults.latency,
+        help=f"レイテンシの分布 (デフォルト: {defaults.latency})"
+    )
+    parser.add_argument(
+        "--latency-mean",
+        type=float,
+        default=defaults.latency_mean,
+        help=f"レイテンシの平均（秒） (デフォルト: {defaults.latency_mean})"
+    )
+    parser.add_argument(
+        "--latency-sigma",
+        type=float,
+        default=defaults.latency_sigma,
+        help=f"レイテンシのばらつき (デフォルト: {defaults.latency_sigma})"
+    )
+    parser.add_argument(
+        "--tokens-per-second",
+        type=float,
+        default=defaults.tokens_per_second,
+        help="出力トークンの生成速度。0の場合は生成時間を加算しない (デフォルト: 0)"
+    )
+    parser.add_argument(
+        "--error-429-rate",
+        type=float,
+        default=defaults.error_429_rate,
+        help="429エラーを返す確率 (デフォルト: 0)"
+    )
+    parser.add_argument(
+        "--error-500-rate",
+        type=float,
+        default=defaults.error_500_rate,
+        help="500エラーを返す確率 (デフォルト: 0)"
+    )
+    parser.add_argument(
+        "--retry-after",
+        type=float,
+        default=defaults.retry_after,
+        help=f"429エラーのRetry-Afterの秒数 (デフォルト: {defaults.retry_after})"
+    )
+    parser.add_argument(
+        "--requests-per-minute",
+        type=int,
+        default=defaults.requests_per_minute,
+        help="1分あたりに受け付けるリクエスト数。0の場合は無制限 (デフォルト: 0)"
+    )
+    parser.add_argument(
+        "--capacity",
+        type=int,
+        default=defaults.capacity,
+        help="同時に処理するリクエスト数。超えた分は待たせる。0の場合は無制限 (デフォルト: 0)"
+    )
+    parser.add_argument(
+        "--seed",
+        type=int,
+        default=defaults.seed,
+        help=f"乱数のシード (デフォルト: {defaults.seed})"
+    )
+    parser.add_argument(
+        "--batch-latency",
+        type=float,
+        default=defaults.batch_latency,
+        help=f"バッチジョブが完了するまでの秒数 (デフォルト: {defaults.batch_latency})"
+    )
+
+
+def config_from_args(args: argparse.Namespace) -> FakeServerConfig:
+    """
+    コマンドライン引数からスタブサーバーの設定を生成します。
+
+    Parameters
+    ----------
+    args : argparse.Namespace
+        :func:`add_config_arguments` で追加した引数を含む解析結果。
+
+    Returns
+    -------
+    FakeServerConfig
+        スタブサーバーの設定。
+    """
+    return FakeServerConfig(
+        latency=args.latency,
+        latency_mean=args.latency_mean,
+        latency_sigma=args.latency_sigma,
+        tokens_per_second=args.tokens_per_second,
+        error_429_rate=args.error_429_rate,
+        error_500_rate=args.error_500_rate,
+        retry_after=args.retry_after,
+        requests_per_minute=args.requests_per_minute,
+        capacity=args.capacity,
+        seed=args.seed,
+        batch_latency=args.batch_latency
+    )
+
+
+def main():
+    """
+    スタブサーバーを起動します。
+    """
+    parser = argparse.ArgumentParser(description="負荷試験用のOpenAI互換スタブサーバーを起動します")
+    parser.add_argument(
+        "--host",
+        type=str,
+        default="127.0.0.1",
+        help="ホストアドレス (デフォルト: 127.0.0.1)"
+    )
+    parser.add_argument(
+        "--port",
+        type=int,
+        default=8001,
+        help="ポート番号 (デフォルト: 8001)"
+    )
+    add_config_arguments(parser)
+
+    args = parser.parse_args()
+    config = config_from_args(args)
+
+    print(f"スタブサーバーを起動しています... http://{args.host}:{args.port}/v1")
+    uvicorn.run(create_app(config), host=args.host, port=args.port, log_level="warning")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,165 @@
+"""requestsによるHTTP通信を記録・再生するユーティリティ。"""
+
+import base64
+import hashlib
+import json
+from pathlib import Path
+from typing import Any, Dict, Literal, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+# 再生時にヘッダーから取り除く項目（本文は展開済みで保存しているため）
+_DROPPED_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+def _normalize_url(url: str) -> str:
+    """
+    クエリパラメータの順序を揃えたURLを返します。
+    """
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme, parts.netloc.lower(), parts.path, query, ""))
+
+
+class HttpFixtures:
+    """
+    requestsのHTTP通信をディレクトリに記録し、ネットワークなしで再生するクラス。
+
+    ``requests.Session.send`` を差し替えるため、``requests.get`` のほか、
+    requestsを使用するライブラリ（praw・arxivなど）の通信も対象になります。
+    OpenAIクライアント（httpx）の通信は対象外です。
+
+    with文で使用します::
+
+        with HttpFixtures("data/loadtest/fixtures", mode="replay"):
+            HackerNewsRetriever(storage_dir=...).run()
+
+    Parameters
+    ----------
+    directory : str | Path
+        フィクスチャを保存するディレクトリ。
+    mode : {"record", "replay"}
+        recordは実際に通信して保存し、replayは保存済みの応答を返します。
+        replayで保存されていないリクエストには404を返します。
+    """
+
+    def __init__(self, directory: str | Path, mode: Literal["record", "replay"]):
+        """
+        HttpFixturesを初期化します。
+
+        Parameters
+        ----------
+        directory : str | Path
+            フィクスチャを保存するディレクトリ。
+        mode : {"record", "replay"}
+            記録するか再生するか。
+        """
+        if mode not in ("record", "replay"):
+            raise ValueError(f"Unknown fixture mode: {mode}")
+
+        self.directory = Path(directory)
+        self.mode = mode
+        self.recorded = 0
+        self.replayed = 0
+        self.missing = 0
+        self._original_send = None
+
+    def _path(self, method: str, url: str) -> Path:
+        """
+        リクエストに対応するフィクスチャファイルのパスを返します。
+        """
+        key = f"{method.upper()} {_normalize_url(url)}"
+        return self.directory / f"{hashlib.sha256(key.encode('utf-8')).hexdigest()[:32]}.json"
+
+    def _record(self, request: requests.PreparedRequest, response: requests.Response) -> None:
+        """
+        応答をフィクスチャとして保存します。
+        """
+        fixture = {
+            "method": request.method,
+            "url": request.url,
+            "status_code": response.status_code,
+            "reason": response.reason,
+            "headers": {
+                name: value for name, value in response.headers.items()
+                if name.lower() not in _DROPPED_HEADERS
+            },
+            "encoding": response.encoding,
+            "body": base64.b64encode(response.content).decode("ascii")
+        }
+        self.directory.mkdir(parents=True, exist_ok=True)
+        with open(self._path(request.method, request.url), "w", encoding="utf-8") as f:
+            json.dump(fixture, f, ensure_ascii=False, indent=2)
+        self.recorded += 1
+
+    def _replay(self, request: requests.PreparedRequest) -> requests.Response:
+        """
+        保存済みの応答を返します。
+        """
+        path = self._path(request.method, request.url)
+        fixture: Optional[Dict[str, Any]] = None
+        if path.exists():
+            with open(path, "r", encoding="utf-8") as f:
+                fixture = json.load(f)
+
+        response = requests.Response()
+        response.url = request.url
+        response.request = request
+
+        if fixture is None:
+            print(f"フィクスチャがありません: {request.method} {request.url}")
+            self.missing += 1
+            response.status_code = 404
+            response.reason = "Not Found (fixture missing)"
+            response.headers = CaseInsensitiveDict({"x-nook-fixture": "missing"})
+            response._content = b""
+            return response
+
+        self.replayed += 1
+        response.status_code = fixture["status_code"]
+        response.reason = fixture.get("reason") or ""
+        response.headers = CaseInsensitiveDict(fixture.get("headers") or {})
+        response.encoding = fixture.get("encoding")
+        response._content = base64.b64decode(fixture["body"])
+        return response
+
+    def __enter__(self) -> "HttpFixtures":
+        fixtures = self
+        original_send = requests.Session.send
+        self._original_send = original_send
+
+        def send(session: requests.Session, request: requests.PreparedRequest, **kwargs: Any) -> requests.Response:
+            if fixtures.mode == "replay":
+                return fixtures._replay(request)
+            response = original_send(session, request, **kwargs)
+            # ストリーミング応答も含めて本文を読み込んでから保存する
+            response.content
+            fixtures._record(request, response)
+            return response
+
+        requests.Session.send = send
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        if self._original_send is not None:
+            requests.Session.send = self._original_send
+            self._original_send = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        記録・再生の件数を取得します。
+
+        Returns
+        -------
+        Dict[str, Any]
+            モード・記録数・再生数・フィクスチャがなかった数。
+        """
+        return {
+            "mode": self.mode,
+            "directory": str(self.directory),
+            "recorded": self.recorded,
+            "replayed": self.replayed,
+            "missing": self.missing
+        }
@@ -1,16 +1,19 @@
 """GitHubのトレンドリポジトリを収集するサービス。"""
 
+import asyncio
 import tomli
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 
 import requests
 from bs4 import BeautifulSoup
 
-from nook.common.storage import LocalStorage
-from nook.common.grok_client import Grok3Client
+from nook.common.items import Item
+from nook.common.storage import create_storage
+from nook.common.grok_client import get_async_grok_client
+from nook.common.translator import Translator
 
 
 @dataclass
@@ -55,7 +58,7 @@ class GithubTrending:
         storage_dir : str, default="data"
             ストレージディレクトリのパス。
         """
-        self.storage = LocalStorage(storage_dir)
+        self.storage = create_storage(storage_dir)
         self.base_url = "https://github.com/trending"
         
         # 言語の設定を読み込む
@@ -85,7 +88,7 @@ class GithubTrending:
             all_repositories.append((language, repositories))
         
         # 翻訳処理
-        all_repositories = self._translate_repositories(all_repositories)
+        all_repositories = asyncio.run(self._translate_repositories(all_repositories))
         
         # 保存
         self._store_summaries(all_repositories)
@@ -150,10 +153,12 @@ class GithubTrending:
             print(f"Error retrieving repositories for language {language}: {str(e)}")
             return []
     
-    def _translate_repositories(self, repositories_by_language: List[tuple[str, List[Repository]]]) -> List[tuple[str, List[Repository]]]:
+    async def _translate_repositories(self, repositories_by_language: List[tuple[str, List[Repository]]]) -> List[tuple[str, List[Repository]]]:
         """
         リポジトリの説明を日本語に翻訳します。
         
+        短い説明は複数件をまとめて1回のリクエストで翻訳します。
+        
         Parameters
         ----------
         repositories_by_language : List[tuple[str, List[Repository]]]
@@ -165,17 +170,26 @@ class GithubTrending:
             翻訳されたリポジトリリスト。
         """
         try:
-            # Grok APIクライアントの初期化
-            grok_client = Grok3Client()
+            # プロセス共有のGrok APIクライアントを取得
+            grok_client = get_async_grok_client()
+            translator = Translator(
+                grok_client,
+                instruction="以下の英語のテキストを自然な日本語に翻訳してください。技術用語はそのままでも構いません。"
+            )
+            
+            targets = [
+                repo
+                for _, repositories in repositories_by_language
+                for repo in repositories
+                if repo.description
+            ]
+            translations = await translator.translate_many(
+                [repo.description for repo in targets],
+                call_site="github.translate_description"
+            )
             
-            for language, repositories in repositories_by_language:
-                for repo in repositories:
-                    if repo.description:
-                        prompt = f"以下の英語のテキストを自然な日本語に翻訳してください。技術用語はそのままでも構いません。\n\n{repo.description}"
-                        try:
-                            repo.description = grok_client.generate_content(prompt=prompt, temperature=0.3)
-                        except Exception as e:
-                            print(f"Error translating description for {repo.name}: {str(e)}")
+            for repo, translation in zip(targets, translations):
+                repo.description = translation
         
         except Exception as e:
             print(f"Error in translation process: {str(e)}")
@@ -186,29 +200,58 @@ class GithubTrending:
         """
         リポジトリ情報を保存します。
         
+        リポジトリごとの項目を保存し、Markdownはその項目から生成します。
+        
         Parameters
         ----------
         repositories_by_language : List[tuple[str, List[Repository]]]
             言語ごとのリポジトリリスト。
         """
         today = datetime.now()
-        content = f"# GitHub トレンドリポジトリ ({today.strftime('%Y-%m-%d')})\n\n"
+        items = [
+            Item(title=repo.name, url=repo.link, text=repo.description or "", score=repo.stars, category=language)
+            for language, repositories in repositories_by_language
+            for repo in repositories
+        ]
+        
+        # 保存
+        self.storage.save_items(items, "github_trending", today)
+        self.storage.save_markdown(self._render_markdown(items, today), "github_trending", today)
+    
+    def _render_markdown(self, items: List[Item], date: datetime) -> str:
+        """
+        項目からMarkdownを生成します。
         
-        for language, repositories in repositories_by_language:
-            if not repositories:
-                continue
+        Parameters
+        ----------
+        items : List[Item]
+            リポジトリの項目のリスト。
+        date : datetime
+            日付。
             
+        Returns
+        -------
+        str
+            Markdown。
+        """
+        content = f"# GitHub トレンドリポジトリ ({date.strftime('%Y-%m-%d')})\n\n"
+        
+        # 言語ごとに整理
+        languages: Dict[str, List[Item]] = {}
+        for item in items:
+            languages.setdefault(item.category, []).append(item)
+        
+        for language, language_items in languages.items():
             language_display = language if language != "all" else "すべての言語"
             content += f"## {language_display.capitalize()}\n\n"
             
-            for repo in repositories:
-                content += f"### [{repo.name}]({repo.link})\n\n"
+            for item in language_items:
+                content += f"### [{item.title}]({item.url})\n\n"
                 
-                if repo.description:
-                    content += f"{repo.description}\n\n"
+                if item.text:
+                    content += f"{item.text}\n\n"
                 
-                content += f"⭐ スター数: {repo.stars}\n\n"
+                content += f"⭐ スター数: {item.score}\n\n"
                 content += "---\n\n"
         
-        # 保存
-        self.storage.save_markdown(content, "github_trending", today) 
\ No newline at end of file
+        return content
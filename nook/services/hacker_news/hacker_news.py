@@ -1,5 +1,6 @@
 """Hacker Newsの記事を収集するサービス。"""
 
+import asyncio
 import json
 from dataclasses import dataclass
 from datetime import datetime
@@ -8,8 +9,11 @@ from typing import List, Optional
 import requests
 from bs4 import BeautifulSoup
 
-from nook.common.storage import LocalStorage
-from nook.common.grok_client import Grok3Client
+from nook.common.items import Item
+from nook.common.storage import create_storage
+from nook.common.grok_client import get_async_grok_client
+from nook.common.prompt_input import compact_prompt_input
+from nook.common.translator import Translator
 
 
 @dataclass
@@ -54,7 +58,7 @@ class HackerNewsRetriever:
         storage_dir : str, default="data"
             ストレージディレクトリのパス。
         """
-        self.storage = LocalStorage(storage_dir)
+        self.storage = create_storage(storage_dir)
         self.base_url = "https://hacker-news.firebaseio.com/v0"
     
     def run(self, limit: int = 30) -> None:
@@ -67,6 +71,10 @@ class HackerNewsRetriever:
             取得する記事数。
         """
         stories = self._get_top_stories(limit)
+        
+        # 日本語に翻訳
+        stories = asyncio.run(self._translate_stories_to_japanese(stories))
+        
         self._store_summaries(stories)
     
     def _get_top_stories(self, limit: int) -> List[Story]:
@@ -144,17 +152,21 @@ class HackerNewsRetriever:
                 except Exception as e:
                     print(f"Error fetching content for {story.url}: {str(e)}")
             
+            # Ask HNなどの本文はHTMLのため、マークアップ・URLを取り除いて切り詰める
+            if story.text:
+                story.text = compact_prompt_input(story.text, call_site="hacker_news.translate_text")
+            
             stories.append(story)
         
-        # 日本語に翻訳
-        stories = self._translate_stories_to_japanese(stories)
-        
         return stories
     
-    def _translate_stories_to_japanese(self, stories: List[Story]) -> List[Story]:
+    async def _translate_stories_to_japanese(self, stories: List[Story]) -> List[Story]:
         """
         記事を日本語に翻訳します。
         
+        すべての記事のタイトルと本文をまとめて翻訳します。短いテキストは
+        複数件を1回のリクエストにまとめ、長い本文は分割して並行に翻訳します。
+        
         Parameters
         ----------
         stories : List[Story]
@@ -166,35 +178,33 @@ class HackerNewsRetriever:
             翻訳された記事のリスト。
         """
         try:
-            # 翻訳処理を行わない（デバッグ用）
-            # print("翻訳処理をスキップします（APIエラー回避のため）")
+            # プロセス共有のGrok APIクライアントを取得
+            grok_client = get_async_grok_client()
+            translator = Translator(
+                grok_client,
+                instruction="以下の英語のテキストを自然な日本語に翻訳してください。原文のニュアンスを保ちつつ、日本語として読みやすい文章にしてください。"
+            )
             
-            # 以下は翻訳処理のコメントアウト
-            # Grok APIクライアントの初期化
-            grok_client = Grok3Client()
+            # 長い本文は Translator が文・段落の境界で分割して並行に翻訳する
+            titled_stories = [story for story in stories if story.title]
+            texted_stories = [story for story in stories if story.text]
             
-            for story in stories:
-                # タイトルの翻訳
-                if story.title:
-                    prompt = f"以下の英語のテキストを自然な日本語に翻訳してください。原文のニュアンスを保ちつつ、日本語として読みやすい文章にしてください。\n\n{story.title}"
-                    story.title = grok_client.generate_content(prompt=prompt, temperature=0.3)
-                
-                # 本文の翻訳
-                if story.text:
-                    # 長い本文は分割して翻訳
-                    if len(story.text) > 1000:
-                        chunks = [story.text[i:i+1000] for i in range(0, len(story.text), 1000)]
-                        translated_chunks = []
-                        
-                        for chunk in chunks:
-                            prompt = f"以下の英語のテキストを自然な日本語に翻訳してください。原文のニュアンスを保ちつつ、日本語として読みやすい文章にしてください。\n\n{chunk}"
-                            translated_chunk = grok_client.generate_content(prompt=prompt, temperature=0.3)
-                            translated_chunks.append(translated_chunk)
-                        
-                        story.text = "".join(translated_chunks)
-                    else:
-                        prompt = f"以下の英語のテキストを自然な日本語に翻訳してください。原文のニュアンスを保ちつつ、日本語として読みやすい文章にしてください。\n\n{story.text}"
-                        story.text = grok_client.generate_content(prompt=prompt, temperature=0.3)
+            titles_ja, texts_ja = await asyncio.gather(
+                translator.translate_many(
+                    [story.title for story in titled_stories],
+                    call_site="hacker_news.translate_title"
+                ),
+                translator.translate_many(
+                    [story.text for story in texted_stories],
+                    call_site="hacker_news.translate_text"
+                )
+            )
+            
+            for story, title_ja in zip(titled_stories, titles_ja):
+                story.title = title_ja
+            
+            for story, text_ja in zip(texted_stories, texts_ja):
+                story.text = text_ja
         
         except Exception as e:
             print(f"Error translating stories: {str(e)}")
@@ -205,23 +215,49 @@ class HackerNewsRetriever:
         """
         記事情報を保存します。
         
+        記事ごとの項目を保存し、Markdownはその項目から生成します。
+        
         Parameters
         ----------
         stories : List[Story]
             保存する記事のリスト。
         """
         today = datetime.now()
-        content = f"# Hacker News トップ記事 ({today.strftime('%Y-%m-%d')})\n\n"
+        items = [
+            Item(title=story.title, url=story.url, text=story.text or "", score=story.score)
+            for story in stories
+        ]
+        
+        # 保存
+        self.storage.save_items(items, "hacker_news", today)
+        self.storage.save_markdown(self._render_markdown(items, today), "hacker_news", today)
+    
+    def _render_markdown(self, items: List[Item], date: datetime) -> str:
+        """
+        項目からMarkdownを生成します。
+        
+        Parameters
+        ----------
+        items : List[Item]
+            記事の項目のリスト。
+        date : datetime
+            日付。
+            
+        Returns
+        -------
+        str
+            Markdown。
+        """
+        content = f"# Hacker News トップ記事 ({date.strftime('%Y-%m-%d')})\n\n"
         
-        for story in stories:
-            title_link = f"[{story.title}]({story.url})" if story.url else story.title
+        for item in items:
+            title_link = f"[{item.title}]({item.url})" if item.url else item.title
             content += f"## {title_link}\n\n"
-            content += f"スコア: {story.score}\n\n"
+            content += f"スコア: {item.score}\n\n"
             
-            if story.text:
-                content += f"{story.text[:500]}{'...' if len(story.text) > 500 else ''}\n\n"
+            if item.text:
+                content += f"{item.text[:500]}{'...' if len(item.text) > 500 else ''}\n\n"
             
             content += "---\n\n"
         
-        # 保存
-        self.storage.save_markdown(content, "hacker_news", today) 
\ No newline at end of file
+        return content
@@ -1,19 +1,23 @@
 """arXiv論文を収集・要約するサービス。"""
 
+import asyncio
 import os
 import re
 from dataclasses import dataclass, field
 from datetime import datetime
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 import arxiv
 import requests
 from bs4 import BeautifulSoup
 from tqdm import tqdm
 
-from nook.common.grok_client import Grok3Client
-from nook.common.storage import LocalStorage
+from nook.common.batch_jobs import BatchJobRunner, BatchRequest
+from nook.common.grok_client import get_async_grok_client
+from nook.common.items import Item
+from nook.common.storage import ItemWriter, create_storage
+from nook.common.translator import Translator
 
 
 @dataclass
@@ -59,10 +63,16 @@ class PaperSummarizer:
         storage_dir : str, default="data"
             ストレージディレクトリのパス。
         """
-        self.storage = LocalStorage(storage_dir)
-        self.grok_client = Grok3Client()
+        self.storage = create_storage(storage_dir)
+        # 要約できた論文から1件ずつ追記するライター（run の実行中のみ）
+        self._item_writer: Optional[ItemWriter] = None
+        self.grok_client = get_async_grok_client()
+        self.translator = Translator(
+            self.grok_client,
+            instruction="以下の英語の学術論文のテキストを自然な日本語に翻訳してください。専門用語は適切に翻訳し、必要に応じて英語の専門用語を括弧内に残してください。"
+        )
     
-    def run(self, limit: int = 5) -> None:
+    def run(self, limit: int = 5, batch: bool = False) -> None:
         """
         arXiv論文を収集・要約して保存します。
         
@@ -70,21 +80,33 @@ class PaperSummarizer:
         ----------
         limit : int, default=5
             取得する論文数。
+        batch : bool, default=False
+            Trueの場合、要約をバッチジョブとしてまとめて実行します（完了まで時間がかかる代わりに安価）。
         """
         # Hugging Faceでキュレーションされた論文IDを取得
         paper_ids = self._get_curated_paper_ids(limit)
         
         # 論文情報を取得
         papers = []
-        for paper_id in tqdm(paper_ids, desc="論文を処理中"):
+        for paper_id in tqdm(paper_ids, desc="論文を取得中"):
             paper_info = self._retrieve_paper_info(paper_id)
             if paper_info:
-                # 論文を要約
-                self._summarize_paper_info(paper_info)
                 papers.append(paper_info)
         
-        # 要約を保存
-        self._store_summaries(papers)
+        # 翻訳と要約をすべての論文で並行して実行し、要約できた論文から順に追記する
+        self._item_writer = self.storage.open_item_writer("paper_summarizer")
+        try:
+            asyncio.run(self._process_papers(papers, summarize=not batch))
+            
+            # 急がない要約はバッチジョブで実行
+            if batch:
+                self._summarize_in_batch(papers)
+            
+            # 要約を保存
+            self._store_summaries(papers)
+        finally:
+            self._item_writer.close()
+            self._item_writer = None
         
         # 処理済みの論文IDを保存
         self._save_processed_ids(paper_ids)
@@ -204,13 +226,10 @@ class PaperSummarizer:
             # PDFから本文を抽出
             contents = self._extract_body_text(paper)
             
-            # タイトルとアブストラクトを日本語に翻訳
-            title_ja = self._translate_to_japanese(paper.title)
-            abstract_ja = self._translate_to_japanese(paper.summary)
-            
+            # タイトルとアブストラクトの翻訳は _process_papers でまとめて行う
             return PaperInfo(
-                title=title_ja,
-                abstract=abstract_ja,
+                title=paper.title,
+                abstract=paper.summary,
                 url=paper.entry_id,
                 contents=contents
             )
@@ -219,33 +238,35 @@ class PaperSummarizer:
             print(f"Error retrieving paper {paper_id}: {str(e)}")
             return None
     
-    def _translate_to_japanese(self, text: str) -> str:
+    async def _process_papers(self, papers: List[PaperInfo], summarize: bool = True) -> None:
         """
-        テキストを日本語に翻訳します。
+        論文の翻訳と要約を実行します。
+        
+        すべての論文のタイトルとアブストラクトをまとめて翻訳したあと、
+        各論文の要約を並行して生成します。
         
         Parameters
         ----------
-        text : str
-            翻訳するテキスト。
-            
-        Returns
-        -------
-        str
-            翻訳されたテキスト。
+        papers : List[PaperInfo]
+            処理する論文のリスト。翻訳結果と要約で上書きされます。
+        summarize : bool, default=True
+            Falseの場合は翻訳のみ行います。
         """
-        try:
-            prompt = f"以下の英語の学術論文のテキストを自然な日本語に翻訳してください。専門用語は適切に翻訳し、必要に応じて英語の専門用語を括弧内に残してください。\n\n{text}"
-            
-            translated_text = self.grok_client.generate_content(
-                prompt=prompt,
-                temperature=0.3,
-                max_tokens=1000
+        titles_ja, abstracts_ja = await asyncio.gather(
+            self.translator.translate_many(
+                [paper_info.title for paper_info in papers], call_site="paper.translate_title"
+            ),
+            self.translator.translate_many(
+                [paper_info.abstract for paper_info in papers], call_site="paper.translate_abstract"
             )
-            
-            return translated_text
-        except Exception as e:
-            print(f"Error translating text: {str(e)}")
-            return text  # 翻訳に失敗した場合は原文を返す
+        )
+        for paper_info, title_ja, abstract_ja in zip(papers, titles_ja, abstracts_ja):
+            paper_info.title = title_ja
+            paper_info.abstract = abstract_ja
+        
+        # 翻訳後の内容で論文を要約
+        if summarize:
+            await self._summarize_all(papers)
     
     def _extract_body_text(self, paper: arxiv.Result) -> str:
         """
@@ -265,14 +286,19 @@ class PaperSummarizer:
         # 実際のPDF解析は複雑なため、ここでは省略
         return paper.summary
     
-    def _summarize_paper_info(self, paper_info: PaperInfo) -> None:
+    def _summary_prompt(self, paper_info: PaperInfo) -> Tuple[str, str]:
         """
-        論文を要約します。
+        論文の要約を依頼するプロンプトを作成します。
         
         Parameters
         ----------
         paper_info : PaperInfo
             要約する論文情報。
+            
+        Returns
+        -------
+        Tuple[str, str]
+            プロンプトとシステム指示。
         """
         prompt = f"""
         以下の論文を要約してください。
@@ -294,21 +320,121 @@ class PaperSummarizer:
         回答は必ず日本語で行ってください。専門用語は適切に翻訳し、必要に応じて英語の専門用語を括弧内に残してください。
         """
         
+        return prompt, system_instruction
+    
+    async def _summarize_paper_info(self, paper_info: PaperInfo) -> None:
+        """
+        論文を要約します。
+        
+        Parameters
+        ----------
+        paper_info : PaperInfo
+            要約する論文情報。
+        """
+        prompt, system_instruction = self._summary_prompt(paper_info)
+        
         try:
-            summary = self.grok_client.generate_content(
+            summary = await self.grok_client.generate_content(
                 prompt=prompt,
                 system_instruction=system_instruction,
-                temperature=0.3,
-                max_tokens=1000
+                call_site="paper.summarize_paper"
             )
             paper_info.summary = summary
         except Exception as e:
+            # エラーの文言は要約ではないため、生成中の日の項目には追記しない
             paper_info.summary = f"要約の生成中にエラーが発生しました: {str(e)}"
+            return
+        
+        self._append_item(paper_info)
+    
+    def _summarize_in_batch(self, papers: List[PaperInfo]) -> None:
+        """
+        すべての論文の要約を1つのバッチジョブで生成します。
+        
+        バッチジョブが失敗した場合や結果を得られなかった論文は、通常のリクエストで要約します。
+        
+        Parameters
+        ----------
+        papers : List[PaperInfo]
+            要約する論文のリスト。要約で上書きされます。
+        """
+        batch_requests = []
+        for index, paper_info in enumerate(papers):
+            prompt, system_instruction = self._summary_prompt(paper_info)
+            batch_requests.append(BatchRequest(
+                custom_id=str(index),
+                prompt=prompt,
+                system_instruction=system_instruction,
+                call_site="paper.summarize_paper"
+            ))
+        
+        try:
+            summaries = BatchJobRunner().run(batch_requests, name="paper")
+        except Exception as e:
+            print(f"バッチジョブで要約できなかったため、通常のリクエストで要約します: {str(e)}")
+            summaries = {}
+        
+        remaining = []
+        for index, paper_info in enumerate(papers):
+            if str(index) in summaries:
+                paper_info.summary = summaries[str(index)]
+                self._append_item(paper_info)
+            else:
+                remaining.append(paper_info)
+        
+        if remaining:
+            asyncio.run(self._summarize_all(remaining))
+    
+    async def _summarize_all(self, papers: List[PaperInfo]) -> None:
+        """
+        論文の要約を通常のリクエストで並行して生成します。
+        
+        Parameters
+        ----------
+        papers : List[PaperInfo]
+            要約する論文のリスト。
+        """
+        await asyncio.gather(*(self._summarize_paper_info(paper_info) for paper_info in papers))
+    
+    def _append_item(self, paper_info: PaperInfo) -> None:
+        """
+        要約できた論文を、実行中の日の項目として追記します。
+        
+        Parameters
+        ----------
+        paper_info : PaperInfo
+            要約した論文情報。
+        """
+        if self._item_writer is None:
+            return
+        
+        try:
+            self._item_writer.append(self._to_item(paper_info))
+        except Exception as e:
+            print(f"Error appending item for paper {paper_info.url}: {str(e)}")
+    
+    def _to_item(self, paper_info: PaperInfo) -> Item:
+        """
+        論文情報を保存する項目に変換します。
+        
+        Parameters
+        ----------
+        paper_info : PaperInfo
+            論文情報。
+            
+        Returns
+        -------
+        Item
+            項目。
+        """
+        return Item(title=paper_info.title, url=paper_info.url, text=paper_info.abstract, summary=paper_info.summary)
     
     def _store_summaries(self, papers: List[PaperInfo]) -> None:
         """
         要約を保存します。
         
+        論文ごとの項目を保存し、Markdownはその項目から生成します。
+        
         Parameters
         ----------
         papers : List[PaperInfo]
@@ -318,13 +444,34 @@ class PaperSummarizer:
             return
         
         today = datetime.now()
-        content = f"# arXiv 論文要約 ({today.strftime('%Y-%m-%d')})\n\n"
+        items = [self._to_item(paper) for paper in papers]
+        
+        # 保存
+        self.storage.save_items(items, "paper_summarizer", today)
+        self.storage.save_markdown(self._render_markdown(items, today), "paper_summarizer", today)
+    
+    def _render_markdown(self, items: List[Item], date: datetime) -> str:
+        """
+        項目からMarkdownを生成します。
         
-        for paper in papers:
-            content += f"## [{paper.title}]({paper.url})\n\n"
-            content += f"**アブストラクト**:\n{paper.abstract}\n\n"
-            content += f"**要約**:\n{paper.summary}\n\n"
+        Parameters
+        ----------
+        items : List[Item]
+            論文の項目のリスト。
+        date : datetime
+            日付。
+            
+        Returns
+        -------
+        str
+            Markdown。
+        """
+        content = f"# arXiv 論文要約 ({date.strftime('%Y-%m-%d')})\n\n"
+        
+        for item in items:
+            content += f"## [{item.title}]({item.url})\n\n"
+            content += f"**アブストラクト**:\n{item.text}\n\n"
+            content += f"**要約**:\n{item.summary}\n\n"
             content += "---\n\n"
         
-        # 保存
-        self.storage.save_markdown(content, "paper_summarizer", today) 
\ No newline at end of file
+        return content
@@ -1,17 +1,26 @@
 """Redditの人気投稿を収集・要約するサービス。"""
 
+import asyncio
 import os
 import tomli
-from dataclasses import dataclass, field
+from dataclasses import dataclass, field, fields
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Literal, Optional
+from typing import Dict, List, Literal, Optional, Tuple
 
 import praw
 from praw.models import Submission
 
-from nook.common.grok_client import Grok3Client
-from nook.common.storage import LocalStorage
+from nook.common.fused_summary import fused_summary_enabled, translate_and_summarize
+from nook.common.grok_client import get_async_grok_client
+from nook.common.items import Item
+from nook.common.prompt_input import compact_prompt_input
+from nook.common.run_journal import RunJournal
+from nook.common.storage import ItemWriter, create_storage
+from nook.common.translator import Translator
+
+# 翻訳と要約をまとめて依頼するときに、プロンプトに含める本文の最大の文字数
+_FUSED_TEXT_CHARS = 4000
 
 
 @dataclass
@@ -37,6 +46,10 @@ class RedditPost:
         投稿へのパーマリンク。
     thumbnail : str
         サムネイルURL。
+    category : str
+        投稿を取得したカテゴリ。
+    subreddit : str
+        投稿を取得したサブレディット名。
     """
     
     type: Literal["image", "gallery", "video", "poll", "crosspost", "text", "link"]
@@ -49,6 +62,8 @@ class RedditPost:
     comments: List[Dict[str, str | int]] = field(default_factory=list)
     summary: str = field(init=False)
     thumbnail: str = "self"
+    category: str = ""
+    subreddit: str = ""
 
 
 class RedditExplorer:
@@ -101,42 +116,121 @@ class RedditExplorer:
             user_agent=self.user_agent
         )
         
-        self.grok_client = Grok3Client()
-        self.storage = LocalStorage(storage_dir)
+        self.grok_client = get_async_grok_client()
+        self.translator = Translator(
+            self.grok_client,
+            instruction="以下の英語のテキストを自然な日本語に翻訳してください。専門用語や固有名詞は適切に翻訳し、必要に応じて英語の原語を括弧内に残してください。"
+        )
+        self.storage = create_storage(storage_dir)
+        # 要約できた投稿から1件ずつ追記するライター（run の実行中のみ）
+        self._item_writer: Optional[ItemWriter] = None
+        # 投稿ごとに完了した段階を記録するジャーナル（run の実行中のみ）
+        self._journal: Optional[RunJournal] = None
         
         # サブレディットの設定を読み込む
         script_dir = Path(__file__).parent
         with open(script_dir / "subreddits.toml", "rb") as f:
             self.subreddits_config = tomli.load(f)
     
-    def run(self, limit: int = 3) -> None:
+    def run(self, limit: int = 3, resume: bool = False) -> None:
         """
         Redditの人気投稿を収集・要約して保存します。
         
+        投稿ごとに完了した段階（取得・翻訳・要約・保存）をジャーナルに記録します。
+        
         Parameters
         ----------
         limit : int, default=3
             各サブレディットから取得する投稿数。
+        resume : bool, default=False
+            Trueの場合、前回の実行が途中で終了していれば、ジャーナルに記録した段階の続きから実行します。
         """
-        all_posts = []
-        
-        # 各カテゴリのサブレディットから投稿を取得
-        for category, subreddits in self.subreddits_config.items():
-            for subreddit_name in subreddits:
-                posts = self._retrieve_hot_posts(subreddit_name, limit)
+        self._journal = RunJournal.open(self.storage.base_dir, "reddit_explorer", resume=resume)
+        try:
+            all_posts = []
+            
+            # 各カテゴリのサブレディットから投稿を取得
+            for category, subreddits in self.subreddits_config.items():
+                for subreddit_name in subreddits:
+                    for post in self._fetch_posts(category, subreddit_name, limit):
+                        all_posts.append((category, subreddit_name, post))
+            
+            # 前回の実行で翻訳・要約まで完了した投稿は、記録した結果を使う
+            pending = []
+            translated = []
+            for _, _, post in all_posts:
+                summarized = self._journal.get(post.id, "summarized")
+                translation = self._journal.get(post.id, "translated")
+                if summarized:
+                    post.title = summarized["title"]
+                    post.text = summarized["text"]
+                    post.summary = summarized["summary"]
+                elif translation:
+                    post.title = translation["title"]
+                    post.text = translation["text"]
+                    post.comments = translation["comments"]
+                    translated.append(post)
+                else:
+                    pending.append(post)
+            if resume and len(pending) < len(all_posts):
+                print(f"{len(all_posts) - len(pending) - len(translated)} 件の要約済みの投稿と"
+                      f"{len(translated)} 件の翻訳済みの投稿を再開に使います")
+            
+            # 翻訳と要約をすべての投稿で並行して実行し、要約できた投稿から順に追記する
+            self._item_writer = self.storage.open_item_writer("reddit_explorer")
+            try:
+                asyncio.run(self._process_posts(pending, translated))
                 
-                for post in posts:
-                    # トップコメントを取得
-                    comments = self._retrieve_top_comments_of_post(post, limit=5)
-                    post.comments = comments
-                    
-                    # 投稿を要約
-                    self._summarize_reddit_post(post)
-                    
-                    all_posts.append((category, subreddit_name, post))
+                # 要約を保存
+                if not all(self._journal.has(post.id, "stored") for _, _, post in all_posts):
+                    self._store_summaries(all_posts)
+            finally:
+                self._item_writer.close()
+                self._item_writer = None
+            
+            self._journal.finish()
+        finally:
+            self._journal.close()
+            self._journal = None
+    
+    def _fetch_posts(self, category: str, subreddit_name: str, limit: int) -> List[RedditPost]:
+        """
+        サブレディットの人気投稿とそのトップコメントを取得します。
+        
+        前回の実行で取得済みのサブレディットは、ジャーナルに記録した内容を使います。
         
-        # 要約を保存
-        self._store_summaries(all_posts)
+        Parameters
+        ----------
+        category : str
+            カテゴリ。
+        subreddit_name : str
+            サブレディット名。
+        limit : int
+            取得する投稿数。
+            
+        Returns
+        -------
+        List[RedditPost]
+            取得した投稿のリスト。
+        """
+        source_id = f"r/{subreddit_name}"
+        fetched = self._journal.get(source_id, "fetched") if self._journal else None
+        if fetched is not None:
+            return [RedditPost(**self._journal.get(post_id, "fetched")) for post_id in fetched["ids"]]
+        
+        posts = self._retrieve_hot_posts(subreddit_name, limit)
+        for post in posts:
+            # トップコメントを取得
+            post.comments = self._retrieve_top_comments_of_post(post, limit=5)
+            post.category = category
+            post.subreddit = subreddit_name
+            self._record(post.id, "fetched", {
+                f.name: getattr(post, f.name) for f in fields(RedditPost) if f.init
+            })
+        
+        # すべての投稿を記録してから、サブレディットを取得済みとする
+        self._record(source_id, "fetched", {"ids": [post.id for post in posts]})
+        return posts
     
     def _retrieve_hot_posts(self, subreddit_name: str, limit: int) -> List[RedditPost]:
         """
@@ -178,17 +272,14 @@ class RedditExplorer:
             else:
                 post_type = "link"
             
-            # タイトルと本文を日本語に翻訳
-            title_ja = self._translate_to_japanese(submission.title)
-            text_ja = self._translate_to_japanese(submission.selftext) if submission.selftext else ""
-            
+            # タイトルと本文の翻訳は _process_posts でまとめて行う
             post = RedditPost(
                 type=post_type,
                 id=submission.id,
-                title=title_ja,
+                title=submission.title,
                 url=submission.url if not submission.is_self else None,
                 upvotes=submission.score,
-                text=text_ja,
+                text=compact_prompt_input(submission.selftext or "", call_site="reddit.translate_text"),
                 permalink=f"https://www.reddit.com{submission.permalink}",
                 thumbnail=submission.thumbnail if hasattr(submission, "thumbnail") else "self"
             )
@@ -197,36 +288,98 @@ class RedditExplorer:
         
         return posts
     
-    def _translate_to_japanese(self, text: str) -> str:
+    async def _process_posts(self, posts: List[RedditPost], translated: Optional[List[RedditPost]] = None) -> None:
+        """
+        投稿の翻訳と要約を実行します。
+        
+        各投稿のタイトル・本文の翻訳と要約を1回のリクエストでまとめて生成します。
+        結果を得られなかった投稿は、翻訳と要約を別々に行います。
+        
+        Parameters
+        ----------
+        posts : List[RedditPost]
+            処理する投稿のリスト。翻訳結果と要約で上書きされます。
+        translated : List[RedditPost], optional
+            翻訳済みで、要約のみを行う投稿のリスト。
+        """
+        remaining = posts
+        if posts and fused_summary_enabled():
+            results = await asyncio.gather(*(self._translate_and_summarize_post(post) for post in posts))
+            remaining = [post for post, done in zip(posts, results) if not done]
+            if remaining:
+                print(f"{len(remaining)} 件の投稿は翻訳と要約を別々に行います")
+        
+        jobs = [self._summarize_reddit_post(post) for post in translated or []]
+        if remaining:
+            jobs.append(self._translate_then_summarize(remaining))
+        await asyncio.gather(*jobs)
+    
+    async def _translate_and_summarize_post(self, post: RedditPost) -> bool:
         """
-        テキストを日本語に翻訳します。
+        投稿のタイトル・本文の翻訳と要約を1回のリクエストで生成します。
         
         Parameters
         ----------
-        text : str
-            翻訳するテキスト。
+        post : RedditPost
+            処理する投稿。成功した場合は翻訳結果と要約で上書きされます。
             
         Returns
         -------
-        str
-            翻訳されたテキスト。
+        bool
+            成功した場合はTrue。
         """
-        if not text:
-            return ""
+        prompt, system_instruction = self._summary_prompt(post, translate=True)
+        result = await translate_and_summarize(
+            self.grok_client,
+            prompt,
+            system_instruction,
+            has_text=bool(post.text.strip()),
+            call_site="reddit.translate_and_summarize"
+        )
+        if result is None:
+            return False
         
-        try:
-            prompt = f"以下の英語のテキストを自然な日本語に翻訳してください。専門用語や固有名詞は適切に翻訳し、必要に応じて英語の原語を括弧内に残してください。\n\n{text}"
-            
-            translated_text = self.grok_client.generate_content(
-                prompt=prompt,
-                temperature=0.3,
-                max_tokens=1000
+        post.title = result.title
+        post.text = result.text if post.text.strip() else ""
+        post.summary = result.summary
+        self._record(post.id, "summarized", {"title": post.title, "text": post.text, "summary": post.summary})
+        self._append_item(post)
+        return True
+    
+    async def _translate_then_summarize(self, posts: List[RedditPost]) -> None:
+        """
+        すべての投稿のタイトル・本文・コメントをまとめて翻訳したあと、
+        各投稿の要約を並行して生成します。
+        
+        Parameters
+        ----------
+        posts : List[RedditPost]
+            処理する投稿のリスト。翻訳結果と要約で上書きされます。
+        """
+        # タイトル・本文・コメントをそれぞれまとめて並行に翻訳する
+        comments = [comment for post in posts for comment in post.comments]
+        titles_ja, texts_ja, comments_ja = await asyncio.gather(
+            self.translator.translate_many(
+                [post.title for post in posts], call_site="reddit.translate_title"
+            ),
+            self.translator.translate_many(
+                [post.text for post in posts], call_site="reddit.translate_text"
+            ),
+            self.translator.translate_many(
+                [comment["text"] for comment in comments], call_site="reddit.translate_comment"
             )
-            
-            return translated_text
-        except Exception as e:
-            print(f"Error translating text: {str(e)}")
-            return text  # 翻訳に失敗した場合は原文を返す
+        )
+        
+        for post, title_ja, text_ja in zip(posts, titles_ja, texts_ja):
+            post.title = title_ja
+            post.text = text_ja
+        for comment, comment_ja in zip(comments, comments_ja):
+            comment["text"] = comment_ja
+        for post in posts:
+            self._record(post.id, "translated", {"title": post.title, "text": post.text, "comments": post.comments})
+        
+        # 翻訳後の内容で投稿を要約
+        await asyncio.gather(*(self._summarize_reddit_post(post) for post in posts))
     
     def _retrieve_top_comments_of_post(self, post: RedditPost, limit: int = 5) -> List[Dict[str, str | int]]:
         """
@@ -251,30 +404,42 @@ class RedditExplorer:
         comments = []
         for comment in submission.comments[:limit]:
             if hasattr(comment, "body"):
-                # コメントを日本語に翻訳
-                comment_text_ja = self._translate_to_japanese(comment.body)
-                
+                # コメントは要約の入力に使い、必要な場合は _process_posts でまとめて翻訳する
                 comments.append({
-                    "text": comment_text_ja,
+                    "text": compact_prompt_input(comment.body, call_site="reddit.translate_comment"),
                     "score": comment.score if hasattr(comment, "score") else 0
                 })
         
         return comments
     
-    def _summarize_reddit_post(self, post: RedditPost) -> None:
+    def _summary_prompt(self, post: RedditPost, translate: bool = False) -> Tuple[str, str]:
         """
-        Reddit投稿を要約します。
+        投稿の要約を依頼するプロンプトを作成します。
         
         Parameters
         ----------
         post : RedditPost
             要約する投稿。
+        translate : bool, default=False
+            Trueの場合、タイトルと本文の翻訳もあわせて依頼します。本文は長すぎる場合に切り詰めます。
+            
+        Returns
+        -------
+        Tuple[str, str]
+            プロンプトとシステム指示。
         """
+        if translate:
+            request = "以下のReddit投稿のタイトルと本文を日本語に翻訳し、投稿を要約してください。"
+            text = post.text[:_FUSED_TEXT_CHARS]
+        else:
+            request = "以下のReddit投稿を要約してください。"
+            text = post.text
+        
         prompt = f"""
-        以下のReddit投稿を要約してください。
+        {request}
 
         タイトル: {post.title}
-        本文: {post.text if post.text else '(本文なし)'}
+        本文: {text if text else '(本文なし)'}
         URL: {post.url if post.url else '(URLなし)'}
         
         トップコメント:
@@ -293,59 +458,162 @@ class RedditExplorer:
         回答は必ず日本語で行ってください。専門用語は適切に翻訳し、必要に応じて英語の専門用語を括弧内に残してください。
         """
         
+        return prompt, system_instruction
+    
+    async def _summarize_reddit_post(self, post: RedditPost) -> None:
+        """
+        Reddit投稿を要約します。
+        
+        Parameters
+        ----------
+        post : RedditPost
+            要約する投稿。
+        """
+        prompt, system_instruction = self._summary_prompt(post)
+        
         try:
-            summary = self.grok_client.generate_content(
+            summary = await self.grok_client.generate_content(
                 prompt=prompt,
                 system_instruction=system_instruction,
-                temperature=0.3,
-                max_tokens=1000
+                call_site="reddit.summarize_post"
             )
             post.summary = summary
+            self._record(post.id, "summarized", {"title": post.title, "text": post.text, "summary": post.summary})
         except Exception as e:
+            # エラーの文言は要約ではないため、生成中の日の項目には追記しない
             post.summary = f"要約の生成中にエラーが発生しました: {str(e)}"
+            return
+        
+        self._append_item(post)
+    
+    def _record(self, item_id: str, stage: str, data: Optional[Dict] = None) -> None:
+        """
+        投稿の段階が完了したことを、実行中のジャーナルに記録します。
+        
+        Parameters
+        ----------
+        item_id : str
+            投稿ID（サブレディットの場合は ``r/<サブレディット名>``）。
+        stage : str
+            完了した段階。
+        data : Dict, optional
+            再開するときに使うデータ。
+        """
+        if self._journal is None:
+            return
+        
+        try:
+            self._journal.record(item_id, stage, data)
+        except Exception as e:
+            print(f"Error recording {stage} for {item_id}: {str(e)}")
+    
+    def _append_item(self, post: RedditPost) -> None:
+        """
+        要約できた投稿を、実行中の日の項目として追記します。
+        
+        Parameters
+        ----------
+        post : RedditPost
+            要約した投稿。
+        """
+        if self._item_writer is None:
+            return
+        
+        try:
+            self._item_writer.append(self._to_item(post))
+        except Exception as e:
+            print(f"Error appending item for post {post.id}: {str(e)}")
     
     def _store_summaries(self, posts: List[tuple[str, str, RedditPost]]) -> None:
         """
         要約を保存します。
         
+        投稿ごとの項目を保存し、Markdownはその項目から生成します。
+        
         Parameters
         ----------
         posts : List[tuple[str, str, RedditPost]]
             保存する投稿のリスト（カテゴリ、サブレディット名、投稿）。
         """
         today = datetime.now()
-        content = f"# Reddit 人気投稿 ({today.strftime('%Y-%m-%d')})\n\n"
+        items = [self._to_item(post, category, subreddit) for category, subreddit, post in posts]
+        
+        # 保存
+        self.storage.save_items(items, "reddit_explorer", today)
+        self.storage.save_markdown(self._render_markdown(items, today), "reddit_explorer", today)
+        for _, _, post in posts:
+            self._record(post.id, "stored")
+    
+    def _to_item(self, post: RedditPost, category: Optional[str] = None, subreddit: Optional[str] = None) -> Item:
+        """
+        投稿を保存する項目に変換します。
         
-        # カテゴリごとに整理
-        categories = {}
-        for category, subreddit, post in posts:
-            if category not in categories:
-                categories[category] = {}
+        Parameters
+        ----------
+        post : RedditPost
+            投稿。
+        category : str, optional
+            カテゴリ。指定しない場合は投稿を取得したカテゴリ。
+        subreddit : str, optional
+            サブレディット名。指定しない場合は投稿を取得したサブレディット名。
             
-            if subreddit not in categories[category]:
-                categories[category][subreddit] = []
+        Returns
+        -------
+        Item
+            項目。
+        """
+        return Item(
+            title=post.title,
+            url=post.url,
+            text=post.text,
+            summary=post.summary,
+            score=post.upvotes,
+            category=category or post.category,
+            channel=subreddit or post.subreddit,
+            extra={"id": post.id, "type": post.type, "permalink": post.permalink}
+        )
+    
+    def _render_markdown(self, items: List[Item], date: datetime) -> str:
+        """
+        項目からMarkdownを生成します。
+        
+        Parameters
+        ----------
+        items : List[Item]
+            投稿の項目のリスト。
+        date : datetime
+            日付。
             
-            categories[category][subreddit].append(post)
+        Returns
+        -------
+        str
+            Markdown。
+        """
+        content = f"# Reddit 人気投稿 ({date.strftime('%Y-%m-%d')})\n\n"
+        
+        # カテゴリ・サブレディットごとに整理
+        categories: Dict[str, Dict[str, List[Item]]] = {}
+        for item in items:
+            categories.setdefault(item.category, {}).setdefault(item.channel, []).append(item)
         
-        # Markdownを生成
         for category, subreddits in categories.items():
             content += f"## {category.capitalize()}\n\n"
             
-            for subreddit, subreddit_posts in subreddits.items():
+            for subreddit, subreddit_items in subreddits.items():
                 content += f"### r/{subreddit}\n\n"
                 
-                for post in subreddit_posts:
-                    content += f"#### [{post.title}]({post.permalink})\n\n"
+                for item in subreddit_items:
+                    permalink = item.extra.get("permalink", "")
+                    content += f"#### [{item.title}]({permalink})\n\n"
                     
-                    if post.url and post.url != post.permalink:
-                        content += f"リンク: {post.url}\n\n"
+                    if item.url and item.url != permalink:
+                        content += f"リンク: {item.url}\n\n"
                     
-                    if post.text:
-                        content += f"本文: {post.text[:200]}{'...' if len(post.text) > 200 else ''}\n\n"
+                    if item.text:
+                        content += f"本文: {item.text[:200]}{'...' if len(item.text) > 200 else ''}\n\n"
                     
-                    content += f"アップボート: {post.upvotes}\n\n"
-                    content += f"**要約**:\n{post.summary}\n\n"
+                    content += f"アップボート: {item.score}\n\n"
+                    content += f"**要約**:\n{item.summary}\n\n"
                     content += "---\n\n"
         
-        # 保存
-        self.storage.save_markdown(content, "reddit_explorer", today) 
\ No newline at end of file
+        return content
@@ -11,6 +11,12 @@ from dotenv import load_dotenv
 # 環境変数の読み込み
 load_dotenv()
 
+from nook.common.circuit_breaker import get_circuit_breaker
+from nook.common.llm_cache import get_default_cache
+from nook.common.llm_metrics import get_metrics
+from nook.common.llm_scheduler import get_llm_scheduler
+from nook.common.storage import create_storage
+
 # GitHubトレンドサービス
 from nook.services.github_trending.github_trending import GithubTrending
 
@@ -43,9 +49,14 @@ def run_hacker_news():
     except Exception as e:
         print(f"Hacker News記事の収集中にエラーが発生しました: {str(e)}")
 
-def run_reddit_explorer():
+def run_reddit_explorer(resume: bool = False):
     """
     Redditエクスプローラーサービスを実行します。
+    
+    Parameters
+    ----------
+    resume : bool, default=False
+        Trueの場合、途中で終了した前回の実行の続きから実行します。
     """
     print("Reddit投稿を収集しています...")
     try:
@@ -56,26 +67,38 @@ def run_reddit_explorer():
             return
             
         reddit_explorer = RedditExplorer()
-        reddit_explorer.run()
+        reddit_explorer.run(resume=resume)
         print("Reddit投稿の収集が完了しました。")
     except Exception as e:
         print(f"Reddit投稿の収集中にエラーが発生しました: {str(e)}")
 
-def run_tech_feed():
+def run_tech_feed(batch: bool = False, resume: bool = False):
     """
     技術フィードサービスを実行します。
+    
+    Parameters
+    ----------
+    batch : bool, default=False
+        Trueの場合、要約をバッチジョブとして実行します。
+    resume : bool, default=False
+        Trueの場合、途中で終了した前回の実行の続きから実行します。
     """
     print("技術ブログのフィードを収集しています...")
     try:
         tech_feed = TechFeed()
-        tech_feed.run()
+        tech_feed.run(batch=batch, resume=resume)
         print("技術ブログのフィードの収集が完了しました。")
     except Exception as e:
         print(f"技術ブログのフィード収集中にエラーが発生しました: {str(e)}")
 
-def run_paper_summarizer():
+def run_paper_summarizer(batch: bool = False):
     """
     論文要約サービスを実行します。
+    
+    Parameters
+    ----------
+    batch : bool, default=False
+        Trueの場合、要約をバッチジョブとして実行します。
     """
     print("arXiv論文を収集・要約しています...")
     try:
@@ -86,7 +109,7 @@ def run_paper_summarizer():
             return
             
         paper_summarizer = PaperSummarizer()
-        paper_summarizer.run()
+        paper_summarizer.run(batch=batch)
         print("論文の収集・要約が完了しました。")
     except Exception as e:
         print(f"論文の収集・要約中にエラーが発生しました: {str(e)}")
@@ -217,6 +240,69 @@ def run_twitter_techfeed():
     except Exception as e:
         print(f"Xへの投稿中にエラーが発生しました: {str(e)}")
 
+def dump_llm_metrics(metrics_dir: str) -> None:
+    """
+    LLM呼び出しの計測結果をJSONとして保存し、呼び出し元ごとの概要を表示します。
+    
+    Parameters
+    ----------
+    metrics_dir : str
+        出力先ディレクトリ。実行ごとのファイルと、APIが読み込む latest.json を書き出します。
+    """
+    metrics = get_metrics()
+    snapshot = metrics.snapshot()
+    if not snapshot["call_sites"]:
+        return
+    
+    timestamp = datetime.now().strftime("%Y%m%d-%H%M%S")
+    path = metrics.dump_json(os.path.join(metrics_dir, f"llm-{timestamp}.json"))
+    metrics.dump_json(os.path.join(metrics_dir, "latest.json"))
+    
+    print("LLM呼び出しの計測結果:")
+    for call_site, stats in snapshot["call_sites"].items():
+        print(f"  {call_site}: {stats['calls']} 回 (キャッシュ {stats['cache_hits']}, 再試行 {stats['retries']}, "
+              f"エラー {stats['errors']}), トークン {stats['prompt_tokens']}+{stats['completion_tokens']}, "
+              f"合計 {stats['latency_total']:.1f} 秒, 省略 {stats['skipped']} 回")
+    if snapshot["total"]["skipped"]:
+        reasons = {}
+        for stats in snapshot["call_sites"].values():
+            for reason, count in stats["skipped_reasons"].items():
+                reasons[reason] = reasons.get(reason, 0) + count
+        breakdown = ", ".join(f"{reason} {count}" for reason, count in sorted(reasons.items()))
+        print(f"翻訳メモリ・日本語・URL・コードなどのため省略した呼び出し: {snapshot['total']['skipped']} 回 ({breakdown})")
+    if snapshot["total"]["fallbacks"]:
+        print(f"翻訳と要約をまとめたリクエストを別々のリクエストにやり直した回数: {snapshot['total']['fallbacks']} 回")
+    if snapshot["total"]["tokens_saved"]:
+        print(f"入力の整形・切り詰めで削減したトークン数（見積もり）: {snapshot['total']['tokens_saved']} "
+              f"({snapshot['total']['compacted']} 件)")
+    circuit_breaker = get_circuit_breaker()
+    if circuit_breaker and circuit_breaker.opened:
+        stats = circuit_breaker.stats()
+        print(f"LLM APIの不調によりサーキットが {stats['opened']} 回開き、{stats['rejected']} 回のリクエストを送信しませんでした")
+    scheduler = get_llm_scheduler()
+    if scheduler:
+        stats = scheduler.stats()["priorities"]["batch"]
+        if stats["granted"]:
+            print(f"LLM APIの送信枠の待ち時間: 平均 {stats['wait_avg']:.1f} 秒, 最大 {stats['wait_max']:.1f} 秒")
+    print(f"計測結果を保存しました: {path}")
+
+def run_archive(days: int):
+    """
+    古い日のファイルを月ごとの圧縮ファイルにまとめます。
+    
+    Parameters
+    ----------
+    days : int
+        この日数より前の日をまとめます。
+    """
+    print(f"{days} 日より前のファイルを月ごとにまとめています...")
+    stats = create_storage("data").archive(days)
+    if stats["files"]:
+        print(f"{stats['days']} 日分（{stats['files']} ファイル）をまとめました: "
+              f"{stats['bytes_before'] / 1024:.1f} KB → {stats['bytes_after'] / 1024:.1f} KB")
+    else:
+        print("まとめるファイルはありません")
+
 def main():
     """
     コマンドライン引数に基づいて、指定されたサービスを実行します。
@@ -226,10 +312,33 @@ def main():
         "--service", 
         type=str,
         choices=["all", "github", "hackernews", "reddit", "techfeed", "paper", "twitter", 
-                "twitter_github", "twitter_hackernews", "twitter_arxiv", "twitter_reddit", "twitter_techfeed"],
+                "twitter_github", "twitter_hackernews", "twitter_arxiv", "twitter_reddit", "twitter_techfeed",
+                "archive"],
         default="all",
         help="実行するサービス (デフォルト: all)"
     )
+    parser.add_argument(
+        "--metrics-dir",
+        type=str,
+        default="data/metrics",
+        help="LLM呼び出しの計測結果(JSON)の出力先 (デフォルト: data/metrics)"
+    )
+    parser.add_argument(
+        "--batch",
+        action="store_true",
+        help="論文と技術ブログの要約をバッチジョブとして実行します（安価だが完了まで時間がかかる）"
+    )
+    parser.add_argument(
+        "--resume",
+        action="store_true",
+        help="Redditと技術ブログで、今日の実行が途中で終了していれば、ジャーナルに記録した段階の続きから再開します"
+    )
+    parser.add_argument(
+        "--archive-days",
+        type=int,
+        default=int(os.environ.get("ARCHIVE_AFTER_DAYS", 30)),
+        help="--service archive で、この日数より前のファイルを月ごとの圧縮ファイルにまとめます (デフォルト: 30)"
+    )
     
     args = parser.parse_args()
     
@@ -240,13 +349,13 @@ def main():
         run_hacker_news()
     
     if args.service == "all" or args.service == "reddit":
-        run_reddit_explorer()
+        run_reddit_explorer(resume=args.resume)
     
     if args.service == "all" or args.service == "techfeed":
-        run_tech_feed()
+        run_tech_feed(batch=args.batch, resume=args.resume)
     
     if args.service == "all" or args.service == "paper":
-        run_paper_summarizer()
+        run_paper_summarizer(batch=args.batch)
     
     if args.service == "all" or args.service == "twitter":
         run_twitter_poster()
@@ -266,6 +375,19 @@ def main():
     
     if args.service == "twitter_techfeed":
         run_twitter_techfeed()
+    
+    if args.service == "archive":
+        run_archive(args.archive_days)
+    
+    # LLM呼び出しの計測結果を保存
+    dump_llm_metrics(args.metrics_dir)
+    
+    # LLMキャッシュの利用状況を表示
+    cache = get_default_cache()
+    if cache:
+        stats = cache.stats()
+        print(f"LLMキャッシュ: ヒット {stats['hits']} 件 / ミス {stats['misses']} 件 "
+              f"(エントリ数 {stats['entries']}, {stats['bytes'] / 1024 / 1024:.1f} MB)")
 
 if __name__ == "__main__":
     main() 
\ No newline at end of file
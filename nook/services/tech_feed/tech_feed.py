@@ -1,17 +1,24 @@
 """技術ブログのRSSフィードを監視・収集・要約するサービス。"""
 
+import asyncio
 import tomli
 from dataclasses import dataclass, field
 from datetime import datetime, timedelta
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional, Tuple
 
 import feedparser
 import requests
 from bs4 import BeautifulSoup
 
-from nook.common.grok_client import Grok3Client
-from nook.common.storage import LocalStorage
+from nook.common.batch_jobs import BatchJobRunner, BatchRequest
+from nook.common.fused_summary import fused_summary_enabled, translate_and_summarize
+from nook.common.grok_client import get_async_grok_client
+from nook.common.items import Item
+from nook.common.prompt_input import compact_prompt_input
+from nook.common.run_journal import RunJournal
+from nook.common.storage import ItemWriter, create_storage
+from nook.common.translator import Translator
 
 
 @dataclass
@@ -29,8 +36,8 @@ class Article:
         URL。
     text : str
         本文。
-    soup : BeautifulSoup
-        BeautifulSoupオブジェクト。
+    soup : BeautifulSoup | None
+        BeautifulSoupオブジェクト。ジャーナルから復元した記事ではNone。
     category : str | None
         カテゴリ。
     """
@@ -39,7 +46,7 @@ class Article:
     title: str
     url: str
     text: str
-    soup: BeautifulSoup
+    soup: Optional[BeautifulSoup]
     category: Optional[str] = None
     summary: str = field(default="")
 
@@ -63,60 +70,157 @@ class TechFeed:
         storage_dir : str, default="data"
             ストレージディレクトリのパス。
         """
-        self.storage = LocalStorage(storage_dir)
-        self.grok_client = Grok3Client()
+        self.storage = create_storage(storage_dir)
+        # 要約できた記事から1件ずつ追記するライター（run の実行中のみ）
+        self._item_writer: Optional[ItemWriter] = None
+        # 記事ごとに完了した段階を記録するジャーナル（run の実行中のみ）
+        self._journal: Optional[RunJournal] = None
+        self.grok_client = get_async_grok_client()
+        self.translator = Translator(
+            self.grok_client,
+            instruction="以下の英語のテキストを自然な日本語に翻訳してください。技術用語は適切に翻訳し、必要に応じて英語の専門用語を括弧内に残してください。"
+        )
         
         # フィードの設定を読み込む
         script_dir = Path(__file__).parent
         with open(script_dir / "feed.toml", "rb") as f:
             self.feed_config = tomli.load(f)
     
-    def run(self, days: int = 1, limit: int = 3) -> None:
+    def run(self, days: int = 1, limit: int = 3, batch: bool = False, resume: bool = False) -> None:
         """
         技術ブログのRSSフィードを監視・収集・要約して保存します。
         
+        記事ごとに完了した段階（取得・翻訳・要約・保存）をジャーナルに記録します。
+        
         Parameters
         ----------
         days : int, default=1
             何日前までの記事を取得するか。
         limit : int, default=3
             各フィードから取得する記事数。
+        batch : bool, default=False
+            Trueの場合、要約をバッチジョブとしてまとめて実行します（完了まで時間がかかる代わりに安価）。
+        resume : bool, default=False
+            Trueの場合、前回の実行が途中で終了していれば、ジャーナルに記録した段階の続きから実行します。
         """
-        all_articles = []
-        
-        # 各カテゴリのフィードから記事を取得
-        for category, feeds in self.feed_config.items():
-            print(f"カテゴリ {category} の処理を開始します...")
-            for feed_url in feeds:
-                try:
-                    # フィードを解析
-                    print(f"フィード {feed_url} を解析しています...")
-                    feed = feedparser.parse(feed_url)
-                    feed_name = feed.feed.title if hasattr(feed, "feed") and hasattr(feed.feed, "title") else feed_url
-                    
-                    # 新しいエントリをフィルタリング
-                    entries = self._filter_entries(feed.entries, days, limit)
-                    print(f"フィード {feed_name} から {len(entries)} 件のエントリを取得しました")
-                    
-                    for entry in entries:
-                        # 記事を取得
-                        article = self._retrieve_article(entry, feed_name, category)
-                        if article:
-                            # 記事を要約
-                            self._summarize_article(article)
-                            all_articles.append(article)
+        self._journal = RunJournal.open(self.storage.base_dir, "tech_feed", resume=resume)
+        try:
+            all_articles = []
+            
+            # 各カテゴリのフィードから記事を取得
+            for category, feeds in self.feed_config.items():
+                print(f"カテゴリ {category} の処理を開始します...")
+                for feed_url in feeds:
+                    all_articles.extend(self._fetch_articles(feed_url, category, days, limit))
+            
+            print(f"合計 {len(all_articles)} 件の記事を取得しました")
+            
+            if not all_articles:
+                print("保存する記事がありません")
+                self._journal.finish()
+                return
+            
+            # 前回の実行で翻訳・要約まで完了した記事は、記録した結果を使う
+            pending = []
+            translated = []
+            for article in all_articles:
+                summarized = self._journal.get(article.url, "summarized")
+                translation = self._journal.get(article.url, "translated")
+                if summarized:
+                    article.title = summarized["title"]
+                    article.text = summarized["text"]
+                    article.summary = summarized["summary"]
+                elif translation:
+                    article.title = translation["title"]
+                    article.text = translation["text"]
+                    translated.append(article)
+                else:
+                    pending.append(article)
+            if resume and len(pending) < len(all_articles):
+                print(f"{len(all_articles) - len(pending) - len(translated)} 件の要約済みの記事と"
+                      f"{len(translated)} 件の翻訳済みの記事を再開に使います")
+            
+            # 翻訳と要約をすべての記事で並行して実行し、要約できた記事から順に追記する
+            self._item_writer = self.storage.open_item_writer("tech_feed")
+            try:
+                asyncio.run(self._process_articles(pending, summarize=not batch, translated=translated))
+                
+                # 急がない要約はバッチジョブで実行
+                unsummarized = [article for article in all_articles if not self._journal.has(article.url, "summarized")]
+                if batch and unsummarized:
+                    self._summarize_in_batch(unsummarized)
                 
-                except Exception as e:
-                    print(f"Error processing feed {feed_url}: {str(e)}")
+                # 要約を保存
+                if not all(self._journal.has(article.url, "stored") for article in all_articles):
+                    self._store_summaries(all_articles)
+                    print(f"記事の要約を保存しました")
+            finally:
+                self._item_writer.close()
+                self._item_writer = None
+            
+            self._journal.finish()
+        finally:
+            self._journal.close()
+            self._journal = None
+    
+    def _fetch_articles(self, feed_url: str, category: str, days: int, limit: int) -> List[Article]:
+        """
+        フィードの新しいエントリの記事を取得します。
         
-        print(f"合計 {len(all_articles)} 件の記事を取得しました")
+        前回の実行で取得済みのフィードは、ジャーナルに記録した内容を使います。
         
-        # 要約を保存
-        if all_articles:
-            self._store_summaries(all_articles)
-            print(f"記事の要約を保存しました")
-        else:
-            print("保存する記事がありません")
+        Parameters
+        ----------
+        feed_url : str
+            フィードのURL。
+        category : str
+            カテゴリ。
+        days : int
+            何日前までの記事を取得するか。
+        limit : int
+            取得する記事数。
+            
+        Returns
+        -------
+        List[Article]
+            取得した記事のリスト。フィードの処理に失敗した場合は空のリスト。
+        """
+        source_id = f"feed:{feed_url}"
+        fetched = self._journal.get(source_id, "fetched") if self._journal else None
+        if fetched is not None:
+            return [Article(soup=None, **self._journal.get(url, "fetched")) for url in fetched["urls"]]
+        
+        articles = []
+        try:
+            # フィードを解析
+            print(f"フィード {feed_url} を解析しています...")
+            # タイムアウトを指定するため、取得はrequestsで行う
+            response = requests.get(feed_url, timeout=10)
+            response.raise_for_status()
+            feed = feedparser.parse(response.content)
+            feed_name = feed.feed.title if hasattr(feed, "feed") and hasattr(feed.feed, "title") else feed_url
+            
+            # 新しいエントリをフィルタリング
+            entries = self._filter_entries(feed.entries, days, limit)
+            print(f"フィード {feed_name} から {len(entries)} 件のエントリを取得しました")
+            
+            for entry in entries:
+                # 記事を取得
+                article = self._retrieve_article(entry, feed_name, category)
+                if article:
+                    articles.append(article)
+                    self._record(article.url, "fetched", {
+                        "feed_name": article.feed_name, "title": article.title, "url": article.url,
+                        "text": article.text, "category": article.category
+                    })
+        
+        except Exception as e:
+            print(f"Error processing feed {feed_url}: {str(e)}")
+            return articles
+        
+        # すべての記事を記録してから、フィードを取得済みとする
+        self._record(source_id, "fetched", {"urls": [article.url for article in articles]})
+        return articles
     
     def _filter_entries(self, entries: List[dict], days: int, limit: int) -> List[dict]:
         """
@@ -217,15 +321,16 @@ class TechFeed:
                     if paragraphs:
                         text = "\n".join([p.get_text() for p in paragraphs[:5]])
             
-            # タイトルと本文を日本語に翻訳
-            title_ja = self._translate_to_japanese(title)
-            text_ja = self._translate_to_japanese(text)
+            # エントリの要約はHTMLのことが多いため、マークアップ・URL・定型文を取り除いて切り詰める
+            title = compact_prompt_input(title, call_site="tech_feed.translate_title")
+            text = compact_prompt_input(text, call_site="tech_feed.translate_text")
             
+            # タイトルと本文の翻訳は _process_articles で要約とまとめて行う
             return Article(
                 feed_name=feed_name,
-                title=title_ja,
+                title=title,
                 url=url,
-                text=text_ja,
+                text=text,
                 soup=soup,
                 category=category
             )
@@ -234,45 +339,119 @@ class TechFeed:
             print(f"Error retrieving article {entry.get('link', 'unknown')}: {str(e)}")
             return None
     
-    def _translate_to_japanese(self, text: str) -> str:
+    async def _process_articles(
+        self,
+        articles: List[Article],
+        summarize: bool = True,
+        translated: Optional[List[Article]] = None
+    ) -> None:
+        """
+        記事の翻訳と要約を実行します。
+        
+        各記事のタイトル・本文の翻訳と要約を1回のリクエストでまとめて生成します。
+        結果を得られなかった記事は、すべての記事のタイトルと本文をまとめて翻訳したあと、
+        各記事の要約を並行して生成します。
+        
+        Parameters
+        ----------
+        articles : List[Article]
+            処理する記事のリスト。翻訳結果と要約で上書きされます。
+        summarize : bool, default=True
+            Falseの場合は翻訳のみ行います。
+        translated : List[Article], optional
+            翻訳済みで、要約のみを行う記事のリスト。
+        """
+        remaining = articles
+        if articles and summarize and fused_summary_enabled():
+            results = await asyncio.gather(
+                *(self._translate_and_summarize_article(article) for article in articles)
+            )
+            remaining = [article for article, done in zip(articles, results) if not done]
+            if remaining:
+                print(f"{len(remaining)} 件の記事は翻訳と要約を別々に行います")
+        
+        # 翻訳済みの記事は、残りの記事の翻訳と並行して要約する
+        translated_summaries = asyncio.gather(*(
+            self._summarize_article(article) for article in (translated or []) if summarize
+        ))
+        
+        if not remaining:
+            await translated_summaries
+            return
+        
+        titles_ja, texts_ja = await asyncio.gather(
+            self.translator.translate_many(
+                [article.title for article in remaining], call_site="tech_feed.translate_title"
+            ),
+            self.translator.translate_many(
+                [article.text for article in remaining], call_site="tech_feed.translate_text"
+            )
+        )
+        for article, title_ja, text_ja in zip(remaining, titles_ja, texts_ja):
+            article.title = title_ja
+            article.text = text_ja
+            self._record(article.url, "translated", {"title": article.title, "text": article.text})
+        
+        # 翻訳後の内容で記事を要約
+        if summarize:
+            await self._summarize_all(remaining)
+        await translated_summaries
+    
+    async def _translate_and_summarize_article(self, article: Article) -> bool:
         """
-        テキストを日本語に翻訳します。
+        記事のタイトル・本文の翻訳と要約を1回のリクエストで生成します。
         
         Parameters
         ----------
-        text : str
-            翻訳するテキスト。
+        article : Article
+            処理する記事。成功した場合は翻訳結果と要約で上書きされます。
             
         Returns
         -------
-        str
-            翻訳されたテキスト。
+        bool
+            成功した場合はTrue。
         """
-        try:
-            prompt = f"以下の英語のテキストを自然な日本語に翻訳してください。技術用語は適切に翻訳し、必要に応じて英語の専門用語を括弧内に残してください。\n\n{text}"
-            
-            translated_text = self.grok_client.generate_content(
-                prompt=prompt,
-                temperature=0.3,
-                max_tokens=1000
-            )
-            
-            return translated_text
-        except Exception as e:
-            print(f"Error translating text: {str(e)}")
-            return text  # 翻訳に失敗した場合は原文を返す
+        prompt, system_instruction = self._summary_prompt(article, translate=True)
+        result = await translate_and_summarize(
+            self.grok_client,
+            prompt,
+            system_instruction,
+            has_text=bool(article.text.strip()),
+            call_site="tech_feed.translate_and_summarize"
+        )
+        if result is None:
+            return False
+        
+        article.title = result.title
+        article.text = result.text if article.text.strip() else ""
+        article.summary = result.summary
+        self._record(article.url, "summarized", {"title": article.title, "text": article.text, "summary": article.summary})
+        self._append_item(article)
+        return True
     
-    def _summarize_article(self, article: Article) -> None:
+    def _summary_prompt(self, article: Article, translate: bool = False) -> Tuple[str, str]:
         """
-        記事を要約します。
+        記事の要約を依頼するプロンプトを作成します。
         
         Parameters
         ----------
         article : Article
             要約する記事。
+        translate : bool, default=False
+            Trueの場合、タイトルと本文の翻訳もあわせて依頼します。
+            
+        Returns
+        -------
+        Tuple[str, str]
+            プロンプトとシステム指示。
         """
+        if translate:
+            request = "以下の技術ブログの記事のタイトルと本文を日本語に翻訳し、記事を要約してください。"
+        else:
+            request = "以下の技術ブログの記事を要約してください。"
+        
         prompt = f"""
-        以下の技術ブログの記事を要約してください。
+        {request}
 
         タイトル: {article.title}
         本文: {article.text[:2000]}
@@ -290,21 +469,145 @@ class TechFeed:
         回答は必ず日本語で行ってください。専門用語は適切に翻訳し、必要に応じて英語の専門用語を括弧内に残してください。
         """
         
+        return prompt, system_instruction
+    
+    async def _summarize_article(self, article: Article) -> None:
+        """
+        記事を要約します。
+        
+        Parameters
+        ----------
+        article : Article
+            要約する記事。
+        """
+        prompt, system_instruction = self._summary_prompt(article)
+        
         try:
-            summary = self.grok_client.generate_content(
+            summary = await self.grok_client.generate_content(
                 prompt=prompt,
                 system_instruction=system_instruction,
-                temperature=0.3,
-                max_tokens=1000
+                call_site="tech_feed.summarize_article"
             )
             article.summary = summary
+            self._record(article.url, "summarized", {"title": article.title, "text": article.text, "summary": article.summary})
         except Exception as e:
+            # エラーの文言は要約ではないため、生成中の日の項目には追記しない
             article.summary = f"要約の生成中にエラーが発生しました: {str(e)}"
+            return
+        
+        self._append_item(article)
+    
+    def _summarize_in_batch(self, articles: List[Article]) -> None:
+        """
+        すべての記事の要約を1つのバッチジョブで生成します。
+        
+        バッチジョブが失敗した場合や結果を得られなかった記事は、通常のリクエストで要約します。
+        
+        Parameters
+        ----------
+        articles : List[Article]
+            要約する記事のリスト。要約で上書きされます。
+        """
+        batch_requests = []
+        for index, article in enumerate(articles):
+            prompt, system_instruction = self._summary_prompt(article)
+            batch_requests.append(BatchRequest(
+                custom_id=str(index),
+                prompt=prompt,
+                system_instruction=system_instruction,
+                call_site="tech_feed.summarize_article"
+            ))
+        
+        try:
+            summaries = BatchJobRunner().run(batch_requests, name="tech_feed")
+        except Exception as e:
+            print(f"バッチジョブで要約できなかったため、通常のリクエストで要約します: {str(e)}")
+            summaries = {}
+        
+        remaining = []
+        for index, article in enumerate(articles):
+            if str(index) in summaries:
+                article.summary = summaries[str(index)]
+                self._record(article.url, "summarized", {"title": article.title, "text": article.text, "summary": article.summary})
+                self._append_item(article)
+            else:
+                remaining.append(article)
+        
+        if remaining:
+            asyncio.run(self._summarize_all(remaining))
+    
+    async def _summarize_all(self, articles: List[Article]) -> None:
+        """
+        記事の要約を通常のリクエストで並行して生成します。
+        
+        Parameters
+        ----------
+        articles : List[Article]
+            要約する記事のリスト。
+        """
+        await asyncio.gather(*(self._summarize_article(article) for article in articles))
+    
+    def _append_item(self, article: Article) -> None:
+        """
+        要約できた記事を、実行中の日の項目として追記します。
+        
+        Parameters
+        ----------
+        article : Article
+            要約した記事。
+        """
+        if self._item_writer is None:
+            return
+        
+        try:
+            self._item_writer.append(self._to_item(article))
+        except Exception as e:
+            print(f"Error appending item for article {article.url}: {str(e)}")
+    
+    def _record(self, item_id: str, stage: str, data: Optional[Dict] = None) -> None:
+        """
+        記事の段階が完了したことを、実行中のジャーナルに記録します。
+        
+        Parameters
+        ----------
+        item_id : str
+            記事のURL（フィードの場合は ``feed:<フィードのURL>``）。
+        stage : str
+            完了した段階。
+        data : Dict, optional
+            再開するときに使うデータ。
+        """
+        if self._journal is None:
+            return
+        
+        try:
+            self._journal.record(item_id, stage, data)
+        except Exception as e:
+            print(f"Error recording {stage} for {item_id}: {str(e)}")
+    
+    def _to_item(self, article: Article) -> Item:
+        """
+        記事を保存する項目に変換します。
+        
+        Parameters
+        ----------
+        article : Article
+            記事。
+            
+        Returns
+        -------
+        Item
+            項目。
+        """
+        return Item(title=article.title, url=article.url, text=article.text, summary=article.summary,
+                    category=article.category, channel=article.feed_name)
     
     def _store_summaries(self, articles: List[Article]) -> None:
         """
         要約を保存します。
         
+        記事ごとの項目を保存し、Markdownはその項目から生成します。
+        
         Parameters
         ----------
         articles : List[Article]
@@ -315,30 +618,16 @@ class TechFeed:
             return
         
         today = datetime.now()
-        content = f"# 技術ブログ記事 ({today.strftime('%Y-%m-%d')})\n\n"
-        
-        # カテゴリごとに整理
-        categories = {}
-        for article in articles:
-            if article.category not in categories:
-                categories[article.category] = []
-            
-            categories[article.category].append(article)
-        
-        # Markdownを生成
-        for category, category_articles in categories.items():
-            content += f"## {category.replace('_', ' ').capitalize()}\n\n"
-            
-            for article in category_articles:
-                content += f"### [{article.title}]({article.url})\n\n"
-                content += f"**フィード**: {article.feed_name}\n\n"
-                content += f"**要約**:\n{article.summary}\n\n"
-                content += "---\n\n"
+        items = [self._to_item(article) for article in articles]
+        content = self._render_markdown(items, today)
         
         # 保存
         print(f"tech_feed ディレクトリに保存します: {today.strftime('%Y-%m-%d')}.md")
         try:
+            self.storage.save_items(items, "tech_feed", today)
             self.storage.save_markdown(content, "tech_feed", today)
+            for article in articles:
+                self._record(article.url, "stored")
             print("保存が完了しました")
         except Exception as e:
             print(f"保存中にエラーが発生しました: {str(e)}")
@@ -352,4 +641,38 @@ class TechFeed:
                     f.write(content)
                 print(f"再試行で保存に成功しました: {file_path}")
             except Exception as e2:
-                print(f"再試行でも保存に失敗しました: {str(e2)}") 
\ No newline at end of file
+                print(f"再試行でも保存に失敗しました: {str(e2)}")
+    
+    def _render_markdown(self, items: List[Item], date: datetime) -> str:
+        """
+        項目からMarkdownを生成します。
+        
+        Parameters
+        ----------
+        items : List[Item]
+            記事の項目のリスト。
+        date : datetime
+            日付。
+            
+        Returns
+        -------
+        str
+            Markdown。
+        """
+        content = f"# 技術ブログ記事 ({date.strftime('%Y-%m-%d')})\n\n"
+        
+        # カテゴリごとに整理
+        categories: Dict[Optional[str], List[Item]] = {}
+        for item in items:
+            categories.setdefault(item.category, []).append(item)
+        
+        for category, category_items in categories.items():
+            content += f"## {category.replace('_', ' ').capitalize()}\n\n"
+            
+            for item in category_items:
+                content += f"### [{item.title}]({item.url})\n\n"
+                content += f"**フィード**: {item.channel}\n\n"
+                content += f"**要約**:\n{item.summary}\n\n"
+                content += "---\n\n"
+        
+        return content
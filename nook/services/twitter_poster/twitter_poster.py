@@ -10,7 +10,8 @@ from typing import List, Dict, Optional, Any
 import tweepy
 from dotenv import load_dotenv
 
-from nook.common.storage import LocalStorage
+from nook.common.items import Item
+from nook.common.storage import create_storage
 
 # ロギングの設定
 logging.basicConfig(
@@ -38,7 +39,7 @@ class TwitterPoster:
             ストレージディレクトリのパス。
         """
         load_dotenv()
-        self.storage = LocalStorage(storage_dir)
+        self.storage = create_storage(storage_dir)
         
         # Twitter API認証
         self.client = tweepy.Client(
@@ -122,37 +123,39 @@ class TwitterPoster:
         """
         logging.info("GitHub Trendingの情報をポストします...")
         
-        # ファイルパス
-        file_path = Path(self.storage.base_dir) / "github_trending" / f"{date_str}.md"
-        
-        if not file_path.exists():
-            logging.warning(f"GitHub Trendingのファイルが見つかりません: {file_path}")
-            return
-        
-        # ファイルを読み込む
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # 「すべての言語」セクションを抽出
-        all_languages_section = ""
-        sections = re.split(r"## ", content)
-        for section in sections:
-            if section.startswith("すべての言語") or section.startswith("all") or section.startswith("All"):
-                all_languages_section = section
-                break
-        
-        if not all_languages_section:
-            logging.warning("「すべての言語」セクションが見つかりません。全体から抽出を試みます。")
-            # セクションが見つからない場合は、全体から抽出を試みる
-            all_languages_section = content
-        
-        # リポジトリ情報を抽出
-        repositories = self._extract_github_repositories(all_languages_section)
-        
-        if not repositories:
-            logging.warning("リポジトリ情報が抽出できませんでした。別の抽出方法を試みます。")
-            # 別の抽出方法を試す
-            repositories = self._extract_github_repositories_alternative(content)
+        items = self._load_items("github_trending", date_str)
+        if items is not None:
+            # 「すべての言語」の項目を使い、ない場合は全体から選ぶ
+            all_languages = [item for item in items if item.category == "all"] or items
+            repositories = [
+                {"name": item.title, "link": item.url, "stars": item.score, "description": item.text}
+                for item in all_languages
+            ]
+        else:
+            content = self._read_markdown("github_trending", date_str, "GitHub Trending")
+            if content is None:
+                return
+            
+            # 「すべての言語」セクションを抽出
+            all_languages_section = ""
+            sections = re.split(r"## ", content)
+            for section in sections:
+                if section.startswith("すべての言語") or section.startswith("all") or section.startswith("All"):
+                    all_languages_section = section
+                    break
+            
+            if not all_languages_section:
+                logging.warning("「すべての言語」セクションが見つかりません。全体から抽出を試みます。")
+                # セクションが見つからない場合は、全体から抽出を試みる
+                all_languages_section = content
+            
+            # リポジトリ情報を抽出
+            repositories = self._extract_github_repositories(all_languages_section)
+            
+            if not repositories:
+                logging.warning("リポジトリ情報が抽出できませんでした。別の抽出方法を試みます。")
+                # 別の抽出方法を試す
+                repositories = self._extract_github_repositories_alternative(content)
         
         if not repositories:
             logging.error("どの方法でもリポジトリ情報を抽出できませんでした。")
@@ -183,19 +186,16 @@ class TwitterPoster:
         """
         logging.info("Hacker Newsの情報をポストします...")
         
-        # ファイルパス
-        file_path = Path(self.storage.base_dir) / "hacker_news" / f"{date_str}.md"
-        
-        if not file_path.exists():
-            logging.warning(f"Hacker Newsのファイルが見つかりません: {file_path}")
-            return
-        
-        # ファイルを読み込む
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # 記事情報を抽出
-        articles = self._extract_hacker_news_articles(content)
+        items = self._load_items("hacker_news", date_str)
+        if items is not None:
+            articles = [{"title": item.title, "url": item.url, "score": item.score} for item in items]
+        else:
+            content = self._read_markdown("hacker_news", date_str, "Hacker News")
+            if content is None:
+                return
+            
+            # 記事情報を抽出
+            articles = self._extract_hacker_news_articles(content)
         
         if not articles:
             logging.warning("記事情報が抽出できませんでした")
@@ -226,19 +226,16 @@ class TwitterPoster:
         """
         logging.info("arXiv論文の情報をポストします...")
         
-        # ファイルパス
-        file_path = Path(self.storage.base_dir) / "paper_summarizer" / f"{date_str}.md"
-        
-        if not file_path.exists():
-            logging.warning(f"arXiv論文のファイルが見つかりません: {file_path}")
-            return
-        
-        # ファイルを読み込む
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # 論文情報を抽出
-        papers = self._extract_arxiv_papers(content)
+        items = self._load_items("paper_summarizer", date_str)
+        if items is not None:
+            papers = [{"title": item.title, "url": item.url, "abstract": item.text} for item in items]
+        else:
+            content = self._read_markdown("paper_summarizer", date_str, "arXiv論文")
+            if content is None:
+                return
+            
+            # 論文情報を抽出
+            papers = self._extract_arxiv_papers(content)
         
         if not papers:
             logging.warning("論文情報が抽出できませんでした")
@@ -269,19 +266,23 @@ class TwitterPoster:
         """
         logging.info("Reddit記事の情報をポストします...")
         
-        # ファイルパス
-        file_path = Path(self.storage.base_dir) / "reddit_explorer" / f"{date_str}.md"
-        
-        if not file_path.exists():
-            logging.warning(f"Reddit記事のファイルが見つかりません: {file_path}")
-            return
-        
-        # ファイルを読み込む
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # カテゴリごとの記事を抽出
-        categories = self._extract_reddit_categories(content)
+        items = self._load_items("reddit_explorer", date_str)
+        if items is not None:
+            categories: Dict[str, List[Dict[str, str]]] = {}
+            for item in items:
+                categories.setdefault(item.category.capitalize(), []).append({
+                    "title": item.title,
+                    "link": item.extra.get("permalink", ""),
+                    "summary": self._extract_main_point(item.summary, "投稿の主な内容"),
+                    "subreddit": f"r/{item.channel}"
+                })
+        else:
+            content = self._read_markdown("reddit_explorer", date_str, "Reddit記事")
+            if content is None:
+                return
+            
+            # カテゴリごとの記事を抽出
+            categories = self._extract_reddit_categories(content)
         
         if not categories:
             logging.warning("Reddit記事情報が抽出できませんでした")
@@ -318,19 +319,23 @@ class TwitterPoster:
         """
         logging.info("技術ブログ記事の情報をポストします...")
         
-        # ファイルパス
-        file_path = Path(self.storage.base_dir) / "tech_feed" / f"{date_str}.md"
-        
-        if not file_path.exists():
-            logging.warning(f"技術ブログ記事のファイルが見つかりません: {file_path}")
-            return
-        
-        # ファイルを読み込む
-        with open(file_path, "r", encoding="utf-8") as f:
-            content = f.read()
-        
-        # フィードごとの記事を抽出
-        feeds = self._extract_tech_feed_articles(content)
+        items = self._load_items("tech_feed", date_str)
+        if items is not None:
+            feeds: Dict[str, List[Dict[str, str]]] = {}
+            for item in items:
+                feeds.setdefault((item.category or "").replace("_", " ").capitalize(), []).append({
+                    "title": item.title,
+                    "url": item.url,
+                    "feed_info": item.channel,
+                    "summary": self._extract_main_point(item.summary, "記事の主な内容")
+                })
+        else:
+            content = self._read_markdown("tech_feed", date_str, "技術ブログ記事")
+            if content is None:
+                return
+            
+            # フィードごとの記事を抽出
+            feeds = self._extract_tech_feed_articles(content)
         
         if not feeds:
             logging.warning("技術ブログ記事情報が抽出できませんでした")
@@ -356,6 +361,77 @@ class TwitterPoster:
             # ツイート投稿
             self._post_tweet(tweet_text)
     
+    def _load_items(self, service_name: str, date_str: str) -> Optional[List[Item]]:
+        """
+        サービスが保存した項目を読み込みます。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date_str : str
+            日付文字列。
+            
+        Returns
+        -------
+        List[Item] or None
+            項目のリスト。項目のファイルがない場合（以前の形式で保存した日など）はNone。
+        """
+        try:
+            return self.storage.load_items(service_name, datetime.strptime(date_str, "%Y-%m-%d"))
+        except (OSError, ValueError) as e:
+            logging.warning(f"項目を読み込めませんでした ({service_name}): {e}")
+            return None
+    
+    def _read_markdown(self, service_name: str, date_str: str, label: str) -> Optional[str]:
+        """
+        サービスが保存したMarkdownを読み込みます。
+        
+        Parameters
+        ----------
+        service_name : str
+            サービス名（ディレクトリ名）。
+        date_str : str
+            日付文字列。
+        label : str
+            ログに表示する名前。
+            
+        Returns
+        -------
+        str or None
+            Markdown。ファイルがない場合はNone。
+        """
+        # ファイルパス
+        file_path = Path(self.storage.base_dir) / service_name / f"{date_str}.md"
+        
+        if not file_path.exists():
+            logging.warning(f"{label}のファイルが見つかりません: {file_path}")
+            return None
+        
+        # ファイルを読み込む
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+    
+    def _extract_main_point(self, summary: str, heading: str) -> str:
+        """
+        要約から「1. 〇〇の主な内容」の項目を抽出します。
+        
+        Parameters
+        ----------
+        summary : str
+            要約。
+        heading : str
+            項目の見出し（例: ``投稿の主な内容``）。
+            
+        Returns
+        -------
+        str
+            抽出した内容。見つからない場合は空文字列。
+        """
+        pattern = rf"1\. {heading}(?:（1-2文）)?:\s*(.*?)(?:\n\n|\n2\.|$)"
+        match = re.search(pattern, summary or "", re.DOTALL)
+        return match.group(1).strip() if match else ""
+    
     def _extract_section(self, content: str, section_start: str, section_end: str) -> str:
         """
         指定されたセクションを抽出します。
@@ -10,8 +10,17 @@ cd /app
 python -m nook.services.run_services --service hackernews
 python -m nook.services.run_services --service github
 python -m nook.services.run_services --service paper
-python -m nook.services.run_services --service techfeed
-python -m nook.services.run_services --service reddit
+# 今日の実行が途中で終了していた場合のみ、ジャーナルに記録した段階の続きから再開する
+TODAY=$(date +%Y-%m-%d)
+TECHFEED_RESUME=""
+REDDIT_RESUME=""
+[ -f "data/.journal/tech_feed/${TODAY}.jsonl" ] && TECHFEED_RESUME="--resume"
+[ -f "data/.journal/reddit_explorer/${TODAY}.jsonl" ] && REDDIT_RESUME="--resume"
+python -m nook.services.run_services --service techfeed $TECHFEED_RESUME
+python -m nook.services.run_services --service reddit $REDDIT_RESUME
+
+# 古い日のファイルを月ごとの圧縮ファイルにまとめる
+python -m nook.services.run_services --service archive
 
 #4 ニュースの登録
 